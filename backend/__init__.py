@@ -1,10 +1,8 @@
 # backend/__init__.py
 # -*- coding: utf-8 -*-
 import os
-import sys
-import spacy
+import time
 import traceback
-import subprocess
 import logging # Import logging
 from flask import Flask, jsonify, request 
 from flask_cors import CORS
@@ -17,111 +15,22 @@ from . import utils   # Import utils from the same package
 from .upload_resume import upload_bp
 from .generate_jd import jd_bp
 from .scan_resumes import scan_bp
+from .resume_index import import_parsed_json_folder
+from .nlp_model import get_nlp_model, nlp_model_status
 
-# --- spaCy Model Loading Logic ---
-def load_spacy_model_on_demand(app, model_name, model_version):
-    """
-    Loads or downloads spaCy model into /tmp. Caches in app.config.
-    Now uses app.logger for logging.
-    """
-    if app.config.get('NLP_MODEL') is not None:
-        app.logger.info("spaCy model already loaded in memory.")
-        return app.config['NLP_MODEL']
-
-    # Define paths and URL using model name and version
-    tmp_model_base_path = "/tmp/spacy_models" # Base dir in tmp for models
-    tmp_model_path = os.path.join(tmp_model_base_path, model_name) # Path for specific model
-    full_model_name_version = f"{model_name}-{model_version}"
-    model_load_path = os.path.join(tmp_model_path, model_name, full_model_name_version) # Expected installed path
-    model_url = f"https://github.com/explosion/spacy-models/releases/download/{full_model_name_version}/{full_model_name_version}-py3-none-any.whl"
-
-    app.logger.info(f"--- Loading spaCy Model On-Demand: {model_name} v{model_version} ---")
-    nlp_instance = None
-    try:
-        # Ensure base /tmp directory for models exists
-        os.makedirs(tmp_model_base_path, exist_ok=True)
-
-        # Check if model seems correctly installed in the target /tmp location
-        if os.path.exists(os.path.join(model_load_path, "meta.json")):
-             app.logger.info(f"Loading spaCy model from expected path: {model_load_path}...")
-             nlp_instance = spacy.load(model_load_path)
-             app.logger.info("Model loaded successfully from /tmp.")
-        else:
-            app.logger.info(f"Model not found in {model_load_path}. Attempting download from {model_url}...")
-
-            # Use pip to install the model wheel directly into the target subdirectory
-            # --target installs into the specified dir, creating package structure needed by spacy.load
-            pip_command = [
-                sys.executable, "-m", "pip", "install",
-                "--target", tmp_model_path, # Install *into* /tmp/spacy_models/en_core_web_sm/
-                "--no-deps",
-                model_url
-            ]
-            app.logger.info(f"Executing: {' '.join(pip_command)}")
-            result = subprocess.run(pip_command, check=True, capture_output=True, text=True)
-            app.logger.debug(f"Pip install stdout:\n{result.stdout}")
-            if result.stderr:
-                 app.logger.warning(f"Pip install stderr:\n{result.stderr}") # Log stderr as warning
-
-            app.logger.info(f"Model downloaded and installed to {tmp_model_path}. Verifying installation...")
-
-            # Verify the expected directory structure was created by pip install --target
-            if not os.path.exists(os.path.join(model_load_path, "meta.json")):
-                 # Log contents of tmp_model_path for debugging if structure is wrong
-                 app.logger.error(f"Model directory structure not found as expected at {model_load_path} after install.")
-                 try:
-                     dir_contents = os.listdir(tmp_model_path)
-                     app.logger.error(f"Contents of {tmp_model_path}: {dir_contents}")
-                     # Attempt to find the correct subdir if possible (less reliable)
-                     found_path = None
-                     for item in dir_contents:
-                         potential_path = os.path.join(tmp_model_path, item)
-                         if os.path.isdir(potential_path) and os.path.exists(os.path.join(potential_path, "meta.json")):
-                              # Check if it contains the model name and version
-                              if model_name in item and model_version in item:
-                                   model_load_path = potential_path
-                                   found_path = True
-                                   app.logger.warning(f"Found model data in unexpected subdirectory: {model_load_path}. Attempting load.")
-                                   break
-                     if not found_path:
-                          raise OSError(f"Could not locate spaCy model data directory within {tmp_model_path}")
-
-                 except Exception as list_err:
-                     app.logger.error(f"Could not list directory {tmp_model_path} to debug: {list_err}")
-                     raise OSError(f"Could not find spaCy model data directory within {tmp_model_path} after install.")
-
-
-            app.logger.info(f"Loading model from: {model_load_path}...")
-            nlp_instance = spacy.load(model_load_path)
-            app.logger.info("Model loaded successfully after download.")
-
-    except subprocess.CalledProcessError as e:
-        app.logger.critical(f"CRITICAL ERROR: Failed to download/install spaCy model using pip: {e}")
-        app.logger.critical(f"Command attempted: {' '.join(e.cmd)}")
-        app.logger.critical(f"Pip stdout:\n{e.stdout}")
-        app.logger.critical(f"Pip stderr:\n{e.stderr}")
-        app.logger.critical("Check model URL/version, network connectivity, and /tmp permissions/space.")
-        nlp_instance = None
-    except OSError as e:
-        app.logger.critical(f"CRITICAL ERROR: Failed to load spaCy model from {model_load_path} (OSError): {e}", exc_info=True)
-        nlp_instance = None
-    except Exception as e:
-        app.logger.critical(f"CRITICAL ERROR: An unexpected error occurred loading/downloading spaCy model: {e}", exc_info=True)
-        nlp_instance = None
-
-    # Cache the result (even if None)
-    app.config['NLP_MODEL'] = nlp_instance
-
-    if not nlp_instance:
-        app.logger.error("!!! NER capabilities might be limited due to spaCy model load failure!!!")
-
-    app.logger.info("--- spaCy Model Loading Process Complete ---")
-    return nlp_instance
+# --- Startup Timing ---
+def _end_startup_phase(app, phase: str, start_time: float) -> float:
+    """Logs and records (STARTUP_PHASE_SECONDS) how long a create_app phase took. Returns the next phase's start."""
+    now = time.perf_counter()
+    app.config.setdefault('STARTUP_PHASE_SECONDS', {})[phase] = round(now - start_time, 4)
+    app.logger.info(f"Startup phase '{phase}' took {(now - start_time) * 1000:.1f} ms.")
+    return now
 
 # --- Application Factory ---
 def create_app(test_config=None):
     """Flask application factory."""
     app = Flask(__name__, instance_relative_config=True)
+    phase_start = time.perf_counter()
 
     # --- Configure Logging ---
     # Use Flask's default logger or customize further
@@ -153,11 +62,12 @@ def create_app(test_config=None):
         }
     })
     app.logger.info("CORS configured.")
+    phase_start = _end_startup_phase(app, "configuration", phase_start)
 
     # --- Create Directories (using /tmp paths from config) ---
     app.logger.info("--- Ensuring /tmp Directories Exist ---")
     # Using /tmp is generally necessary on serverless platforms like Vercel/Render free tier
-    for folder_path_key in ['JOB_DESC_FOLDER', 'ORIGINAL_RESUME_FOLDER', 'PARSED_DATA_FOLDER']:
+    for folder_path_key in ['JOB_DESC_FOLDER', 'ORIGINAL_RESUME_FOLDER', 'UPLOAD_JOBS_FOLDER']:
         folder_path = app.config.get(folder_path_key)
         if folder_path:
              try:
@@ -169,20 +79,33 @@ def create_app(test_config=None):
         else:
             app.logger.error(f"Configuration key {folder_path_key} not found!")
 
+    phase_start = _end_startup_phase(app, "directories", phase_start)
+
+    # --- Import Parsed Resumes Saved as JSON Files (one-time migration to the resume store) ---
+    try:
+        with app.app_context():
+            import_parsed_json_folder(app.config['RESUME_INDEX_PATH'], app.config['PARSED_DATA_FOLDER'])
+    except Exception as e:
+        app.logger.error(f"Could not import parsed resume JSON files into the resume store: {e}", exc_info=True)
+    phase_start = _end_startup_phase(app, "resume store", phase_start)
+
     # --- Initialize NLP Models and NLTK within App Context ---
     with app.app_context():
         app.logger.info("Initializing NLP resources...")
-        # Load spaCy Model
-        load_spacy_model_on_demand(
-            app,
-            app.config['NLP_MODEL_NAME'],
-            app.config['NLP_MODEL_VERSION']
-        )
-        # Initialize NLTK
-        nltk_ready = utils.initialize_nltk()
+        # spaCy is loaded on first use by parse_resume_text (or by /admin/warmup), so routes that
+        # don't parse resumes start serving right away. With NLP_PRELOAD it is loaded here instead,
+        # e.g. for 'gunicorn --preload', where forked workers then share the model's memory pages.
+        if app.config.get('NLP_PRELOAD'):
+            get_nlp_model(app)
+            phase_start = _end_startup_phase(app, "spacy model", phase_start)
+        # Initialize NLTK (from the offline NLP bundle if NLP_BUNDLE_PATH is set)
+        nltk_ready = utils.initialize_nltk(app.config.get('NLP_BUNDLE_PATH'))
         app.config['NLTK_READY'] = nltk_ready # Store status if needed
         app.logger.info(f"NLTK initialization status: {'OK' if nltk_ready else 'FAILED'}")
+        utils.configure_lemma_cache(app.config.get('LEMMA_CACHE_SIZE', config.LEMMA_CACHE_SIZE), app.config.get('LEMMA_CACHE_PATH'),
+                                    app.config.get('LEMMA_CACHE_SAVE_INTERVAL', config.LEMMA_CACHE_SAVE_INTERVAL))
         app.logger.info("NLP resources initialization attempt complete.")
+    phase_start = _end_startup_phase(app, "nltk", phase_start)
 
     # --- Register Blueprints ---
     app.logger.info("Registering blueprints...")
@@ -196,17 +119,34 @@ def create_app(test_config=None):
     def health_check():
         """Basic health check endpoint."""
         app.logger.debug("Health check endpoint '/health' accessed.")
-        spacy_model = app.config.get('NLP_MODEL')
-        spacy_status = "Loaded" if spacy_model else "Failed/Unavailable"
+        spacy_status = nlp_model_status(app) # Never triggers a model load
         nltk_status = "Ready" if app.config.get('NLTK_READY') else "Failed/Unavailable"
 
         return jsonify({
             "status": "ok",
             "message": "ATS Backend is running",
             "spacy_model": f"{app.config.get('NLP_MODEL_NAME', 'N/A')} ({spacy_status})",
-            "nltk_status": nltk_status
+            "nltk_status": nltk_status,
+            "lemma_cache": utils.lemma_cache_stats()
         }), 200
 
+    # --- Warm-up Route ---
+    @app.route('/admin/warmup', methods=['GET', 'POST'])
+    def warmup():
+        """
+        Loads the spaCy model now instead of on the first resume parse, e.g. from a readiness
+        probe or right after a deploy. Returns 503 if the model could not be loaded.
+        """
+        app.logger.info("Warm-up endpoint '/admin/warmup' accessed.")
+        start_time = time.perf_counter()
+        nlp_model = get_nlp_model(app)
+        duration = round(time.perf_counter() - start_time, 3)
+        return jsonify({
+            "status": "ok" if nlp_model else "error",
+            "spacy_model": f"{app.config.get('NLP_MODEL_NAME', 'N/A')} ({nlp_model_status(app)})",
+            "duration_seconds": duration
+        }), 200 if nlp_model else 503
+
     # --- Error Handlers ---
     @app.errorhandler(404)
     def not_found(error):
@@ -231,5 +171,6 @@ def create_app(test_config=None):
         app.logger.warning(f"400 Bad Request: {request.path} - {description}")
         return jsonify({"error": "Bad Request", "message": description}), 400
 
-    app.logger.info("--- Flask App Creation Complete ---")
+    _end_startup_phase(app, "routes", phase_start)
+    app.logger.info(f"--- Flask App Creation Complete ({sum(app.config['STARTUP_PHASE_SECONDS'].values()) * 1000:.1f} ms) ---")
     return app
\ No newline at end of file
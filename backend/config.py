@@ -20,18 +20,105 @@ TMP_DATA_DIR = "/tmp/ats_data" # Base directory within /tmp for this app's data
 # Ensure these directory creation attempts happen in create_app() in __init__.py
 JOB_DESC_FOLDER = os.path.join(TMP_DATA_DIR, 'job_descriptions')
 ORIGINAL_RESUME_FOLDER = os.path.join(TMP_DATA_DIR, 'resumes_original')
+# Former one-JSON-per-resume storage: imported once into the resume store (RESUME_INDEX_PATH) at startup
 PARSED_DATA_FOLDER = os.path.join(TMP_DATA_DIR, 'resumes_parsed')
+UPLOAD_JOBS_FOLDER = os.path.join(TMP_DATA_DIR, 'upload_jobs') # Status files of background upload jobs
+# SQLite resume store: parsed resumes plus the index of their keyword sets, built once at
+# upload time and read by /scan/batch
+RESUME_INDEX_PATH = os.path.join(TMP_DATA_DIR, 'resume_index.sqlite3')
+# Append-only, compressed store of each resume's extracted text (kept out of the parsed JSON);
+# read by /scan/batch to index resumes missing from the keyword index
+RAW_TEXT_STORE_PATH = os.path.join(TMP_DATA_DIR, 'raw_text.seg')
 
 # --- File Upload Settings ---
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
 MAX_FILE_SIZE = 15 * 1024 * 1024 # 15MB limit
+# Text extraction budget per PDF: the resume signal is on the first pages, and some uploads are
+# long portfolios. None disables a limit.
+PDF_MAX_PAGES = 20
+PDF_MAX_CHARS = 100_000
+# Off by default (None): PDFs with at least this many pages (within PDF_MAX_PAGES) are split into
+# page ranges extracted concurrently in a separate pool of PyMuPDF-only worker processes, one range
+# per worker. Only worth it for long documents and a raised PDF_MAX_PAGES: see
+# tests/bench_pdf_page_ranges.py for the break-even on your hardware.
+PDF_PARALLEL_PAGE_THRESHOLD = None
+PDF_PARALLEL_WORKERS = None # None -> one worker per CPU core
+
+# --- Upload Parsing Settings ---
+# "inline": parse files one by one inside the request (default).
+# "process": parse the files of a multi-file upload concurrently in a pool of worker
+#            processes; each worker loads the spaCy model and NLTK data once.
+UPLOAD_PARSE_MODE = "inline"
+UPLOAD_PARSE_WORKERS = None # None -> one worker per CPU core
+# multiprocessing start method for the worker pool. With "spawn" (and "forkserver"), every worker
+# re-imports the launching script as '__mp_main__', so that script must not build the app at
+# import time there (see the guard in wsgi.py), or each worker would run create_app() and load
+# spaCy/NLTK twice. Avoid "fork": the server process may be multi-threaded.
+UPLOAD_PARSE_START_METHOD = "spawn"
+UPLOAD_PERSIST_WORKERS = 4 # Threads writing uploaded originals to disk while their text is extracted from memory
+UPLOAD_JOB_WORKERS = 2 # Background threads running mode=job uploads (local queue, no broker)
+UPLOAD_JOB_TTL_SECONDS = 24 * 60 * 60 # Job status files older than this are deleted when a new job is created
+# A queued/running job whose status file hasn't been updated for this long is reported as failed
+# (e.g. its server worker was recycled mid-run). Must exceed the time needed to parse one file.
+UPLOAD_JOB_STALE_SECONDS = 15 * 60
+# Uploads are hashed (SHA-256 of the file bytes) on receipt; a file already parsed before is
+# answered from its stored parse (flagged 'cache_hit') instead of being saved and parsed again.
+UPLOAD_DEDUP_ENABLED = True
+
+# --- Scan Settings ---
+# How /scan/batch extracts keywords for resumes missing from the keyword index:
+# "inline" in the request, or "process" split into chunks across the worker pool above.
+SCAN_EXECUTION_MODE = "inline"
+SCAN_CHUNK_SIZE = 50 # Resumes per worker task in "process" mode
+# Default ranking when a /scan/batch request has no 'scoring' field: "overlap" (share of JD
+# keywords found in the resume), "tfidf" or "bm25" (rare JD keywords weigh more)
+SCAN_DEFAULT_SCORING = "overlap"
+BM25_K1 = 1.2 # BM25 term-frequency saturation
+BM25_B = 0.75 # BM25 document-length normalization (0 = none, 1 = full)
+SCAN_MATRIX_MAX_JDS = 20 # Job descriptions accepted per /scan/matrix request
+SCAN_MATRIX_DEFAULT_TOP_K = 10 # Candidates listed per JD by /scan/matrix unless 'top_k' is given
+# /scan/batch requests with 'Accept: application/x-ndjson' get their results streamed as this many
+# resumes at a time are scored (requests with 'top_k' get a snapshot of the current top K instead)
+SCAN_STREAM_CHUNK_SIZE = 500
 
 # --- NLP Model Settings ---
+# Load the spaCy model in create_app instead of on the first resume parse. Enable it when the
+# app is created once and forked (gunicorn --preload), so workers share the loaded model.
+NLP_PRELOAD = False
 NLP_MODEL_NAME = "en_core_web_sm"
 # **ADJUST THIS VERSION TO MATCH YOUR SPACY INSTALLATION ON THE SERVER**
 # Find compatible versions: https://github.com/explosion/spacy-models/releases
 # Check Render/Vercel build logs for installed spacy version if unsure.
 NLP_MODEL_VERSION = "3.7.0" # Example - CHANGE AS NEEDED
+# Only name extraction uses spaCy, so only NER (plus any embedding layer it shares) is loaded.
+# An empty list loads the full pipeline.
+NLP_PIPELINE_COMPONENTS = ["ner"]
+NLP_PIPE_BATCH_SIZE = 32 # Name chunks per nlp.pipe batch when a whole upload is parsed together
+# Directory built by 'python -m backend.nlp_bundle build'. When set, the spaCy model, NLTK data,
+# stop words and lemma table are loaded from it, with no network access or download checks.
+NLP_BUNDLE_PATH = None
+# NLTK data packages keyword extraction needs: (resource path, package id), as of nltk 3.9
+NLTK_DATA_PACKAGES = [
+    ('tokenizers/punkt_tab', 'punkt_tab'), # nltk.word_tokenize
+    ('corpora/stopwords', 'stopwords'),
+    ('corpora/wordnet', 'wordnet'),
+    ('corpora/omw-1.4', 'omw-1.4'), # Needed by WordNetLemmatizer
+    ('taggers/averaged_perceptron_tagger_eng', 'averaged_perceptron_tagger_eng'), # nltk.pos_tag
+]
+
+# --- Keyword Matching Settings ---
+# Number of job descriptions whose extracted keyword sets are kept in memory (LRU, keyed by file + mtime)
+JD_KEYWORD_CACHE_SIZE = 32
+# Keep the resumes matching each JD keyword set (overlap scoring) in the resume index, so a re-scan
+# only scores resumes added or re-indexed since (see resume_index.score_keyword_matches_cached)
+SCAN_RESULT_CACHE_ENABLED = True
+# Tokens POS-tagged per nltk.pos_tag call; bounds keyword extraction memory on long resumes
+KEYWORD_TAG_WINDOW = 1000
+# (token, POS class) -> lemma entries kept in memory (LRU); 0 disables the cache
+LEMMA_CACHE_SIZE = 100_000
+# File the lemma cache is saved to and reloaded from between restarts (None: memory only)
+LEMMA_CACHE_PATH = None
+LEMMA_CACHE_SAVE_INTERVAL = 1000 # New entries between periodic saves
 
 # --- CORS Settings ---
 # IMPORTANT: In production, restrict origins STRICTLY to your frontend URL(s)
@@ -45,8 +132,31 @@ ALLOWED_ORIGINS = [
 
 # --- Regex Patterns ---
 EMAIL_REGEX = r'[\w\.-]+@[\w\.-]+\.\w+'
-# Refined phone regex to handle common formats and avoid false positives like years
-PHONE_REGEX = r'(?:(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{1,4}\)?[-.\s]?)|(?:\d{1,4}[-.\s]?)){1,}\d{3,4}[-.\s]?\d{3,4}(?:\s*(?:ext|x|extension)\.?\s*\d+)?'
+# Refined phone regex to handle common formats and avoid false positives like years.
+# Written so every character of the prefix has exactly one way to be consumed: the old
+# nested `(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{1,4}\)?[-.\s]?)...{1,}` form backtracked
+# exponentially on runs like "12 12 12 ... x". Matches are the same, except that a number
+# directly following another one (e.g. "+1 ..." after a phone, or digits right after an
+# "ext. 12") is no longer split off as a separate match.
+# A verbose pattern: compile it with re.VERBOSE (or embed it as `(?x:...)`).
+PHONE_REGEX = r"""
+    # Only start where a number run starts: not right after a digit, nor after a digit or
+    # 'digit)' followed by a single separator and/or '+'
+    (?<!\d)(?<!\d[-.\s+)])(?<!\d\)[-.\s+])(?<!\d[-.\s]\+)(?<!\d\)[-.\s]\+)
+    (?:
+        \+\d(?:\d|[-.\s]\(?\d|\(\d)   # Country code '+' (also right after '(', as in '(+91) ...')
+      | (?<!\()\(?\d                     # Or a digit, with its '(' if any
+    )
+    (?:                                  # Then, one character at a time:
+        \d                              #   digits,
+      | \+\d(?:\d|[-.\s]\(?\d|\(\d)    #   a '+' code,
+      | \(\d                            #   an opening '(' before a digit,
+      | (?<=\d)\)                        #   a closing ')' after one,
+      | (?<=[\d)])[-.\s](?=[\d(+])       #   or a single separator between two parts
+    )*
+    \d{3,4}[-.\s]?\d{3,4}                # Subscriber number
+    (?:\s*(?:ext|x|extension)\.?\s*\d+)?  # and extension
+"""
 GITHUB_REGEX = r'(?:https?://)?(?:www\.)?github\.com/[\w\.-]+/?'
 LINKEDIN_REGEX = r'(?:https?://)?(?:www\.)?linkedin\.com/(?:in|pub|company)/[\w\-\._~:/?#[\]@!$&\'\(\)\*\+,;=]+/?'
 
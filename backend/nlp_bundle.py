@@ -0,0 +1,273 @@
+# backend/nlp_bundle.py
+# -*- coding: utf-8 -*-
+"""
+Offline NLP asset bundle: one versioned directory with everything the app would otherwise
+download at startup (the spaCy model, the NLTK data packages) plus the precomputed stop-word
+set and lemma table. Built once at build time, where network access is available:
+
+    python -m backend.nlp_bundle build --output /opt/ats/nlp_bundle [--model-path DIR] [--vocabulary PATH ...]
+
+and loaded by setting NLP_BUNDLE_PATH, after which startup never checks for or downloads
+anything (see nlp_model.get_nlp_model_path and utils.initialize_nltk).
+"""
+import os
+import sys
+import gzip
+import json
+import shutil
+import hashlib
+import logging
+import argparse
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# --- Relative Imports ---
+from . import config
+
+# --- Setup Logger ---
+logger = logging.getLogger(__name__)
+
+# --- Bundle Layout ---
+# Bumped whenever the layout or a file format changes; the app refuses bundles of another format
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILENAME = "manifest.json"
+_SPACY_MODEL_DIR = "spacy_model"
+_NLTK_DATA_DIR = "nltk_data"
+_STOP_WORDS_FILENAME = "stop_words.txt"
+_LEMMA_TABLE_FILENAME = "lemma_table.json.gz"
+_WORDNET_POS = ("n", "v", "a", "r") # The POS classes utils.preprocess_and_extract_keywords_nltk lemmatizes with
+
+
+# --- Loading (runtime) ---
+def load_bundle_manifest(bundle_path: str) -> Dict[str, Any]:
+    """
+    Reads and checks a bundle's manifest. Raises ValueError if the directory is not a
+    bundle of the supported format or misses one of its files.
+    """
+    manifest_path = os.path.join(bundle_path, MANIFEST_FILENAME)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"No readable NLP bundle manifest at '{manifest_path}': {e}") from e
+    if manifest.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"NLP bundle '{bundle_path}' has format {manifest.get('format_version')!r}, "
+                         f"expected {BUNDLE_FORMAT_VERSION}. Rebuild it with 'python -m backend.nlp_bundle build'.")
+    for relative_path in (manifest["spacy"]["path"], manifest["nltk"]["data_path"], manifest["stop_words"], manifest["lemma_table"]):
+        if not os.path.exists(os.path.join(bundle_path, relative_path)):
+            raise ValueError(f"NLP bundle '{bundle_path}' is incomplete: '{relative_path}' is missing.")
+    return manifest
+
+
+def bundle_spacy_model_path(bundle_path: str, manifest: Dict[str, Any]) -> str:
+    return os.path.join(bundle_path, manifest["spacy"]["path"])
+
+
+def bundle_nltk_data_path(bundle_path: str, manifest: Dict[str, Any]) -> str:
+    return os.path.join(bundle_path, manifest["nltk"]["data_path"])
+
+
+def read_bundle_stop_words(bundle_path: str, manifest: Dict[str, Any]) -> Set[str]:
+    """Returns the precomputed stop-word set (NLTK English stop words plus config.custom_stops)."""
+    with open(os.path.join(bundle_path, manifest["stop_words"]), "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def read_bundle_lemma_table(bundle_path: str, manifest: Dict[str, Any]) -> Dict[Tuple[str, str], str]:
+    """Returns the precomputed lemmas as {(word, WordNet POS): lemma}."""
+    return read_lemma_file(os.path.join(bundle_path, manifest["lemma_table"]))
+
+
+# --- Lemma Files ---
+# Gzipped JSON {pos: {word: lemma}}; used for the bundle's lemma table and the persisted lemma cache
+def read_lemma_file(path: str) -> Dict[Tuple[str, str], str]:
+    """Reads a lemma file as {(word, WordNet POS): lemma}."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        table = json.load(f)
+    return {(word, pos): lemma for pos, lemmas in table.items() for word, lemma in lemmas.items()}
+
+
+def write_lemma_file(path: str, lemmas: Dict[Tuple[str, str], str]) -> None:
+    """
+    Writes {(word, WordNet POS): lemma} as a lemma file, atomically (readers and other processes
+    writing the same file see either the old or the new version). Byte-identical for equal input.
+    """
+    table: Dict[str, Dict[str, str]] = {}
+    for (word, pos), lemma in lemmas.items():
+        table.setdefault(pos, {})[word] = lemma
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=".lemmas_", dir=directory)
+    try:
+        # mtime=0 keeps the gzip header, and so a bundle's id, the same for the same contents
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as f:
+            f.write(json.dumps(table, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+# --- Building (build time) ---
+def build_bundle(output_dir: str, model_path: Optional[str] = None, vocabulary_paths: Iterable[str] = (),
+                 nltk_packages: Optional[List[Tuple[str, str]]] = None,
+                 components: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Builds a bundle into output_dir (replaced if it exists) and returns its manifest.
+    model_path: an installed spaCy model directory (default: the NLP_MODEL_NAME package).
+    vocabulary_paths: text files or directories of .txt files whose words get precomputed lemmas.
+    nltk_packages: (resource path, package id) pairs to pack (default: config.NLTK_DATA_PACKAGES);
+    they must already be installed, e.g. with 'python -m nltk.downloader'.
+    components: spaCy pipeline components to keep (default: config.NLP_PIPELINE_COMPONENTS).
+    """
+    import nltk
+    import spacy
+    from .nlp_model import load_spacy_pipeline
+
+    nltk_packages = config.NLTK_DATA_PACKAGES if nltk_packages is None else nltk_packages
+    components = config.NLP_PIPELINE_COMPONENTS if components is None else components
+    if not model_path:
+        if not spacy.util.is_package(config.NLP_MODEL_NAME):
+            raise ValueError(f"spaCy model '{config.NLP_MODEL_NAME}' is not installed. Pass --model-path or install it "
+                             f"first: python -m spacy download {config.NLP_MODEL_NAME}")
+        model_path = spacy.util.get_package_path(config.NLP_MODEL_NAME)
+
+    # Build next to the target and swap it in at the end, so a failed build leaves the old bundle intact
+    parent_dir = os.path.dirname(os.path.abspath(output_dir))
+    os.makedirs(parent_dir, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(prefix=".nlp_bundle_", dir=parent_dir)
+    try:
+        # spaCy model, trimmed to the components the app uses
+        nlp = load_spacy_pipeline(str(model_path), components)
+        nlp.to_disk(os.path.join(staging_dir, _SPACY_MODEL_DIR))
+        logger.info(f"Packed spaCy model {nlp.meta.get('name')} {nlp.meta.get('version')} (pipeline: {nlp.pipe_names}).")
+
+        # NLTK data packages, in the nltk_data layout (directories or zip files)
+        for resource_path, package_id in nltk_packages:
+            _copy_nltk_resource(nltk, resource_path, package_id, os.path.join(staging_dir, _NLTK_DATA_DIR))
+        logger.info(f"Packed {len(nltk_packages)} NLTK data package(s).")
+
+        # Stop words, with the same source as utils.initialize_nltk. A reader of its own: the shared
+        # nltk.corpus.stopwords loader would keep pointing at wherever it was first loaded from.
+        stopwords_reader = nltk.corpus.reader.WordListCorpusReader(nltk.data.find('corpora/stopwords'), ['english'])
+        stop_words = set(stopwords_reader.words('english')).union(config.custom_stops)
+        lemma_table = _build_lemma_table(nltk, _read_vocabulary(vocabulary_paths, stop_words))
+        with open(os.path.join(staging_dir, _STOP_WORDS_FILENAME), "w", encoding="utf-8") as f:
+            f.write("\n".join(sorted(stop_words)) + "\n")
+        write_lemma_file(os.path.join(staging_dir, _LEMMA_TABLE_FILENAME), lemma_table)
+        logger.info(f"Packed {len(stop_words)} stop words and lemmas for {len(lemma_table)} (word, POS) pairs.")
+
+        manifest = {
+            "format_version": BUNDLE_FORMAT_VERSION,
+            "bundle_id": _content_hash(staging_dir),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "spacy": {
+                "version": spacy.__version__,
+                "model": f"{nlp.meta.get('lang')}_{nlp.meta.get('name')}-{nlp.meta.get('version')}",
+                "components": nlp.pipe_names,
+                "path": _SPACY_MODEL_DIR,
+            },
+            "nltk": {
+                "version": nltk.__version__,
+                "packages": [package_id for _, package_id in nltk_packages],
+                "data_path": _NLTK_DATA_DIR,
+            },
+            "stop_words": _STOP_WORDS_FILENAME,
+            "lemma_table": _LEMMA_TABLE_FILENAME,
+        }
+        with open(os.path.join(staging_dir, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        if os.path.exists(output_dir):
+            shutil.rmtree(output_dir)
+        os.replace(staging_dir, output_dir)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    logger.info(f"NLP bundle {manifest['bundle_id']} written to {output_dir}.")
+    return manifest
+
+
+def _copy_nltk_resource(nltk, resource_path: str, package_id: str, nltk_data_dir: str) -> None:
+    """Copies one installed NLTK data package (a directory or a zip) into nltk_data_dir."""
+    try:
+        pointer = nltk.data.find(resource_path)
+    except LookupError as e:
+        raise ValueError(f"NLTK data package '{package_id}' is not installed. "
+                         f"Install it first: python -m nltk.downloader {package_id}") from e
+    zip_file = getattr(pointer, "zipfile", None)
+    if zip_file is not None:
+        target = os.path.join(nltk_data_dir, os.path.dirname(resource_path), os.path.basename(zip_file.filename))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(zip_file.filename, target)
+    else:
+        source = pointer.path
+        target = os.path.join(nltk_data_dir, resource_path)
+        if os.path.isdir(source):
+            shutil.copytree(source, target)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(source, target)
+
+
+def _read_vocabulary(vocabulary_paths: Iterable[str], stop_words: Set[str]) -> Set[str]:
+    """
+    Collects the keyword tokens of the given text files (and the .txt files of given directories),
+    tokenized by utils.iter_keyword_tokens exactly as resumes and JDs are.
+    """
+    from .utils import iter_keyword_tokens # Imported here: utils imports this module
+    words: Set[str] = set()
+    for path in vocabulary_paths:
+        file_paths = [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".txt")] if os.path.isdir(path) else [path]
+        for file_path in file_paths:
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                words.update(iter_keyword_tokens(f.read(), stop_words))
+    return words
+
+
+def _build_lemma_table(nltk, vocabulary: Set[str]) -> Dict[Tuple[str, str], str]:
+    """Lemmatizes every vocabulary word in each WordNet POS class: {(word, pos): lemma}."""
+    lemmatizer = nltk.stem.WordNetLemmatizer()
+    words = sorted(vocabulary)
+    return {(word, pos): lemmatizer.lemmatize(word, pos=pos) for pos in _WORDNET_POS for word in words}
+
+
+def _content_hash(directory: str) -> str:
+    """Short hash over the relative paths and contents of all files: the bundle's version id."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            digest.update(os.path.relpath(file_path, directory).encode("utf-8"))
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+# --- Command Line ---
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.nlp_bundle", description="Build the offline NLP asset bundle.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    build = subcommands.add_parser("build", help="Pack the spaCy model, NLTK data, stop words and lemma table.")
+    build.add_argument("--output", required=True, help="Bundle directory to create (replaced if it exists).")
+    build.add_argument("--model-path", help=f"Installed spaCy model directory (default: the '{config.NLP_MODEL_NAME}' package).")
+    build.add_argument("--vocabulary", nargs="*", default=[os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_descriptions")],
+                       help="Text files or directories of .txt files to precompute lemmas for (default: the bundled job descriptions).")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    try:
+        manifest = build_bundle(args.output, model_path=args.model_path, vocabulary_paths=args.vocabulary)
+    except (ValueError, OSError) as e:
+        logger.error(f"Could not build the NLP bundle: {e}")
+        return 1
+    print(json.dumps(manifest, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+# backend/nlp_model.py
+# -*- coding: utf-8 -*-
+import os
+import sys
+import time
+import logging
+import threading
+import subprocess
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from flask import current_app
+
+# --- Relative Imports ---
+from .nlp_bundle import load_bundle_manifest, bundle_spacy_model_path
+
+if TYPE_CHECKING:
+    import spacy
+
+# --- Setup Logger ---
+# Fallback logger for use outside the Flask app context
+logger = logging.getLogger(__name__)
+
+# --- Lazy Loading State ---
+# The model is loaded on first use (see get_nlp_model), not in create_app, so routes that never
+# parse a resume don't pay for it. One lock guards both steps: concurrent first requests wait for
+# a single download/load instead of racing each other.
+_nlp_model_lock = threading.Lock()
+
+# Factories of the shared embedding components other components can listen to
+_EMBEDDING_FACTORIES = ("tok2vec", "transformer")
+
+
+# --- spaCy Model Loading Logic ---
+def install_spacy_model_on_demand(app, model_name, model_version) -> Optional[str]:
+    """
+    Makes sure the spaCy model is installed under /tmp, downloading it with pip if needed.
+    Returns the directory spacy.load() needs, or None if the model could not be installed.
+    """
+    # Define paths and URL using model name and version
+    tmp_model_base_path = "/tmp/spacy_models" # Base dir in tmp for models
+    tmp_model_path = os.path.join(tmp_model_base_path, model_name) # Path for specific model
+    full_model_name_version = f"{model_name}-{model_version}"
+    model_load_path = os.path.join(tmp_model_path, model_name, full_model_name_version) # Expected installed path
+    model_url = f"https://github.com/explosion/spacy-models/releases/download/{full_model_name_version}/{full_model_name_version}-py3-none-any.whl"
+
+    try:
+        # Ensure base /tmp directory for models exists
+        os.makedirs(tmp_model_base_path, exist_ok=True)
+
+        # Check if model seems correctly installed in the target /tmp location
+        if os.path.exists(os.path.join(model_load_path, "meta.json")):
+            app.logger.info(f"spaCy model found at expected path: {model_load_path}")
+            return model_load_path
+
+        app.logger.info(f"Model not found in {model_load_path}. Attempting download from {model_url}...")
+
+        # Use pip to install the model wheel directly into the target subdirectory
+        # --target installs into the specified dir, creating package structure needed by spacy.load
+        pip_command = [
+            sys.executable, "-m", "pip", "install",
+            "--target", tmp_model_path, # Install *into* /tmp/spacy_models/en_core_web_sm/
+            "--no-deps",
+            model_url
+        ]
+        app.logger.info(f"Executing: {' '.join(pip_command)}")
+        result = subprocess.run(pip_command, check=True, capture_output=True, text=True)
+        app.logger.debug(f"Pip install stdout:\n{result.stdout}")
+        if result.stderr:
+             app.logger.warning(f"Pip install stderr:\n{result.stderr}") # Log stderr as warning
+
+        app.logger.info(f"Model downloaded and installed to {tmp_model_path}. Verifying installation...")
+
+        # Verify the expected directory structure was created by pip install --target
+        if not os.path.exists(os.path.join(model_load_path, "meta.json")):
+             # Log contents of tmp_model_path for debugging if structure is wrong
+             app.logger.error(f"Model directory structure not found as expected at {model_load_path} after install.")
+             try:
+                 dir_contents = os.listdir(tmp_model_path)
+                 app.logger.error(f"Contents of {tmp_model_path}: {dir_contents}")
+                 # Attempt to find the correct subdir if possible (less reliable)
+                 found_path = None
+                 for item in dir_contents:
+                     potential_path = os.path.join(tmp_model_path, item)
+                     if os.path.isdir(potential_path) and os.path.exists(os.path.join(potential_path, "meta.json")):
+                          # Check if it contains the model name and version
+                          if model_name in item and model_version in item:
+                               model_load_path = potential_path
+                               found_path = True
+                               app.logger.warning(f"Found model data in unexpected subdirectory: {model_load_path}.")
+                               break
+                 if not found_path:
+                      raise OSError(f"Could not locate spaCy model data directory within {tmp_model_path}")
+
+             except Exception as list_err:
+                 app.logger.error(f"Could not list directory {tmp_model_path} to debug: {list_err}")
+                 raise OSError(f"Could not find spaCy model data directory within {tmp_model_path} after install.")
+        return model_load_path
+
+    except subprocess.CalledProcessError as e:
+        app.logger.critical(f"CRITICAL ERROR: Failed to download/install spaCy model using pip: {e}")
+        app.logger.critical(f"Command attempted: {' '.join(e.cmd)}")
+        app.logger.critical(f"Pip stdout:\n{e.stdout}")
+        app.logger.critical(f"Pip stderr:\n{e.stderr}")
+        app.logger.critical("Check model URL/version, network connectivity, and /tmp permissions/space.")
+    except Exception as e:
+        app.logger.critical(f"CRITICAL ERROR: An unexpected error occurred installing spaCy model: {e}", exc_info=True)
+    return None
+
+
+def load_spacy_model_on_demand(app, model_name, model_version):
+    """
+    Loads the spaCy model (installing it into /tmp first if needed). Caches in app.config.
+    Now uses app.logger for logging.
+    """
+    if app.config.get('NLP_MODEL') is not None:
+        app.logger.info("spaCy model already loaded in memory.")
+        return app.config['NLP_MODEL']
+
+    app.logger.info(f"--- Loading spaCy Model On-Demand: {model_name} v{model_version} ---")
+    nlp_instance = None
+    model_load_path = get_nlp_model_path(app)
+    if model_load_path:
+        try:
+            app.logger.info(f"Loading model from: {model_load_path}...")
+            nlp_instance = load_spacy_pipeline(model_load_path, app.config.get('NLP_PIPELINE_COMPONENTS'))
+            app.logger.info(f"Model loaded successfully (pipeline: {', '.join(nlp_instance.pipe_names) or 'tokenizer only'}).")
+        except OSError as e:
+            app.logger.critical(f"CRITICAL ERROR: Failed to load spaCy model from {model_load_path} (OSError): {e}", exc_info=True)
+            nlp_instance = None
+        except Exception as e:
+            app.logger.critical(f"CRITICAL ERROR: An unexpected error occurred loading spaCy model: {e}", exc_info=True)
+            nlp_instance = None
+
+    # Cache the result (even if None)
+    app.config['NLP_MODEL'] = nlp_instance
+
+    if not nlp_instance:
+        app.logger.error("!!! NER capabilities might be limited due to spaCy model load failure!!!")
+
+    app.logger.info("--- spaCy Model Loading Process Complete ---")
+    return nlp_instance
+
+
+def load_spacy_pipeline(model_path: str, components: Optional[Iterable[str]] = None) -> "spacy.language.Language":
+    """
+    Loads a spaCy model with only the given pipeline components (None or empty: all of them).
+    Components the kept ones depend on are kept too: a NER that listens to a shared tok2vec
+    would otherwise run without error on all-zero features. Excluded components are never
+    loaded, so they cost neither time nor memory.
+    """
+    import spacy # Deferred: importing spaCy alone takes most of a second
+    if not components:
+        return spacy.load(model_path)
+    model_config = spacy.util.load_config(os.path.join(model_path, "config.cfg"))
+    pipeline_config = model_config["components"]
+    keep = set(components)
+    for name in components:
+        for upstream in _listener_upstreams(pipeline_config.get(name, {})):
+            if upstream == "*": # Listens to any embedding component
+                keep.update(other for other, other_config in pipeline_config.items()
+                            if other_config.get("factory") in _EMBEDDING_FACTORIES)
+            else:
+                keep.add(upstream)
+    exclude = [name for name in model_config["nlp"]["pipeline"] if name not in keep]
+    return spacy.load(model_path, exclude=exclude)
+
+
+def _listener_upstreams(component_config) -> Iterator[str]:
+    """Yields the 'upstream' of every listener layer (e.g. spacy.Tok2VecListener.v1) in a component config."""
+    if isinstance(component_config, dict):
+        if "Listener" in str(component_config.get("@architectures", "")):
+            yield component_config.get("upstream", "*")
+        for value in component_config.values():
+            yield from _listener_upstreams(value)
+    elif isinstance(component_config, (list, tuple)):
+        for value in component_config:
+            yield from _listener_upstreams(value)
+
+
+def _bundle_model_path(app, bundle_path: str) -> Optional[str]:
+    """Returns the spaCy model directory of an NLP bundle, or None if the bundle is unusable."""
+    try:
+        manifest = load_bundle_manifest(bundle_path)
+    except ValueError as e:
+        app.logger.critical(f"CRITICAL ERROR: Cannot use the NLP bundle for the spaCy model: {e}")
+        return None
+    app.logger.info(f"Using spaCy model {manifest['spacy']['model']} from NLP bundle {manifest['bundle_id']}.")
+    return bundle_spacy_model_path(bundle_path, manifest)
+
+
+# --- Once-Guarded Accessors ---
+def get_nlp_model_path(app=None) -> Optional[str]:
+    """
+    Returns the directory of the installed spaCy model, installing it on the first call.
+    Parsing worker processes load the model from this path themselves, so the parent process
+    only needs the path, not the model.
+    """
+    app = app or current_app._get_current_object()
+    if not app.config.get('NLP_MODEL_PATH_RESOLVED'):
+        with _nlp_model_lock:
+            if not app.config.get('NLP_MODEL_PATH_RESOLVED'):
+                if app.config.get('NLP_BUNDLE_PATH'):
+                    # Offline bundle: no install check, no download
+                    app.config['NLP_MODEL_PATH'] = _bundle_model_path(app, app.config['NLP_BUNDLE_PATH'])
+                else:
+                    app.config['NLP_MODEL_PATH'] = install_spacy_model_on_demand(
+                        app, app.config['NLP_MODEL_NAME'], app.config['NLP_MODEL_VERSION'])
+                app.config['NLP_MODEL_PATH_RESOLVED'] = True
+    return app.config.get('NLP_MODEL_PATH')
+
+
+def get_nlp_model(app=None) -> Optional["spacy.language.Language"]:
+    """
+    Returns the app's spaCy model, loading it on the first call (thread-safe, once per app).
+    A failed load is not retried on every parse: the app keeps running without NER until
+    restarted, as it did when the model was loaded at startup.
+    """
+    app = app or current_app._get_current_object()
+    if not app.config.get('NLP_MODEL_LOADED'):
+        # Resolve the path before taking the lock: get_nlp_model_path takes it too
+        get_nlp_model_path(app)
+        with _nlp_model_lock:
+            if not app.config.get('NLP_MODEL_LOADED'):
+                start_time = time.perf_counter()
+                load_spacy_model_on_demand(app, app.config['NLP_MODEL_NAME'], app.config['NLP_MODEL_VERSION'])
+                app.config['NLP_MODEL_LOADED'] = True
+                app.logger.info(f"spaCy model ready in {time.perf_counter() - start_time:.2f}s.")
+    return app.config.get('NLP_MODEL')
+
+
+def nlp_model_status(app) -> str:
+    """Human-readable model state for /health and /admin/warmup."""
+    if not app.config.get('NLP_MODEL_LOADED'):
+        return "Not loaded yet"
+    return "Loaded" if app.config.get('NLP_MODEL') else "Failed/Unavailable"
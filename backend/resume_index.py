@@ -0,0 +1,593 @@
+# backend/resume_index.py
+# -*- coding: utf-8 -*-
+import os
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Use current_app from Flask to access the logger within request handlers
+from flask import current_app
+
+# --- Setup Logger ---
+# Fallback logger for use outside the Flask app context
+logger = logging.getLogger(__name__)
+
+# --- Schema ---
+# One row per parsed resume. Keywords are the lemmatized keyword set produced by
+# utils.preprocess_and_extract_keywords_nltk, stored as a single space-separated
+# string (lemmas never contain whitespace) to keep the index compact.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resume_keywords (
+    resume_id     TEXT PRIMARY KEY,   -- parsed JSON filename, e.g. name_20250416085310172064_parsed.json
+    keywords      TEXT NOT NULL,
+    indexed_at    REAL NOT NULL,
+    keyword_count INTEGER             -- document length for BM25 (added later: see _migrate_schema)
+);
+-- Inverted index: lemma -> posting list of resume IDs. Kept in sync by index_resume_keywords,
+-- so a scan only walks the postings of the JD's keywords instead of every resume.
+CREATE TABLE IF NOT EXISTS keyword_postings (
+    lemma       TEXT NOT NULL,
+    resume_id   TEXT NOT NULL,
+    PRIMARY KEY (lemma, resume_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_keyword_postings_resume ON keyword_postings (resume_id);
+-- Content-addressed upload cache: SHA-256 of an uploaded file's bytes -> the resume parsed from them,
+-- so re-uploads of the same file reuse the stored parse instead of creating a duplicate candidate.
+CREATE TABLE IF NOT EXISTS resume_content_hashes (
+    content_hash TEXT PRIMARY KEY,
+    resume_id    TEXT NOT NULL,
+    recorded_at  REAL NOT NULL
+);
+-- Parsed resume store (replaces one JSON file per resume): the fields every scan reports get
+-- their own columns, the rest of the parse is kept as one compact JSON document.
+CREATE TABLE IF NOT EXISTS resumes (
+    resume_id         TEXT PRIMARY KEY,   -- same ID as resume_keywords (the former JSON filename)
+    original_filename TEXT,
+    name              TEXT,
+    email             TEXT,
+    phone             TEXT,
+    parsed_data       TEXT NOT NULL,
+    stored_at         REAL NOT NULL
+);
+-- Incremental /scan/batch cache (overlap scoring): the resumes matching a JD keyword set with their
+-- scores, and how far the corpus has been scanned for it (the latest indexed_at seen). A re-scan only
+-- scores resumes indexed after that watermark; resumes that did not match get no row.
+CREATE TABLE IF NOT EXISTS scan_matches (
+    jd_hash    TEXT NOT NULL,   -- SHA-256 of the JD's keyword set
+    resume_id  TEXT NOT NULL,
+    score      REAL NOT NULL,
+    PRIMARY KEY (jd_hash, resume_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_scan_matches_resume ON scan_matches (resume_id);
+CREATE TABLE IF NOT EXISTS scan_watermarks (
+    jd_hash         TEXT PRIMARY KEY,
+    jd_name         TEXT NOT NULL,   -- a JD's previous keyword sets are dropped on its next scan
+    scorer_version  INTEGER NOT NULL,
+    indexed_through REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resume_keywords_indexed_at ON resume_keywords (indexed_at);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# SQLite's default limit on bound parameters is 999 on older builds; stay well below it
+_MAX_QUERY_PARAMS = 500
+
+# Scoring modes of score_keyword_matches (besides plain set overlap, see count_keyword_matches)
+WEIGHTED_SCORING_MODES = ("tfidf", "bm25")
+
+# Bump when the overlap scoring formula changes, so cached scan matches computed with the old one are dropped
+SCORER_VERSION = 1
+
+# Paths whose schema has already been ensured in this process
+_initialized_paths: Set[str] = set()
+
+
+# --- Connection Helper ---
+@contextmanager
+def _connect(db_path: str) -> Iterator[sqlite3.Connection]:
+    """
+    Opens a short-lived connection to the index database, ensuring the schema exists.
+    Commits on success, rolls back on error and always closes the connection.
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        if db_path not in _initialized_paths:
+            # WAL lets scans read while an upload in another worker is writing
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _migrate_schema(conn)
+            _backfill_postings(conn)
+            _initialized_paths.add(db_path)
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _migrate_schema(conn: sqlite3.Connection) -> None:
+    """Adds columns introduced after an index file was created."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(resume_keywords)")}
+    if "keyword_count" not in columns:
+        conn.execute("ALTER TABLE resume_keywords ADD COLUMN keyword_count INTEGER")
+    # Former scan cache (one row per JD and resume, matching or not), replaced by scan_matches
+    conn.execute("DROP TABLE IF EXISTS scan_results")
+
+
+def _backfill_postings(conn: sqlite3.Connection) -> None:
+    """Builds the posting lists (and keyword counts) for indexes created before they existed."""
+    if not conn.execute("SELECT 1 FROM keyword_postings LIMIT 1").fetchone():
+        rows = conn.execute("SELECT resume_id, keywords FROM resume_keywords").fetchall()
+        if rows:
+            logger.info(f"Building keyword posting lists for {len(rows)} previously indexed resumes...")
+            conn.executemany(
+                "INSERT OR IGNORE INTO keyword_postings (lemma, resume_id) VALUES (?, ?)",
+                ((lemma, resume_id) for resume_id, keywords in rows for lemma in _deserialize_keywords(keywords))
+            )
+    conn.execute(
+        "UPDATE resume_keywords SET keyword_count = "
+        "(SELECT COUNT(*) FROM keyword_postings p WHERE p.resume_id = resume_keywords.resume_id) "
+        "WHERE keyword_count IS NULL"
+    )
+
+
+def _serialize_keywords(keywords: Iterable[str]) -> str:
+    return " ".join(sorted(keywords))
+
+
+def _deserialize_keywords(value: Optional[str]) -> Set[str]:
+    return set(value.split()) if value else set()
+
+
+# --- Public API ---
+def index_resume_keywords(db_path: str, resume_id: str, keywords: Set[str]) -> None:
+    """
+    Stores (or replaces) the keyword set of a single resume.
+    Called once per resume at upload time so scans never have to re-run NLTK on resume text.
+    Raises ValueError for a missing keyword set: a failed extraction must leave the resume
+    unindexed, so /scan/batch retries it instead of treating it as matching nothing.
+    """
+    log = current_app.logger if current_app else logger
+    if keywords is None:
+        raise ValueError(f"No keyword set to index for resume '{resume_id}'.")
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    with _connect(db_path) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO resume_keywords (resume_id, keywords, indexed_at, keyword_count) VALUES (?, ?, ?, ?)",
+            (resume_id, _serialize_keywords(keywords), time.time(), len(keywords))
+        )
+        # Update the posting lists incrementally for this resume only
+        conn.execute("DELETE FROM keyword_postings WHERE resume_id = ?", (resume_id,))
+        conn.executemany(
+            "INSERT INTO keyword_postings (lemma, resume_id) VALUES (?, ?)",
+            ((lemma, resume_id) for lemma in keywords)
+        )
+    log.debug(f"Indexed {len(keywords)} keywords for resume '{resume_id}'.")
+
+
+def list_indexed_resume_ids(db_path: str) -> Set[str]:
+    """Returns the IDs of all resumes present in the index (without loading their keywords)."""
+    if not os.path.isfile(db_path):
+        return set()
+    with _connect(db_path) as conn:
+        rows = conn.execute("SELECT resume_id FROM resume_keywords").fetchall()
+    return {row[0] for row in rows}
+
+
+def count_keyword_matches(db_path: str, jd_keywords: Iterable[str]) -> Dict[str, int]:
+    """
+    Walks the posting lists of the given JD keywords and accumulates a match count per resume.
+    Resumes sharing no keyword with the JD are never touched, so the cost follows
+    JD vocabulary size times posting length rather than corpus size.
+    """
+    counts: Dict[str, int] = defaultdict(int)
+    jd_keyword_list = sorted(set(jd_keywords))
+    if not jd_keyword_list or not os.path.isfile(db_path):
+        return {}
+    with _connect(db_path) as conn:
+        for start in range(0, len(jd_keyword_list), _MAX_QUERY_PARAMS):
+            chunk = jd_keyword_list[start:start + _MAX_QUERY_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            for resume_id, match_count in conn.execute(
+                f"SELECT resume_id, COUNT(*) FROM keyword_postings WHERE lemma IN ({placeholders}) GROUP BY resume_id", chunk
+            ):
+                counts[resume_id] += match_count
+    return dict(counts)
+
+
+def score_keyword_matches(db_path: str, jd_keywords: Iterable[str], scoring: str = "tfidf",
+                          bm25_k1: float = 1.2, bm25_b: float = 0.75) -> Dict[str, float]:
+    """
+    Term-weighted alternative to count_keyword_matches: returns a 0-100 score per resume sharing
+    at least one keyword with the JD (see score_keyword_matrix for the weighting).
+    """
+    if scoring not in WEIGHTED_SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode '{scoring}'.")
+    return score_keyword_matrix(db_path, {"": jd_keywords}, scoring, bm25_k1, bm25_b).get("", {})
+
+
+def score_keyword_matrix(db_path: str, jd_keyword_sets: Dict[str, Iterable[str]], scoring: str = "overlap",
+                         bm25_k1: float = 1.2, bm25_b: float = 0.75) -> Dict[str, Dict[str, float]]:
+    """
+    Scores every indexed resume against several JDs at once. Returns {jd: {resume_id: 0-100 score}}
+    with only the resumes sharing at least one keyword with that JD.
+    The posting lists are the sparse resume x lemma matrix; the JDs become a sparse JD x lemma
+    weight matrix in a temporary table, and one join + GROUP BY over their postings computes the
+    product for the whole corpus. Keyword sets are binary (no term frequencies), so:
+      "overlap": share of the JD's keywords found in the resume (same as count_keyword_matches).
+      "tfidf":   sum of the matched lemmas' smoothed IDF, as a share of the JD's total IDF.
+      "bm25":    BM25 with tf = 1 (IDF times the length-normalized tf component, using each
+                 resume's keyword count), as a share of the JD's upper bound (a resume of length 0).
+    """
+    if scoring != "overlap" and scoring not in WEIGHTED_SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode '{scoring}'.")
+    jd_lemmas = {jd: set(keywords) for jd, keywords in jd_keyword_sets.items()}
+    matrix: Dict[str, Dict[str, float]] = {jd: {} for jd in jd_lemmas}
+    all_lemmas = sorted(set().union(*jd_lemmas.values()))
+    if not all_lemmas or not os.path.isfile(db_path):
+        return matrix
+    with _connect(db_path) as conn:
+        corpus = _lemma_weights(conn, all_lemmas, scoring)
+        if corpus is None:
+            return matrix
+        weights, average_length = corpus
+        max_scores = _fill_jd_weights(conn, jd_lemmas, weights, scoring, bm25_k1)
+        for jd, resume_id, score in _weighted_score_rows(conn, scoring, bm25_k1, bm25_b, average_length):
+            if max_scores[jd] > 0:
+                matrix[jd][resume_id] = round(score / max_scores[jd] * 100, 2)
+    return matrix
+
+
+def iter_keyword_scores(db_path: str, jd_keywords: Iterable[str], resume_ids: Iterable[str], scoring: str = "overlap",
+                        chunk_size: int = 500, bm25_k1: float = 1.2, bm25_b: float = 0.75) -> Iterator[Dict[str, float]]:
+    """
+    score_keyword_matrix for one JD, chunk_size resumes at a time: yields {resume_id: 0-100 score}
+    for each chunk of the given resumes (in ID order), with only the resumes sharing at least one
+    keyword with the JD. Weights are computed once for the whole corpus, so the scores equal
+    score_keyword_matrix's; each chunk only joins the postings of its own resumes.
+    """
+    if scoring != "overlap" and scoring not in WEIGHTED_SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode '{scoring}'.")
+    jd_keyword_list = sorted(set(jd_keywords))
+    resume_id_list = sorted(set(resume_ids))
+    if not jd_keyword_list or not resume_id_list or not os.path.isfile(db_path):
+        return
+    chunk_size = max(1, chunk_size)
+    with _connect(db_path) as conn:
+        if scoring == "overlap":
+            for start in range(0, len(resume_id_list), chunk_size):
+                counts = _count_keyword_matches_for(conn, jd_keyword_list, resume_id_list[start:start + chunk_size])
+                yield {resume_id: round(count / len(jd_keyword_list) * 100, 2) for resume_id, count in counts.items()}
+            return
+        corpus = _lemma_weights(conn, jd_keyword_list, scoring)
+        if corpus is None:
+            return
+        weights, average_length = corpus
+        max_score = _fill_jd_weights(conn, {"": jd_keyword_list}, weights, scoring, bm25_k1)[""]
+        for start in range(0, len(resume_id_list), chunk_size):
+            chunk = resume_id_list[start:start + chunk_size]
+            scores: Dict[str, float] = {}
+            for id_start in range(0, len(chunk), _MAX_QUERY_PARAMS):
+                for _, resume_id, score in _weighted_score_rows(conn, scoring, bm25_k1, bm25_b, average_length,
+                                                                chunk[id_start:id_start + _MAX_QUERY_PARAMS]):
+                    if max_score > 0:
+                        scores[resume_id] = round(score / max_score * 100, 2)
+            yield scores
+
+
+def _lemma_weights(conn: sqlite3.Connection, lemmas: List[str], scoring: str) -> Optional[Tuple[Dict[str, float], float]]:
+    """
+    Weight of each JD lemma for a scoring mode (see score_keyword_matrix) and the corpus' average
+    keyword count, or None if no resume is indexed.
+    """
+    total_resumes, average_length = conn.execute("SELECT COUNT(*), AVG(keyword_count) FROM resume_keywords").fetchone()
+    if not total_resumes:
+        return None
+    if scoring == "overlap":
+        return dict.fromkeys(lemmas, 1.0), average_length
+    # Document frequencies of the JDs' lemmas, read once from the posting lists' primary key
+    document_frequencies = dict.fromkeys(lemmas, 0)
+    for start in range(0, len(lemmas), _MAX_QUERY_PARAMS):
+        chunk = lemmas[start:start + _MAX_QUERY_PARAMS]
+        placeholders = ",".join("?" * len(chunk))
+        for lemma, frequency in conn.execute(
+            f"SELECT lemma, COUNT(*) FROM keyword_postings WHERE lemma IN ({placeholders}) GROUP BY lemma", chunk
+        ):
+            document_frequencies[lemma] = frequency
+    if scoring == "tfidf":
+        return {lemma: math.log((1 + total_resumes) / (1 + df)) + 1 for lemma, df in document_frequencies.items()}, average_length
+    return {lemma: math.log(1 + (total_resumes - df + 0.5) / (df + 0.5)) for lemma, df in document_frequencies.items()}, average_length
+
+
+def _fill_jd_weights(conn: sqlite3.Connection, jd_lemmas: Dict[str, Iterable[str]], weights: Dict[str, float],
+                     scoring: str, bm25_k1: float) -> Dict[str, float]:
+    """Loads the JD x lemma weight matrix into the jd_weights temp table; returns each JD's maximum raw score."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS jd_weights (jd TEXT NOT NULL, lemma TEXT NOT NULL, weight REAL NOT NULL, "
+                 "PRIMARY KEY (lemma, jd)) WITHOUT ROWID")
+    conn.execute("DELETE FROM jd_weights")
+    conn.executemany("INSERT INTO jd_weights (jd, lemma, weight) VALUES (?, ?, ?)",
+                     ((jd, lemma, weights[lemma]) for jd, lemmas in jd_lemmas.items() for lemma in lemmas))
+    max_scores = {jd: sum(weights[lemma] for lemma in lemmas) for jd, lemmas in jd_lemmas.items()}
+    if scoring == "bm25":
+        max_scores = {jd: max_score * (bm25_k1 + 1) for jd, max_score in max_scores.items()}
+    return max_scores
+
+
+def _weighted_score_rows(conn: sqlite3.Connection, scoring: str, bm25_k1: float, bm25_b: float, average_length: float,
+                         resume_ids: Optional[List[str]] = None) -> Iterable[Tuple[str, str, float]]:
+    """
+    Raw (jd, resume_id, score) rows of the jd_weights x postings product, for every resume or only
+    the given ones (at most _MAX_QUERY_PARAMS).
+    """
+    resume_filter, params = "", []
+    if resume_ids is not None:
+        resume_filter = f"WHERE p.resume_id IN ({','.join('?' * len(resume_ids))}) "
+        params = list(resume_ids)
+    if scoring == "bm25":
+        return conn.execute(
+            "SELECT w.jd, p.resume_id, SUM(w.weight) * ? / (1 + ? * (1 - ? + ? * COALESCE(r.keyword_count, 0) / ?)) "
+            "FROM jd_weights w JOIN keyword_postings p ON p.lemma = w.lemma "
+            f"JOIN resume_keywords r ON r.resume_id = p.resume_id {resume_filter}GROUP BY w.jd, p.resume_id",
+            [bm25_k1 + 1, bm25_k1, bm25_b, bm25_b, average_length or 1] + params
+        )
+    return conn.execute(
+        "SELECT w.jd, p.resume_id, SUM(w.weight) FROM jd_weights w JOIN keyword_postings p ON p.lemma = w.lemma "
+        f"{resume_filter}GROUP BY w.jd, p.resume_id", params
+    )
+
+
+def score_keyword_matches_cached(db_path: str, jd_name: str, jd_keywords: Iterable[str]) -> Tuple[Dict[str, float], int, int]:
+    """
+    count_keyword_matches as 0-100 overlap scores, reusing the matches of previous scans of the same
+    JD keyword set: only resumes indexed (or re-indexed) after the JD's watermark are scored, so a
+    re-scan costs the matches plus the new resumes, not the corpus.
+    Returns (scores of the resumes sharing at least one keyword, cached matches reused, resumes scored).
+    TF-IDF and BM25 scores change with every indexed resume, so they are not cached.
+    """
+    jd_keyword_list = sorted(set(jd_keywords))
+    if not jd_keyword_list or not os.path.isfile(db_path):
+        return {}, 0, 0
+    jd_hash = hashlib.sha256("\n".join(jd_keyword_list).encode("utf-8")).hexdigest()
+    with _connect(db_path) as conn:
+        latest_indexed_at = conn.execute("SELECT MAX(indexed_at) FROM resume_keywords").fetchone()[0]
+        if latest_indexed_at is None:
+            return {}, 0, 0
+        # Keyword sets this JD had before (edited since) are not scanned again
+        conn.execute("DELETE FROM scan_matches WHERE jd_hash IN (SELECT jd_hash FROM scan_watermarks WHERE jd_name = ? AND jd_hash != ?)",
+                     (jd_name, jd_hash))
+        conn.execute("DELETE FROM scan_watermarks WHERE jd_name = ? AND jd_hash != ?", (jd_name, jd_hash))
+        watermark = conn.execute("SELECT indexed_through FROM scan_watermarks WHERE jd_hash = ? AND scorer_version = ?",
+                                 (jd_hash, SCORER_VERSION)).fetchone()
+        if watermark is None:
+            # First scan (or new formula): every resume, straight from the JD's posting lists
+            conn.execute("DELETE FROM scan_matches WHERE jd_hash = ?", (jd_hash,))
+            computed_count = conn.execute("SELECT COUNT(*) FROM resume_keywords WHERE indexed_at <= ?", (latest_indexed_at,)).fetchone()[0]
+            counts = _count_keyword_matches_for(conn, jd_keyword_list, None, latest_indexed_at)
+            cached: Dict[str, float] = {}
+        else:
+            # Resumes (re-)indexed since the last scan, found through the indexed_at index
+            stale_ids = [row[0] for row in conn.execute(
+                "SELECT resume_id FROM resume_keywords WHERE indexed_at > ? AND indexed_at <= ?", (watermark[0], latest_indexed_at))]
+            computed_count = len(stale_ids)
+            for start in range(0, len(stale_ids), _MAX_QUERY_PARAMS):
+                chunk = stale_ids[start:start + _MAX_QUERY_PARAMS]
+                conn.execute(f"DELETE FROM scan_matches WHERE jd_hash = ? AND resume_id IN ({','.join('?' * len(chunk))})",
+                             [jd_hash] + chunk)
+            counts = _count_keyword_matches_for(conn, jd_keyword_list, stale_ids) if stale_ids else {}
+            cached = dict(conn.execute("SELECT resume_id, score FROM scan_matches WHERE jd_hash = ?", (jd_hash,)))
+        computed = {resume_id: round(count / len(jd_keyword_list) * 100, 2) for resume_id, count in counts.items()}
+        conn.executemany("INSERT OR REPLACE INTO scan_matches (jd_hash, resume_id, score) VALUES (?, ?, ?)",
+                         ((jd_hash, resume_id, score) for resume_id, score in computed.items()))
+        conn.execute("INSERT OR REPLACE INTO scan_watermarks (jd_hash, jd_name, scorer_version, indexed_through) VALUES (?, ?, ?, ?)",
+                     (jd_hash, jd_name, SCORER_VERSION, latest_indexed_at))
+    return {**cached, **computed}, len(cached), computed_count
+
+
+def _count_keyword_matches_for(conn: sqlite3.Connection, jd_keyword_list: List[str], resume_ids: Optional[List[str]],
+                               indexed_through: Optional[float] = None) -> Dict[str, int]:
+    """
+    count_keyword_matches restricted to the given resumes, or (resume_ids None) to every resume
+    indexed at or before indexed_through.
+    """
+    counts: Dict[str, int] = {}
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS jd_lemmas (lemma TEXT PRIMARY KEY) WITHOUT ROWID")
+    conn.execute("DELETE FROM jd_lemmas")
+    conn.executemany("INSERT INTO jd_lemmas (lemma) VALUES (?)", ((lemma,) for lemma in jd_keyword_list))
+    if resume_ids is None:
+        return dict(conn.execute(
+            "SELECT p.resume_id, COUNT(*) FROM jd_lemmas j JOIN keyword_postings p ON p.lemma = j.lemma "
+            "JOIN resume_keywords r ON r.resume_id = p.resume_id WHERE r.indexed_at <= ? GROUP BY p.resume_id",
+            (indexed_through,)
+        ))
+    for start in range(0, len(resume_ids), _MAX_QUERY_PARAMS):
+        chunk = resume_ids[start:start + _MAX_QUERY_PARAMS]
+        placeholders = ",".join("?" * len(chunk))
+        counts.update(conn.execute(
+            f"SELECT p.resume_id, COUNT(*) FROM jd_lemmas j JOIN keyword_postings p ON p.lemma = j.lemma "
+            f"WHERE p.resume_id IN ({placeholders}) GROUP BY p.resume_id", chunk
+        ))
+    return counts
+
+
+def find_keyword_matches(db_path: str, jd_keywords: Iterable[str], resume_ids: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Returns, for each of the given resumes, the JD keywords it contains.
+    Used to fill the (bulky) matching keyword lists only for the resumes actually returned.
+    The JD lemmas go into a temporary table joined against the postings, so only matching
+    postings are read, never a resume's whole keyword set.
+    """
+    matches: Dict[str, List[str]] = defaultdict(list)
+    jd_keyword_list = sorted(set(jd_keywords))
+    resume_id_list = sorted(set(resume_ids))
+    if not jd_keyword_list or not resume_id_list or not os.path.isfile(db_path):
+        return {}
+    with _connect(db_path) as conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS jd_lemmas (lemma TEXT PRIMARY KEY) WITHOUT ROWID")
+        conn.execute("DELETE FROM jd_lemmas")
+        conn.executemany("INSERT INTO jd_lemmas (lemma) VALUES (?)", ((lemma,) for lemma in jd_keyword_list))
+        for start in range(0, len(resume_id_list), _MAX_QUERY_PARAMS):
+            chunk = resume_id_list[start:start + _MAX_QUERY_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            for lemma, resume_id in conn.execute(
+                f"SELECT p.lemma, p.resume_id FROM jd_lemmas j JOIN keyword_postings p ON p.lemma = j.lemma "
+                f"WHERE p.resume_id IN ({placeholders}) ORDER BY p.lemma", chunk
+            ):
+                matches[resume_id].append(lemma)
+    return dict(matches)
+
+
+def find_resume_by_content_hash(db_path: str, content_hash: str) -> Optional[str]:
+    """Returns the ID of the resume previously parsed from a file with this content hash, if any."""
+    if not os.path.isfile(db_path):
+        return None
+    with _connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT resume_id FROM resume_content_hashes WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def claim_content_hash(db_path: str, content_hash: str, resume_id: str) -> str:
+    """
+    Records resume_id as the resume parsed from this content hash, unless another resume
+    already holds it. Returns the resume ID that owns the hash afterwards, so of two identical
+    uploads stored concurrently exactly one wins and the other can be dropped as a duplicate.
+    """
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    with _connect(db_path) as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO resume_content_hashes (content_hash, resume_id, recorded_at) VALUES (?, ?, ?)",
+            (content_hash, resume_id, time.time())
+        )
+        row = conn.execute(
+            "SELECT resume_id FROM resume_content_hashes WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+    return row[0]
+
+
+def forget_content_hash(db_path: str, content_hash: str, resume_id: Optional[str] = None) -> None:
+    """Drops a content hash entry (only if it still points to resume_id, when given)."""
+    if not os.path.isfile(db_path):
+        return
+    with _connect(db_path) as conn:
+        if resume_id is None:
+            conn.execute("DELETE FROM resume_content_hashes WHERE content_hash = ?", (content_hash,))
+        else:
+            conn.execute("DELETE FROM resume_content_hashes WHERE content_hash = ? AND resume_id = ?",
+                         (content_hash, resume_id))
+
+
+
+# --- Parsed Resume Store ---
+def store_parsed_resume(db_path: str, resume_id: str, parsed_data: Dict[str, Any]) -> None:
+    """
+    Stores (or replaces) a parsed resume. Raises TypeError if parsed_data is not JSON-serializable.
+    """
+    log = current_app.logger if current_app else logger
+    serialized = json.dumps(parsed_data, ensure_ascii=False, separators=(",", ":"))
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    with _connect(db_path) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO resumes (resume_id, original_filename, name, email, phone, parsed_data, stored_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (resume_id, parsed_data.get('_original_filename'), parsed_data.get('name'), parsed_data.get('email'),
+             parsed_data.get('phone'), serialized, time.time())
+        )
+    log.debug(f"Stored parsed resume '{resume_id}' ({len(serialized)} bytes).")
+
+
+def load_parsed_resume(db_path: str, resume_id: str) -> Optional[Dict[str, Any]]:
+    """Returns the full parsed resume, or None if it is not in the store."""
+    if not os.path.isfile(db_path):
+        return None
+    with _connect(db_path) as conn:
+        row = conn.execute("SELECT parsed_data FROM resumes WHERE resume_id = ?", (resume_id,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def delete_parsed_resume(db_path: str, resume_id: str) -> None:
+    """Removes a parsed resume together with its keyword index entries."""
+    if not os.path.isfile(db_path):
+        return
+    with _connect(db_path) as conn:
+        conn.execute("DELETE FROM resumes WHERE resume_id = ?", (resume_id,))
+        conn.execute("DELETE FROM resume_keywords WHERE resume_id = ?", (resume_id,))
+        conn.execute("DELETE FROM keyword_postings WHERE resume_id = ?", (resume_id,))
+        conn.execute("DELETE FROM scan_matches WHERE resume_id = ?", (resume_id,))
+
+
+def list_stored_resume_ids(db_path: str) -> Set[str]:
+    """Returns the IDs of all parsed resumes in the store."""
+    if not os.path.isfile(db_path):
+        return set()
+    with _connect(db_path) as conn:
+        rows = conn.execute("SELECT resume_id FROM resumes").fetchall()
+    return {row[0] for row in rows}
+
+
+def load_resume_summaries(db_path: str, resume_ids: Iterable[str]) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Returns original filename, name, email and phone for the given resumes, read from their
+    columns only (the full parse is not decoded). Resumes missing from the store are left out.
+    """
+    summaries: Dict[str, Dict[str, Optional[str]]] = {}
+    resume_id_list = sorted(set(resume_ids))
+    if not resume_id_list or not os.path.isfile(db_path):
+        return summaries
+    with _connect(db_path) as conn:
+        for start in range(0, len(resume_id_list), _MAX_QUERY_PARAMS):
+            chunk = resume_id_list[start:start + _MAX_QUERY_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            for resume_id, original_filename, name, email, phone in conn.execute(
+                f"SELECT resume_id, original_filename, name, email, phone FROM resumes WHERE resume_id IN ({placeholders})", chunk
+            ):
+                summaries[resume_id] = {"_original_filename": original_filename, "name": name, "email": email, "phone": phone}
+    return summaries
+
+
+def import_parsed_json_folder(db_path: str, parsed_folder: str) -> int:
+    """
+    One-time migration of a folder of per-resume JSON files (the previous storage) into the
+    store, keeping their filenames as resume IDs. Recorded in store_meta, so later calls (e.g.
+    from other server workers) return right away. Returns the number of resumes imported.
+    """
+    log = current_app.logger if current_app else logger
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    imported = 0
+    with _connect(db_path) as conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE") # Only one worker migrates; the others wait, then see the marker
+        if conn.execute("SELECT 1 FROM store_meta WHERE key = 'parsed_json_imported'").fetchone():
+            return 0
+        json_filenames = sorted(f for f in os.listdir(parsed_folder) if f.lower().endswith('.json')) if os.path.isdir(parsed_folder) else []
+        for json_filename in json_filenames:
+            try:
+                with open(os.path.join(parsed_folder, json_filename), 'r', encoding='utf-8') as f_json:
+                    parsed_data = json.load(f_json)
+                if not isinstance(parsed_data, dict):
+                    raise ValueError("not a JSON object")
+            except (OSError, ValueError) as e:
+                log.warning(f"Skipping unreadable parsed resume '{json_filename}' during import: {e}")
+                continue
+            conn.execute(
+                "INSERT OR IGNORE INTO resumes (resume_id, original_filename, name, email, phone, parsed_data, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (json_filename, parsed_data.get('_original_filename'), parsed_data.get('name'), parsed_data.get('email'),
+                 parsed_data.get('phone'), json.dumps(parsed_data, ensure_ascii=False, separators=(",", ":")), time.time())
+            )
+            imported += 1
+        conn.execute("INSERT INTO store_meta (key, value) VALUES ('parsed_json_imported', ?)", (str(time.time()),))
+    if imported:
+        log.info(f"Imported {imported} parsed resume JSON file(s) from '{parsed_folder}' into the resume store.")
+    return imported
@@ -3,13 +3,30 @@
 import os
 import json
 import time
+import heapq
 import traceback
 import logging
-from flask import Blueprint, request, jsonify, current_app, abort
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+from flask import Blueprint, Response, request, jsonify, current_app, abort, stream_with_context
 from werkzeug.utils import secure_filename
 
 # --- Relative Imports ---
-from .utils import get_match_results # Import the matching utility
+from . import utils
+from .utils import match_keyword_sets, get_jd_keywords # Import the matching utilities
+from .workers import submit_to_worker_pool, reset_parse_pool
+from .resume_index import (
+    index_resume_keywords, list_indexed_resume_ids, count_keyword_matches, find_keyword_matches,
+    list_stored_resume_ids, load_resume_summaries, load_parsed_resume, score_keyword_matches, score_keyword_matches_cached,
+    score_keyword_matrix, iter_keyword_scores, WEIGHTED_SCORING_MODES
+)
+from .text_store import get_raw_texts
+
+# Scoring modes accepted in the 'scoring' field of /scan/batch
+SCORING_MODES = ("overlap",) + WEIGHTED_SCORING_MODES
+
+# Media type of the streamed /scan/batch response (one JSON record per line)
+NDJSON_MIMETYPE = "application/x-ndjson"
 
 # Create Blueprint
 scan_bp = Blueprint('scan_resumes', __name__, url_prefix='/scan')
@@ -20,8 +37,17 @@ logger = logging.getLogger(__name__) # Fallback logger
 @scan_bp.route('/batch', methods=['POST'])
 def batch_scan_resumes():
     """
-    Scans all available parsed resumes (.json) against a selected job description (.txt).
+    Scans all parsed resumes in the resume store against a selected job description (.txt).
+    Candidates are retrieved through the keyword index's posting lists, so only resumes
+    sharing at least one keyword with the JD are considered.
+    Optional JSON fields: 'top_k' (return only the best K candidates), 'min_score'
+    (drop candidates scoring below this percentage) and 'scoring' ("overlap": share of JD
+    keywords found; "tfidf" / "bm25": term-weighted, see resume_index.score_keyword_matches;
+    default SCAN_DEFAULT_SCORING). Keyword lists and contact details are only loaded for
+    the returned candidates. With overlap scoring, matches from earlier scans of the same JD are
+    reused and only resumes indexed since are scored (summary 'cache_hits' vs 'computed').
     Returns a list of results sorted by match score.
+    With 'Accept: application/x-ndjson', results are streamed instead (see _stream_batch_scan).
     Uses current_app for config and logging.
     """
     log = current_app.logger # Use app logger
@@ -43,135 +69,326 @@ def batch_scan_resumes():
         log.warning("Missing or invalid 'jd_filename' in /scan/batch request.")
         abort(400, description="Missing or invalid 'jd_filename' (must be a string).")
 
-    # --- Validate JD Filename and Get Paths ---
-    secure_jd_filename = secure_filename(selected_jd_filename)
-    if secure_jd_filename != selected_jd_filename:
-        log.warning(f"Invalid JD filename format provided: Original='{selected_jd_filename}', Secured='{secure_jd_filename}'")
-        abort(400, description="Invalid characters in JD filename.")
+    top_k, min_score, scoring = _parse_scan_options(log, data)
+    stream = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
 
     jd_folder = current_app.config.get('JOB_DESC_FOLDER')
-    parsed_folder = current_app.config.get('PARSED_DATA_FOLDER')
-    if not jd_folder or not parsed_folder:
-         log.error("JOB_DESC_FOLDER or PARSED_DATA_FOLDER not configured.")
+    if not jd_folder:
+         log.error("JOB_DESC_FOLDER not configured.")
          abort(500, description="Server configuration error regarding storage paths.")
-
-    jd_file_path = os.path.join(jd_folder, secure_jd_filename)
+    secure_jd_filename, abs_jd_file_path = _resolve_jd_file(log, jd_folder, selected_jd_filename)
     log.info(f"Scanning resumes against JD: {secure_jd_filename}")
 
-    # --- Read Job Description ---
-    jd_text = None
+    # --- List Parsed Resumes (one query on the resume store) ---
+    scan_errors = []
+    resume_index_path = current_app.config.get('RESUME_INDEX_PATH')
+    if not resume_index_path:
+        log.error("RESUME_INDEX_PATH not configured.")
+        abort(500, description="Server configuration error regarding storage paths.")
     try:
-        abs_jd_folder = os.path.abspath(jd_folder)
-        abs_jd_file_path = os.path.abspath(jd_file_path)
+        # IDs only: resume content is never loaded unless the resume matches the JD
+        parsed_json_files = list_stored_resume_ids(resume_index_path)
+    except Exception as e:
+        log.error(f"Error listing parsed resumes in the resume store at {resume_index_path}: {e}", exc_info=True)
+        abort(500, description="Could not list parsed resumes to scan.")
 
-        # Security check: ensure file is within the designated folder
-        if not abs_jd_file_path.startswith(abs_jd_folder + os.sep):
-             log.error(f"Access Denied (Path Traversal?): JD='{abs_jd_file_path}', Base='{abs_jd_folder}'")
-             abort(403, "Access denied to job description file.")
+    if not parsed_json_files:
+        log.info("No parsed resumes found in the resume store.")
+        # Return success with empty results
+        duration = round(time.time() - start_time, 2)
+        summary = {"total_resumes_found": 0, "successfully_scanned": 0, "cache_hits": 0, "computed": 0,
+                   "errors": 0, "duration_seconds": duration}
+        if stream:
+            summary = {key: value for key, value in summary.items() if key not in ("cache_hits", "computed")}
+            return _ndjson_response([{"type": "summary", "jd_used": secure_jd_filename, "scan_errors": [], "summary": summary}])
+        return jsonify({
+            "jd_used": secure_jd_filename,
+            "results": [],
+            "scan_errors": [],
+            "summary": summary
+        }), 200
+
+    # --- Get Precompiled JD Keywords ---
+    # Resume keywords are indexed once at upload time (see upload_resume.py), so the
+    # scan itself never re-runs NLTK on resume text.
+    if not current_app.config.get('NLTK_READY'):
+        log.error("NLTK components (Lemmatizer/Stopwords) not available. Cannot perform keyword analysis.")
+        abort(500, description="NLTK components not available. Cannot perform keyword analysis.")
+    jd_keywords = _load_jd_keywords(log, secure_jd_filename, abs_jd_file_path)
 
-        if not os.path.isfile(abs_jd_file_path):
-            log.warning(f"Selected JD file not found: {abs_jd_file_path}")
-            abort(404, description=f"Job Description file '{secure_jd_filename}' not found.")
+    log.info(f"Found {len(parsed_json_files)} parsed resumes. Starting scan...")
+    if stream:
+        # The keyword index is backfilled inside the stream, which reports its progress
+        log.info(f"Streaming results for {len(parsed_json_files)} parsed resumes as NDJSON...")
+        return _ndjson_response(_stream_batch_scan(
+            log, start_time, secure_jd_filename, jd_keywords, parsed_json_files, scan_errors,
+            resume_index_path, top_k, min_score, scoring))
+    indexed_resume_ids = _backfill_keyword_index(log, resume_index_path, parsed_json_files, scan_errors)
+
+    # Only resumes still in the resume store are counted and reported
+    scannable_resume_ids = indexed_resume_ids & parsed_json_files
+    success_count = len(scannable_resume_ids)
+
+    # --- Walk the Posting Lists of the JD Keywords ---
+    # With the scan result cache (overlap scoring), only resumes indexed since the last scan of this JD are scored
+    cache_hits, computed_count = 0, len(indexed_resume_ids)
+    try:
+        if scoring == 'overlap' and current_app.config.get('SCAN_RESULT_CACHE_ENABLED', True):
+            scores, cache_hits, computed_count = score_keyword_matches_cached(resume_index_path, secure_jd_filename, jd_keywords)
+        elif scoring == 'overlap':
+            match_counts = count_keyword_matches(resume_index_path, jd_keywords)
+            scores = {json_filename: round((match_count / len(jd_keywords)) * 100, 2) for json_filename, match_count in match_counts.items()}
+        else:
+            scores = score_keyword_matches(resume_index_path, jd_keywords, scoring,
+                                           bm25_k1=current_app.config.get('BM25_K1', 1.2),
+                                           bm25_b=current_app.config.get('BM25_B', 0.75))
+    except Exception as e:
+        log.error(f"Error querying resume keyword index at {resume_index_path}: {e}", exc_info=True)
+        abort(500, description="Could not query the resume keyword index.")
+    log.info(f"{len(scores)} indexed resumes share at least one keyword with the JD (scoring: {scoring}; "
+             f"{cache_hits} cached, {computed_count} computed).")
+
+    # --- Select Top Candidates ---
+    # Scores only need the match counts; resumes below the cutoff are dropped right away and
+    # a bounded heap keeps the best `top_k` without sorting every candidate.
+    candidates = [
+        (json_filename, score) for json_filename, score in scores.items()
+        if json_filename in scannable_resume_ids # Parsed resume may have been removed after indexing
+        and score >= min_score
+    ]
+    matching_candidates_count = len(candidates)
+    if top_k is not None:
+        selected_candidates = heapq.nlargest(top_k, candidates, key=lambda c: c[1])
+    else:
+        selected_candidates = sorted(candidates, key=lambda c: c[1], reverse=True)
+
+    # Keyword lists and contact details are only loaded for the candidates actually returned
+    try:
+        resume_results = _build_scan_results(log, resume_index_path, jd_keywords, selected_candidates, scan_errors)
+    except Exception as e:
+        log.error(f"Error querying resume keyword index at {resume_index_path}: {e}", exc_info=True)
+        abort(500, description="Could not query the resume keyword index.")
+    success_count -= len(selected_candidates) - len(resume_results)
 
-        with open(abs_jd_file_path, 'r', encoding='utf-8') as f:
-            jd_text = f.read()
+    # --- Return Combined Results ---
+    end_time = time.time()
+    duration = round(end_time - start_time, 2)
 
-        if not jd_text or not jd_text.strip():
-            log.warning(f"JD file is empty: {secure_jd_filename}")
-            abort(400, description=f"Job Description file '{secure_jd_filename}' is empty or contains only whitespace.")
+    response_payload = {
+        "jd_used": secure_jd_filename,
+        "results": resume_results, # Already in score order; resumes sharing no keyword with the JD (score 0) are omitted
+        "scan_errors": scan_errors, # Report which files failed
+        "summary": {
+             "total_resumes_found": len(parsed_json_files),
+             "successfully_scanned": success_count,
+             "matching_candidates": matching_candidates_count,
+             "returned_results": len(resume_results),
+             "top_k": top_k,
+             "min_score": min_score,
+             "scoring": scoring,
+             "cache_hits": cache_hits,
+             "computed": computed_count,
+             "errors": len(scan_errors),
+             "duration_seconds": duration
+        }
+    }
 
-    except FileNotFoundError: # Should be caught by isfile, but good practice
-        log.warning(f"Selected JD file not found (exception): {abs_jd_file_path}")
-        abort(404, description=f"Job Description file '{secure_jd_filename}' not found.")
-    except Exception as e:
-        log.error(f"Error reading JD file {secure_jd_filename}: {e}", exc_info=True)
-        abort(500, description="Could not read the selected Job Description file.")
+    # Determine appropriate status code
+    status_code = 200
+    if scan_errors and success_count > 0:
+        status_code = 207 # Multi-Status: Partial success
+        log.warning(f"Batch Scan completed with {len(scan_errors)} errors.")
+    elif scan_errors and success_count == 0 and len(parsed_json_files) > 0:
+        status_code = 500 # All processing failed, likely a systemic issue
+        log.error("Batch Scan failed for all resumes found.")
+    # Case: No JSON files found -> handled earlier, returns 200
+    # Case: All succeeded -> returns 200
 
-    # --- Find and List Parsed Resume Files (.json) ---
-    resume_results = []
+    log.info(f"Batch Scan Complete. Duration: {duration}s. Scanned: {success_count}/{len(parsed_json_files)}, Errors: {len(scan_errors)}. Status: {status_code}")
+    return jsonify(response_payload), status_code
+
+
+@scan_bp.route('/matrix', methods=['POST'])
+def matrix_scan_resumes():
+    """
+    Scores all parsed resumes against several job descriptions in one pass.
+    JSON fields: 'jd_filenames' (list of JD .txt files, at most SCAN_MATRIX_MAX_JDS) and the
+    optional 'top_k' (candidates listed per JD, default SCAN_MATRIX_DEFAULT_TOP_K), 'min_score'
+    and 'scoring' of /scan/batch.
+    The keyword index is backfilled once and all JDs are scored with a single query over the
+    posting lists (resume_index.score_keyword_matrix); each matching resume's details are loaded
+    once, however many JDs it matches.
+    Returns 'matrix' (one row of scores per resume, columns in 'jd_used' order; resumes matching
+    no JD are all zeros and omitted) and 'top_candidates' (best resumes per JD, by score).
+    """
+    log = current_app.logger # Use app logger
+    log.info("Received request to /scan/matrix")
+    start_time = time.time()
+
+    # --- Validate Input ---
+    if not request.is_json:
+        log.warning("Request to /scan/matrix is not JSON.")
+        abort(400, description="Request must be JSON.")
+
+    data = request.get_json()
+    if not data:
+        log.warning("Request to /scan/matrix has empty JSON body.")
+        abort(400, description="Empty JSON body provided.")
+
+    selected_jd_filenames = data.get('jd_filenames')
+    if (not selected_jd_filenames or not isinstance(selected_jd_filenames, list)
+            or not all(isinstance(name, str) and name for name in selected_jd_filenames)):
+        log.warning("Missing or invalid 'jd_filenames' in /scan/matrix request.")
+        abort(400, description="Missing or invalid 'jd_filenames' (must be a non-empty list of strings).")
+    selected_jd_filenames = list(dict.fromkeys(selected_jd_filenames)) # Drop repeats, keep order
+    max_jds = current_app.config.get('SCAN_MATRIX_MAX_JDS', 20)
+    if len(selected_jd_filenames) > max_jds:
+        log.warning(f"Too many JDs in /scan/matrix request: {len(selected_jd_filenames)}")
+        abort(400, description=f"Too many job descriptions (at most {max_jds} per request).")
+
+    top_k, min_score, scoring = _parse_scan_options(log, data)
+    if top_k is None:
+        top_k = current_app.config.get('SCAN_MATRIX_DEFAULT_TOP_K', 10)
+
+    jd_folder = current_app.config.get('JOB_DESC_FOLDER')
+    if not jd_folder:
+         log.error("JOB_DESC_FOLDER not configured.")
+         abort(500, description="Server configuration error regarding storage paths.")
+    jd_files = [_resolve_jd_file(log, jd_folder, name) for name in selected_jd_filenames]
+    jd_names = [secure_jd_filename for secure_jd_filename, _ in jd_files]
+    log.info(f"Scanning resumes against {len(jd_names)} JDs: {', '.join(jd_names)}")
+
+    # --- List Parsed Resumes (one query on the resume store) ---
     scan_errors = []
-    parsed_json_files = []
+    resume_index_path = current_app.config.get('RESUME_INDEX_PATH')
+    if not resume_index_path:
+        log.error("RESUME_INDEX_PATH not configured.")
+        abort(500, description="Server configuration error regarding storage paths.")
     try:
-        if not os.path.isdir(parsed_folder):
-             log.warning(f"Parsed resume directory not found: {parsed_folder}. No resumes to scan.")
-             # Not necessarily an error if no resumes uploaded yet, return empty results
-             return jsonify({
-                 "jd_used": secure_jd_filename,
-                 "results": [],
-                 "scan_errors": [],
-                 "summary": {"total_resumes_found": 0, "successfully_scanned": 0, "errors": 0, "duration_seconds": 0}
-             }), 200
-
-        abs_parsed_folder = os.path.abspath(parsed_folder)
-        files_with_mtime = []
-        log.debug(f"Listing .json files in: {abs_parsed_folder}")
-        for f in os.listdir(abs_parsed_folder):
-             if f.lower().endswith('.json') and os.path.isfile(os.path.join(abs_parsed_folder, f)):
-                 try:
-                      mtime = os.path.getmtime(os.path.join(abs_parsed_folder, f))
-                      files_with_mtime.append((f, mtime))
-                 except OSError as e:
-                      log.warning(f"Could not get modification time for {f}: {e}")
-                      files_with_mtime.append((f, 0)) # Include with timestamp 0
-
-        # Sort by modification time, newest first (optional, could sort results later)
-        parsed_json_files = [f[0] for f in sorted(files_with_mtime, key=lambda x: x[1], reverse=True)]
-
-        if not parsed_json_files:
-            log.info("No parsed resumes (.json files) found in the directory.")
-            # Return success with empty results
-            duration = round(time.time() - start_time, 2)
-            return jsonify({
-                "jd_used": secure_jd_filename,
-                "results": [],
-                "scan_errors": [],
-                "summary": {"total_resumes_found": 0, "successfully_scanned": 0, "errors": 0, "duration_seconds": duration}
-            }), 200
-
+        parsed_json_files = list_stored_resume_ids(resume_index_path)
     except Exception as e:
-        log.error(f"Error listing parsed resume files in {parsed_folder}: {e}", exc_info=True)
+        log.error(f"Error listing parsed resumes in the resume store at {resume_index_path}: {e}", exc_info=True)
         abort(500, description="Could not list parsed resumes to scan.")
 
-    # --- Process Each Resume JSON File ---
-    log.info(f"Found {len(parsed_json_files)} parsed resumes. Starting scan...")
-    success_count = 0
-    abs_parsed_folder = os.path.abspath(parsed_folder) # Re-resolve for security checks
+    # --- Get Precompiled JD Keywords ---
+    if parsed_json_files and not current_app.config.get('NLTK_READY'):
+        log.error("NLTK components (Lemmatizer/Stopwords) not available. Cannot perform keyword analysis.")
+        abort(500, description="NLTK components not available. Cannot perform keyword analysis.")
+    jd_keyword_sets = {name: _load_jd_keywords(log, name, path) for name, path in jd_files} if parsed_json_files else {}
+
+    # --- Backfill the Index Once, Then Score Every JD in One Query ---
+    scannable_resume_ids: Set[str] = set()
+    score_matrix = {name: {} for name in jd_names}
+    if parsed_json_files:
+        log.info(f"Found {len(parsed_json_files)} parsed resumes. Starting scan...")
+        scannable_resume_ids = _backfill_keyword_index(log, resume_index_path, parsed_json_files, scan_errors) & parsed_json_files
+        try:
+            score_matrix = score_keyword_matrix(resume_index_path, jd_keyword_sets, scoring,
+                                                bm25_k1=current_app.config.get('BM25_K1', 1.2),
+                                                bm25_b=current_app.config.get('BM25_B', 0.75))
+        except Exception as e:
+            log.error(f"Error querying resume keyword index at {resume_index_path}: {e}", exc_info=True)
+            abort(500, description="Could not query the resume keyword index.")
+
+    # --- Per-JD Top Candidates ---
+    top_candidates = {}
+    matching_resume_ids: Set[str] = set()
+    for name in jd_names:
+        jd_scores = {json_filename: score for json_filename, score in score_matrix.get(name, {}).items()
+                     if json_filename in scannable_resume_ids} # Parsed resume may have been removed after indexing
+        matching_resume_ids.update(jd_scores)
+        candidates = [(json_filename, score) for json_filename, score in jd_scores.items() if score >= min_score]
+        top_candidates[name] = heapq.nlargest(top_k, candidates, key=lambda c: (c[1], c[0]))
+
+    # Details of each matching resume are loaded once, whichever JDs it appears under
+    try:
+        resume_summaries = load_resume_summaries(resume_index_path, matching_resume_ids) if matching_resume_ids else {}
+    except Exception as e:
+        log.error(f"Error reading the resume store at {resume_index_path}: {e}", exc_info=True)
+        abort(500, description="Could not read the resume store.")
+
+    def resume_details(json_filename: str) -> dict:
+        resume_data = resume_summaries.get(json_filename) or {}
+        return {
+            "original_filename": resume_data.get('_original_filename') or json_filename.replace('_parsed.json', ''),
+            "name": resume_data.get('name', 'N/A'),
+            "email": resume_data.get('email', 'N/A'),
+            "phone": resume_data.get('phone', 'N/A'),
+            "_parsed_json_filename": json_filename,
+        }
+
+    # Rows ordered by best score across the JDs
+    row_ids = sorted(matching_resume_ids, key=lambda json_filename: (
+        -max(score_matrix[name].get(json_filename, 0) for name in jd_names), json_filename))
+    matrix_rows = [
+        {**resume_details(json_filename), "scores": [score_matrix[name].get(json_filename, 0) for name in jd_names]}
+        for json_filename in row_ids
+    ]
+    top_candidate_results = {
+        name: [{**resume_details(json_filename), "score": score} for json_filename, score in candidates]
+        for name, candidates in top_candidates.items()
+    }
+
+    duration = round(time.time() - start_time, 2)
+    response_payload = {
+        "jd_used": jd_names,
+        "matrix": matrix_rows,
+        "top_candidates": top_candidate_results,
+        "scan_errors": scan_errors,
+        "summary": {
+             "total_resumes_found": len(parsed_json_files),
+             "successfully_scanned": len(scannable_resume_ids),
+             "matching_resumes": len(matrix_rows),
+             "top_k": top_k,
+             "min_score": min_score,
+             "scoring": scoring,
+             "errors": len(scan_errors),
+             "duration_seconds": duration
+        }
+    }
 
-    for json_filename in parsed_json_files:
-        resume_json_path = os.path.join(abs_parsed_folder, json_filename)
-        abs_resume_json_path = os.path.abspath(resume_json_path)
+    status_code = 200
+    if scan_errors and scannable_resume_ids:
+        status_code = 207 # Multi-Status: Partial success
+        log.warning(f"Matrix Scan completed with {len(scan_errors)} errors.")
+    elif scan_errors:
+        status_code = 500
+        log.error("Matrix Scan failed for all resumes found.")
+
+    log.info(f"Matrix Scan Complete. Duration: {duration}s. JDs: {len(jd_names)}, Scanned: {len(scannable_resume_ids)}/{len(parsed_json_files)}, Errors: {len(scan_errors)}. Status: {status_code}")
+    return jsonify(response_payload), status_code
+
+
+# --- Helpers ---
+def _build_scan_results(log, resume_index_path: str, jd_keywords: FrozenSet[str], candidates: List[Tuple[str, float]],
+                        scan_errors: list) -> List[Dict[str, Any]]:
+    """
+    Builds the /scan/batch result entries of (json_filename, score) candidates, in the same order.
+    Keyword lists and contact details are loaded for these resumes only. Resumes that fail are
+    appended to scan_errors and left out; raises if the resume store cannot be read.
+    """
+    keyword_matches = find_keyword_matches(resume_index_path, jd_keywords, [c[0] for c in candidates])
+    resume_summaries = load_resume_summaries(resume_index_path, [c[0] for c in candidates])
+    resume_results = []
+    for json_filename, score in candidates:
         log.debug(f"Processing resume file: {json_filename}")
 
         try:
-            # Security check for resume JSON path
-            if not abs_resume_json_path.startswith(abs_parsed_folder + os.sep):
-                 log.error(f"Access Denied (Path Traversal?): JSON='{abs_resume_json_path}', Base='{abs_parsed_folder}'")
-                 raise ValueError(f"Attempt to access JSON outside designated folder: {json_filename}")
-
-            with open(resume_json_path, 'r', encoding='utf-8') as f_json:
-                resume_data = json.load(f_json)
+            resume_data = resume_summaries.get(json_filename)
+            if resume_data is None:
+                raise KeyError("Parsed resume was removed from the resume store during the scan.")
 
             # Extract necessary fields from JSON (handle missing keys gracefully)
-            resume_raw_text = resume_data.get('_raw_text') # Assumes raw text is saved during parsing
             original_resume_filename = resume_data.get('_original_filename')
 
-            if not resume_raw_text:
-                # If raw text isn't stored, we can't scan. Log error for this file.
-                raise ValueError("'_raw_text' field missing or empty in JSON. Cannot perform keyword matching.")
-
             if not original_resume_filename:
                  log.warning(f"'_original_filename' missing in {json_filename}. Using base JSON name for reporting.")
                  # Attempt to derive original name if possible (e.g., remove '_parsed.json')
                  original_resume_filename = json_filename.replace('_parsed.json', '')
 
-
             # --- Perform the matching using the utility function ---
-            # get_match_results uses NLTK initialized globally
-            match_data = get_match_results(resume_raw_text, jd_text)
-
-            # Check if the matching function itself returned an error (e.g., NLTK failed)
-            if match_data.get("error"):
-                raise ValueError(f"Keyword matching failed: {match_data['error']}")
+            # The postings already tell us which JD keywords the resume contains
+            match_data = match_keyword_sets(set(keyword_matches.get(json_filename, [])), jd_keywords)
 
             # Append successful result including key info from parsed data and match results
             resume_results.append({
@@ -179,55 +396,290 @@ def batch_scan_resumes():
                 "name": resume_data.get('name', 'N/A'),
                 "email": resume_data.get('email', 'N/A'),
                 "phone": resume_data.get('phone', 'N/A'),
-                "score": match_data.get("score", 0.0),
+                "score": score, # Equals match_data["score"] for "overlap" scoring
                 "matching_keywords": match_data.get("matching_keywords", []),
                 "missing_keywords": match_data.get("missing_keywords", []),
                 "match_count": match_data.get("match_count", 0),
                 "jd_keyword_count": match_data.get("jd_keyword_count", 0),
                 "_parsed_json_filename": json_filename # Keep internal reference if needed for debugging/linking
             })
-            success_count += 1
-            log.debug(f"Successfully scanned: {original_resume_filename} (Score: {match_data.get('score', 0.0)})")
-
-        except (json.JSONDecodeError, ValueError, OSError, KeyError, Exception) as e:
-            # Log specific errors for individual file processing failures
-            error_msg = f"{type(e).__name__}: {str(e)}"
-            log.error(f"Error processing resume JSON '{json_filename}': {error_msg}", exc_info=False) # Avoid traceback spam for common errors
-            # Log traceback for unexpected errors
-            if not isinstance(e, (json.JSONDecodeError, ValueError, FileNotFoundError, KeyError)):
-                 log.exception(f"Full traceback for error processing {json_filename}:") # Use log.exception for traceback
-
-            scan_errors.append({"filename": json_filename, "error": error_msg})
+            log.debug(f"Successfully scanned: {original_resume_filename} (Score: {score})")
 
-    # --- Return Combined Results ---
-    end_time = time.time()
-    duration = round(end_time - start_time, 2)
+        except Exception as e:
+            _record_scan_error(log, scan_errors, json_filename, e)
+    return resume_results
 
-    # Sort final results by score descending
-    sorted_results = sorted(resume_results, key=lambda x: x['score'], reverse=True)
+def _stream_batch_scan(log, start_time: float, secure_jd_filename: str, jd_keywords: FrozenSet[str],
+                       parsed_json_files: Set[str], scan_errors: list,
+                       resume_index_path: str, top_k: Optional[int], min_score: float, scoring: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streamed /scan/batch: backfills the keyword index, then scores the indexed resumes
+    SCAN_STREAM_CHUNK_SIZE at a time (resume_index.iter_keyword_scores), so the first records are
+    sent after one chunk whatever the size of the resume store. Yields, as NDJSON records:
+      {"type": "backfill", "indexed", "total"}: only if resumes are missing from the keyword index,
+                                once before indexing them and after every SCAN_CHUNK_SIZE of them;
+      {"type": "result", ...}:  without 'top_k', each matching resume as soon as its chunk is scored
+                                (ordered by score within a chunk only: clients sort);
+      {"type": "top_k", "results": [...]}: with 'top_k', the best K so far, sorted by score, after
+                                every chunk that changes them (the last snapshot is the final top K);
+      {"type": "summary", "jd_used", "scan_errors", "summary"}: always last, as in the JSON response.
+    The status is sent before scoring starts, so it is always 200: a failure while scoring ends the
+    stream with {"type": "error", "error": ...} instead of the summary. The scan result cache is
+    not used (it is read and written for the whole corpus at once), so the summary has no
+    'cache_hits' / 'computed'.
+    """
+    config = current_app.config
+    try:
+        indexed_resume_ids = list_indexed_resume_ids(resume_index_path)
+        unindexed_json_files = parsed_json_files - indexed_resume_ids
+        if unindexed_json_files:
+            yield {"type": "backfill", "indexed": 0, "total": len(unindexed_json_files)}
+            for processed_count in _iter_keyword_backfill(log, resume_index_path, unindexed_json_files,
+                                                           indexed_resume_ids, scan_errors):
+                yield {"type": "backfill", "indexed": processed_count, "total": len(unindexed_json_files)}
+    except Exception as e:
+        log.error(f"Error updating resume keyword index at {resume_index_path}: {e}", exc_info=True)
+        yield {"type": "error", "error": "Could not read the resume keyword index."}
+        return
+
+    # Only resumes still in the resume store are counted and reported
+    scannable_resume_ids = indexed_resume_ids & parsed_json_files
+    success_count = len(scannable_resume_ids)
+    matching_candidates_count = 0
+    returned_count = 0
+    top_candidates: List[Tuple[str, float]] = [] # Current best K, by score descending
+    top_results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for chunk_scores in iter_keyword_scores(
+                resume_index_path, jd_keywords, scannable_resume_ids, scoring,
+                chunk_size=config.get('SCAN_STREAM_CHUNK_SIZE', 500),
+                bm25_k1=config.get('BM25_K1', 1.2), bm25_b=config.get('BM25_B', 0.75)):
+            candidates = [(json_filename, score) for json_filename, score in chunk_scores.items() if score >= min_score]
+            matching_candidates_count += len(candidates)
+            if top_k is None:
+                candidates.sort(key=lambda c: c[1], reverse=True)
+                resume_results = _build_scan_results(log, resume_index_path, jd_keywords, candidates, scan_errors)
+                success_count -= len(candidates) - len(resume_results)
+                returned_count += len(resume_results)
+                for result in resume_results:
+                    yield {"type": "result", **result}
+                continue
+            # Details are only loaded for candidates entering the top K
+            selected = heapq.nlargest(top_k, top_candidates + candidates, key=lambda c: (c[1], c[0]))
+            entering = [c for c in selected if c[0] not in top_results]
+            if not entering:
+                continue
+            for result in _build_scan_results(log, resume_index_path, jd_keywords, entering, scan_errors):
+                top_results[result["_parsed_json_filename"]] = result
+            success_count -= len(entering) - sum(1 for c in entering if c[0] in top_results)
+            top_candidates = [c for c in selected if c[0] in top_results]
+            top_results = {json_filename: top_results[json_filename] for json_filename, _ in top_candidates}
+            yield {"type": "top_k", "results": list(top_results.values())}
+    except Exception as e:
+        log.error(f"Error querying resume keyword index at {resume_index_path}: {e}", exc_info=True)
+        yield {"type": "error", "error": "Could not query the resume keyword index."}
+        return
 
-    response_payload = {
+    duration = round(time.time() - start_time, 2)
+    yield {
+        "type": "summary",
         "jd_used": secure_jd_filename,
-        "results": sorted_results,
-        "scan_errors": scan_errors, # Report which files failed
+        "scan_errors": scan_errors,
         "summary": {
              "total_resumes_found": len(parsed_json_files),
              "successfully_scanned": success_count,
+             "matching_candidates": matching_candidates_count,
+             "returned_results": returned_count if top_k is None else len(top_results),
+             "top_k": top_k,
+             "min_score": min_score,
+             "scoring": scoring,
              "errors": len(scan_errors),
              "duration_seconds": duration
         }
     }
+    log.info(f"Streamed Batch Scan Complete. Duration: {duration}s. Scanned: {success_count}/{len(parsed_json_files)}, Errors: {len(scan_errors)}.")
+
+def _ndjson_response(records: Iterable[Dict[str, Any]]) -> Response:
+    """Streams records as newline-delimited JSON, one line per record as it is produced."""
+    return Response(stream_with_context(json.dumps(record) + "\n" for record in records), mimetype=NDJSON_MIMETYPE)
+
+def _parse_scan_options(log, data: dict) -> Tuple[Optional[int], float, str]:
+    """Validates the optional 'top_k', 'min_score' and 'scoring' fields shared by the scan endpoints."""
+    # Optional result limits: only the best `top_k` candidates at or above `min_score` are returned
+    top_k = data.get('top_k')
+    if top_k is not None and (isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1):
+        log.warning(f"Invalid 'top_k' in {request.path} request: {top_k!r}")
+        abort(400, description="Invalid 'top_k' (must be a positive integer).")
+
+    min_score = data.get('min_score', 0)
+    if isinstance(min_score, bool) or not isinstance(min_score, (int, float)) or not 0 <= min_score <= 100:
+        log.warning(f"Invalid 'min_score' in {request.path} request: {min_score!r}")
+        abort(400, description="Invalid 'min_score' (must be a number between 0 and 100).")
+
+    scoring = data.get('scoring', current_app.config.get('SCAN_DEFAULT_SCORING', 'overlap'))
+    if scoring not in SCORING_MODES:
+        log.warning(f"Invalid 'scoring' in {request.path} request: {scoring!r}")
+        abort(400, description=f"Invalid 'scoring' (must be one of: {', '.join(SCORING_MODES)}).")
+    return top_k, min_score, scoring
+
+def _resolve_jd_file(log, jd_folder: str, selected_jd_filename: str) -> Tuple[str, str]:
+    """
+    Validates a requested JD filename and checks the file is readable and not empty.
+    Returns (secure JD filename, absolute path); aborts the request otherwise.
+    """
+    # --- Validate JD Filename and Get Paths ---
+    secure_jd_filename = secure_filename(selected_jd_filename)
+    if secure_jd_filename != selected_jd_filename:
+        log.warning(f"Invalid JD filename format provided: Original='{selected_jd_filename}', Secured='{secure_jd_filename}'")
+        abort(400, description="Invalid characters in JD filename.")
 
-    # Determine appropriate status code
-    status_code = 200
-    if scan_errors and success_count > 0:
-        status_code = 207 # Multi-Status: Partial success
-        log.warning(f"Batch Scan completed with {len(scan_errors)} errors.")
-    elif scan_errors and success_count == 0 and len(parsed_json_files) > 0:
-        status_code = 500 # All processing failed, likely a systemic issue
-        log.error("Batch Scan failed for all resumes found.")
-    # Case: No JSON files found -> handled earlier, returns 200
-    # Case: All succeeded -> returns 200
+    jd_file_path = os.path.join(jd_folder, secure_jd_filename)
 
-    log.info(f"Batch Scan Complete. Duration: {duration}s. Scanned: {success_count}/{len(parsed_json_files)}, Errors: {len(scan_errors)}. Status: {status_code}")
-    return jsonify(response_payload), status_code
\ No newline at end of file
+    # --- Read Job Description ---
+    jd_text = None
+    try:
+        abs_jd_folder = os.path.abspath(jd_folder)
+        abs_jd_file_path = os.path.abspath(jd_file_path)
+
+        # Security check: ensure file is within the designated folder
+        if not abs_jd_file_path.startswith(abs_jd_folder + os.sep):
+             log.error(f"Access Denied (Path Traversal?): JD='{abs_jd_file_path}', Base='{abs_jd_folder}'")
+             abort(403, "Access denied to job description file.")
+
+        if not os.path.isfile(abs_jd_file_path):
+            log.warning(f"Selected JD file not found: {abs_jd_file_path}")
+            abort(404, description=f"Job Description file '{secure_jd_filename}' not found.")
+
+        with open(abs_jd_file_path, 'r', encoding='utf-8') as f:
+            jd_text = f.read()
+
+        if not jd_text or not jd_text.strip():
+            log.warning(f"JD file is empty: {secure_jd_filename}")
+            abort(400, description=f"Job Description file '{secure_jd_filename}' is empty or contains only whitespace.")
+
+    except FileNotFoundError: # Should be caught by isfile, but good practice
+        log.warning(f"Selected JD file not found (exception): {abs_jd_file_path}")
+        abort(404, description=f"Job Description file '{secure_jd_filename}' not found.")
+    except Exception as e:
+        log.error(f"Error reading JD file {secure_jd_filename}: {e}", exc_info=True)
+        abort(500, description="Could not read the selected Job Description file.")
+    return secure_jd_filename, abs_jd_file_path
+
+def _load_jd_keywords(log, secure_jd_filename: str, abs_jd_file_path: str) -> FrozenSet[str]:
+    """Returns the (cached) keyword set of a JD file, aborting the request if extraction fails."""
+    try:
+        # Cached per (JD file, mtime): repeated scans against the same JD skip POS tagging entirely
+        jd_keywords = get_jd_keywords(abs_jd_file_path)
+    except OSError as e:
+        log.error(f"Error extracting keywords from JD file {secure_jd_filename}: {e}", exc_info=True)
+        abort(500, description="Could not read the selected Job Description file.")
+    except ValueError as e:
+        log.error(f"Error extracting keywords from JD file {secure_jd_filename}: {e}")
+        abort(500, description="Could not extract keywords from the selected Job Description.")
+    log.info(f"Using {len(jd_keywords)} keywords from JD: {secure_jd_filename}")
+    return jd_keywords
+
+def _backfill_keyword_index(log, resume_index_path: str, parsed_json_files: Set[str], scan_errors: list) -> Set[str]:
+    """
+    Indexes stored resumes missing from the keyword index and returns the IDs of all indexed resumes.
+    Resumes parsed before the keyword index existed (or whose indexing failed) are indexed from
+    their text in the raw text store here, once. Everything else is already in the index.
+    Failures are appended to scan_errors.
+    """
+    try:
+        indexed_resume_ids = list_indexed_resume_ids(resume_index_path)
+    except Exception as e:
+        log.error(f"Error reading resume keyword index at {resume_index_path}: {e}", exc_info=True)
+        abort(500, description="Could not read the resume keyword index.")
+
+    for _ in _iter_keyword_backfill(log, resume_index_path, parsed_json_files - indexed_resume_ids, indexed_resume_ids, scan_errors):
+        pass
+    return indexed_resume_ids
+
+def _iter_keyword_backfill(log, resume_index_path: str, unindexed_json_files: Set[str], indexed_resume_ids: Set[str],
+                           scan_errors: list) -> Iterator[int]:
+    """
+    Indexes the given resumes from their stored raw text, adding each one indexed to indexed_resume_ids
+    (failures go to scan_errors). Yields the number of resumes processed so far after every
+    SCAN_CHUNK_SIZE of them and once at the end, for progress reporting.
+    """
+    if not unindexed_json_files:
+        return
+    log.info(f"{len(unindexed_json_files)} resume(s) not indexed yet. Extracting keywords from raw text...")
+    raw_text_store_path = current_app.config.get('RAW_TEXT_STORE_PATH')
+    progress_interval = max(1, current_app.config.get('SCAN_CHUNK_SIZE', 50))
+    processed_count = 0
+    for json_filename, outcome in _extract_unindexed_keywords(log, raw_text_store_path, resume_index_path, sorted(unindexed_json_files)):
+        try:
+            if isinstance(outcome, Exception):
+                raise outcome
+            index_resume_keywords(resume_index_path, json_filename, outcome)
+            indexed_resume_ids.add(json_filename)
+        except Exception as e:
+            _record_scan_error(log, scan_errors, json_filename, e)
+        processed_count += 1
+        if processed_count % progress_interval == 0 and processed_count < len(unindexed_json_files):
+            yield processed_count
+    yield processed_count
+
+def _extract_unindexed_keywords(log, raw_text_store_path: Optional[str], resume_index_path: str, json_filenames: List[str]):
+    """
+    Extracts keyword sets for resumes missing from the keyword index, inline or split into
+    chunks across the worker pool (SCAN_EXECUTION_MODE). Yields (json_filename, keywords)
+    or (json_filename, exception) pairs.
+    """
+    config = current_app.config
+    chunk_size = max(1, config.get('SCAN_CHUNK_SIZE', 50))
+    if config.get('SCAN_EXECUTION_MODE', 'inline') == 'process' and len(json_filenames) > 1:
+        chunks = [json_filenames[i:i + chunk_size] for i in range(0, len(json_filenames), chunk_size)]
+        log.info(f"Extracting keywords in {len(chunks)} chunk(s) across the worker pool...")
+        futures = [submit_to_worker_pool(config, _extract_keywords_chunk, raw_text_store_path, resume_index_path, chunk) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                yield from future.result()
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    reset_parse_pool()
+                # The whole chunk failed (e.g. a worker died): report each of its resumes
+                for json_filename in chunk:
+                    yield json_filename, e
+    else:
+        yield from _extract_keywords_chunk(raw_text_store_path, resume_index_path, json_filenames)
+
+def _extract_keywords_chunk(raw_text_store_path: Optional[str], resume_index_path: str, json_filenames: List[str]) -> List[Tuple[str, Any]]:
+    """
+    Extracts the keyword sets of several parsed resumes from their stored raw text.
+    Texts come from the raw text store (only this chunk's records are decompressed); older
+    parses that inline a '_raw_text' field (imported JSON files) are still accepted.
+    Runs in the request or in a worker process (where NLTK is initialized once per worker).
+    """
+    results: List[Tuple[str, Any]] = []
+    try:
+        stored_texts = get_raw_texts(raw_text_store_path, json_filenames) if raw_text_store_path else {}
+    except Exception as e:
+        return [(json_filename, e) for json_filename in json_filenames]
+    for json_filename in json_filenames:
+        try:
+            if not utils.lemmatizer:
+                raise ValueError("NLTK components not available. Cannot extract keywords.")
+            resume_raw_text = stored_texts.get(json_filename)
+            if not resume_raw_text:
+                resume_raw_text = (load_parsed_resume(resume_index_path, json_filename) or {}).get('_raw_text')
+            if not resume_raw_text:
+                raise ValueError("Resume is not in the keyword index and has no stored raw text. Cannot perform keyword matching.")
+            resume_keywords = utils.preprocess_and_extract_keywords_nltk(resume_raw_text)
+            if resume_keywords is None:
+                raise ValueError("Keyword extraction failed. The resume stays unindexed and is retried on the next scan.")
+            results.append((json_filename, resume_keywords))
+        except Exception as e:
+            results.append((json_filename, e))
+    return results
+
+def _record_scan_error(log, scan_errors: list, json_filename: str, e: Exception) -> None:
+    """Logs a per-resume scan failure and appends it to the scan_errors list."""
+    error_msg = f"{type(e).__name__}: {str(e)}"
+    log.error(f"Error processing resume JSON '{json_filename}': {error_msg}", exc_info=False) # Avoid traceback spam for common errors
+    # Log traceback for unexpected errors
+    if not isinstance(e, (json.JSONDecodeError, ValueError, FileNotFoundError, KeyError)):
+         log.exception(f"Full traceback for error processing {json_filename}:") # Use log.exception for traceback
+    scan_errors.append({"filename": json_filename, "error": error_msg})
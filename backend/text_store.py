@@ -0,0 +1,152 @@
+# backend/text_store.py
+# -*- coding: utf-8 -*-
+import os
+import mmap
+import zlib
+import struct
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+# Use current_app from Flask to access the logger within request handlers
+from flask import current_app
+
+# --- Setup Logger ---
+# Fallback logger for use outside the Flask app context
+logger = logging.getLogger(__name__)
+
+# --- Segment Format ---
+# Extracted resume text lives in one append-only segment file instead of the parsed JSON,
+# so scans and listings never decode it unless they need it. Each record is:
+#   header (magic, resume ID length, payload length, CRC32 of ID + payload) | resume ID | payload
+# where the payload is the zlib-compressed UTF-8 text. A zero-length payload is a deletion.
+# The latest record for a resume ID wins. Records are appended with a single O_APPEND write,
+# so several server workers can add texts to the same file without a lock.
+_RECORD_MAGIC = b"RTX1"
+_HEADER = struct.Struct("<4sHII")
+_COMPRESSION_LEVEL = 6
+
+
+class _SegmentIndex:
+    """Offsets of the live records in one segment file, refreshed as the file grows."""
+
+    def __init__(self) -> None:
+        self.entries: Dict[str, Tuple[int, int]] = {} # resume_id -> (payload offset, payload length)
+        self.scanned_size = 0 # Bytes of the file already read into entries
+        self.lock = threading.Lock()
+
+# store path -> index of that segment file (per process)
+_indexes: Dict[str, _SegmentIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _get_index(store_path: str) -> _SegmentIndex:
+    with _indexes_lock:
+        index = _indexes.get(store_path)
+        if index is None:
+            index = _indexes[store_path] = _SegmentIndex()
+        return index
+
+
+def _refresh_index(store_path: str, index: _SegmentIndex) -> None:
+    """
+    Reads the headers of records appended since the last refresh (payloads are only checksummed).
+    Stops at an incomplete tail record, which is retried on the next refresh, so a record still
+    being written by another worker is never half-read. Corrupt records are skipped.
+    """
+    try:
+        file_size = os.path.getsize(store_path)
+    except FileNotFoundError:
+        index.entries.clear()
+        index.scanned_size = 0
+        return
+    if file_size < index.scanned_size: # File replaced (e.g. cleared): start over
+        index.entries.clear()
+        index.scanned_size = 0
+    if file_size == index.scanned_size:
+        return
+    with open(store_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            position = index.scanned_size
+            while position + _HEADER.size <= file_size:
+                magic, id_length, payload_length, checksum = _HEADER.unpack_from(data, position)
+                id_start = position + _HEADER.size
+                payload_start = id_start + id_length
+                record_end = payload_start + payload_length
+                if magic == _RECORD_MAGIC and record_end > file_size:
+                    break # Still being written
+                if magic != _RECORD_MAGIC or zlib.crc32(data[id_start:record_end]) != checksum:
+                    # E.g. a torn write from a crashed worker: resume at the next record
+                    next_record = data.find(_RECORD_MAGIC, position + 1)
+                    logger.warning(f"Skipping unreadable record at offset {position} in raw text store '{store_path}'.")
+                    position = next_record if next_record != -1 else file_size
+                    continue
+                resume_id = data[id_start:payload_start].decode("utf-8")
+                if payload_length:
+                    index.entries[resume_id] = (payload_start, payload_length)
+                else:
+                    index.entries.pop(resume_id, None)
+                position = record_end
+            index.scanned_size = position
+
+
+def _append_record(store_path: str, resume_id: str, payload: bytes) -> None:
+    encoded_id = resume_id.encode("utf-8")
+    record = _HEADER.pack(_RECORD_MAGIC, len(encoded_id), len(payload), zlib.crc32(encoded_id + payload)) + encoded_id + payload
+    directory = os.path.dirname(store_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd = os.open(store_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, record)
+    finally:
+        os.close(fd)
+
+
+# --- Public API ---
+def put_raw_text(store_path: str, resume_id: str, text: str) -> None:
+    """Stores (or replaces) the extracted text of a resume, compressed."""
+    log = current_app.logger if current_app else logger
+    if not text:
+        raise ValueError(f"No raw text to store for resume '{resume_id}'.")
+    payload = zlib.compress(text.encode("utf-8"), _COMPRESSION_LEVEL)
+    _append_record(store_path, resume_id, payload)
+    log.debug(f"Stored raw text for '{resume_id}' ({len(text)} chars, {len(payload)} bytes compressed).")
+
+
+def delete_raw_text(store_path: str, resume_id: str) -> None:
+    """Removes a resume's text (appends a deletion record; the space is not reclaimed)."""
+    if os.path.isfile(store_path):
+        _append_record(store_path, resume_id, b"")
+
+
+def get_raw_texts(store_path: str, resume_ids: Iterable[str]) -> Dict[str, str]:
+    """
+    Returns the stored texts of the given resumes (resumes without one are left out).
+    Only the requested records are decompressed, through one memory map of the file.
+    """
+    index = _get_index(store_path)
+    texts: Dict[str, str] = {}
+    with index.lock:
+        _refresh_index(store_path, index)
+        locations = [(resume_id, index.entries[resume_id]) for resume_id in resume_ids if resume_id in index.entries]
+        if not locations:
+            return texts
+        with open(store_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for resume_id, (offset, length) in locations:
+                    texts[resume_id] = zlib.decompress(data[offset:offset + length]).decode("utf-8")
+    return texts
+
+
+def get_raw_text(store_path: str, resume_id: str) -> Optional[str]:
+    """Returns the stored text of one resume, or None if there is none."""
+    return get_raw_texts(store_path, [resume_id]).get(resume_id)
+
+
+def list_raw_text_ids(store_path: str) -> Set[str]:
+    """Returns the IDs of all resumes with stored text (reads record headers only)."""
+    index = _get_index(store_path)
+    with index.lock:
+        _refresh_index(store_path, index)
+        return set(index.entries)
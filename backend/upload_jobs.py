@@ -0,0 +1,177 @@
+# backend/upload_jobs.py
+# -*- coding: utf-8 -*-
+import os
+import re
+import json
+import time
+import uuid
+import logging
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List
+
+from flask import current_app
+
+# --- Setup Logger ---
+# Fallback logger for use outside the Flask app context
+logger = logging.getLogger(__name__)
+
+# Job IDs are uuid4 hex strings; anything else is rejected before touching the filesystem
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# --- Background Worker Pool ---
+# A local thread pool (no external broker). Threads only orchestrate: the CPU-heavy parsing
+# runs inline or in the parsing process pool, depending on UPLOAD_PARSE_MODE.
+_job_executor: Optional[ThreadPoolExecutor] = None
+_job_executor_lock = threading.Lock()
+
+
+def _get_job_executor(config) -> ThreadPoolExecutor:
+    """Returns the background pool that runs upload jobs, creating it on first use."""
+    global _job_executor
+    with _job_executor_lock:
+        if _job_executor is None:
+            _job_executor = ThreadPoolExecutor(
+                max_workers=config.get('UPLOAD_JOB_WORKERS', 2),
+                thread_name_prefix="upload-job"
+            )
+        return _job_executor
+
+
+def submit_job(config, fn, *args) -> None:
+    """Runs fn(*args) on the background job pool."""
+    _get_job_executor(config).submit(fn, *args)
+
+
+# --- Job Status Store ---
+# One JSON file per job in UPLOAD_JOBS_FOLDER, so any server worker process can answer
+# a status poll, not only the one running the job.
+def _now() -> str:
+    return datetime.datetime.now().isoformat()
+
+
+def _job_path(jobs_folder: str, job_id: str) -> str:
+    return os.path.join(jobs_folder, f"{job_id}.json")
+
+
+def _write_job(jobs_folder: str, job: Dict[str, Any]) -> None:
+    """Writes the job file atomically so pollers never read a half-written file."""
+    job['updated_at'] = _now()
+    job_path = _job_path(jobs_folder, job['job_id'])
+    tmp_path = f"{job_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f_json:
+        json.dump(job, f_json, ensure_ascii=False)
+    os.replace(tmp_path, job_path)
+
+
+def prune_jobs(jobs_folder: str, ttl_seconds: float) -> int:
+    """Deletes job status files not updated for ttl_seconds. Returns the number removed."""
+    log = current_app.logger if current_app else logger
+    cutoff = time.time() - ttl_seconds
+    removed = 0
+    for entry in os.scandir(jobs_folder):
+        if not entry.name.endswith((".json", ".json.tmp")):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError as e: # Removed concurrently by another worker, or not removable
+            log.debug(f"Could not prune upload job file '{entry.name}': {e}")
+    if removed:
+        log.info(f"Pruned {removed} expired upload job file(s).")
+    return removed
+
+
+def create_job(jobs_folder: str, filenames: List[str], error_files: List[Dict[str, str]],
+               ttl_seconds: Optional[float] = None,
+               success_files: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Creates a queued job for the given (already saved) files.
+    Files rejected before queuing (bad name/type, save errors) are recorded as failed right away,
+    and files answered before queuing (cache hits) as succeeded.
+    If ttl_seconds is given, expired job files are pruned first.
+    """
+    os.makedirs(jobs_folder, exist_ok=True)
+    if ttl_seconds is not None:
+        prune_jobs(jobs_folder, ttl_seconds)
+    success_files = list(success_files or [])
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "status": "queued",
+        "created_at": _now(),
+        "total_files": len(filenames) + len(error_files) + len(success_files),
+        "processed_files": len(error_files) + len(success_files),
+        "files": [{"filename": name, "status": "pending"} for name in filenames],
+        "success_files": success_files,
+        "error_files": list(error_files),
+    }
+    _write_job(jobs_folder, job)
+    return job
+
+
+def load_job(jobs_folder: str, job_id: str, stale_after_seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Returns the job status dict, or None if no such job exists.
+    A queued/running job not updated for stale_after_seconds is reported as 'failed'
+    (its worker most likely died); the file itself is left for the TTL cleanup.
+    """
+    if not JOB_ID_PATTERN.match(job_id):
+        return None
+    try:
+        with open(_job_path(jobs_folder, job_id), "r", encoding="utf-8") as f_json:
+            job = json.load(f_json)
+    except FileNotFoundError:
+        return None
+    if stale_after_seconds is not None and job.get('status') in ("queued", "running"):
+        updated_at = datetime.datetime.fromisoformat(job['updated_at'])
+        if (datetime.datetime.now() - updated_at).total_seconds() > stale_after_seconds:
+            job['status'] = "failed"
+            job['stale'] = True
+            job['error'] = "The job stopped reporting progress (the server worker running it may have been restarted)."
+    return job
+
+
+def mark_job_running(jobs_folder: str, job: Dict[str, Any]) -> None:
+    job['status'] = "running"
+    _write_job(jobs_folder, job)
+
+
+def mark_file_processing(jobs_folder: str, job: Dict[str, Any], index: int) -> None:
+    job['files'][index]['status'] = "processing"
+    _write_job(jobs_folder, job)
+
+
+def record_file_result(jobs_folder: str, job: Dict[str, Any], index: int,
+                       success_entry: Optional[Dict[str, Any]] = None,
+                       error_entry: Optional[Dict[str, str]] = None) -> None:
+    """Records the outcome of one file (exactly one of success_entry / error_entry)."""
+    file_status = job['files'][index]
+    if success_entry is not None:
+        file_status['status'] = "done"
+        job['success_files'].append(success_entry)
+    else:
+        file_status['status'] = "error"
+        file_status['error'] = error_entry.get('error') if error_entry else "Unknown error."
+        job['error_files'].append(error_entry)
+    job['processed_files'] += 1
+    _write_job(jobs_folder, job)
+
+
+def finish_job(jobs_folder: str, job: Dict[str, Any], failure: Optional[str] = None) -> None:
+    """Marks the job finished: 'completed', 'completed_with_errors' or 'failed'."""
+    if failure:
+        job['status'] = "failed"
+        job['error'] = failure
+    elif job['error_files'] and not job['success_files']:
+        job['status'] = "failed"
+    elif job['error_files']:
+        job['status'] = "completed_with_errors"
+    else:
+        job['status'] = "completed"
+    job['finished_at'] = _now()
+    _write_job(jobs_folder, job)
+    log = current_app.logger if current_app else logger
+    log.info(f"Upload job {job['job_id']} finished with status '{job['status']}' "
+             f"(Success: {len(job['success_files'])}, Errors: {len(job['error_files'])}).")
@@ -3,35 +3,31 @@
 import os
 import json
 import datetime
+import hashlib
 import traceback
 import logging
 import re # Import re for filename sanitization
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from flask import (
-    Blueprint, request, jsonify, current_app, send_from_directory, abort
+    Blueprint, request, jsonify, current_app, send_from_directory, abort, url_for, Response
 )
 from werkzeug.utils import secure_filename
 from typing import Dict, Any, Optional, Tuple, List # Add type hinting
 
 # --- Relative Imports from within the 'backend' package ---
-# Ensure utils.py exists and contains the required functions
-try:
-    # --- THIS LINE MUST START WITH A DOT ---
-    from .utils import (
-        allowed_file, extract_text_from_pdf, extract_text_from_docx,
-        parse_resume_text
-    )
-except ImportError as e:
-    # Log a critical error if utils cannot be imported, as the blueprint is unusable
-    # Using basicConfig here ensures logging works even if Flask's logging isn't set up yet
-    logging.basicConfig(level=logging.CRITICAL)
-    logging.critical(f"FATAL ERROR: Cannot import from utils.py. Upload functionality will fail. Error: {e}", exc_info=True)
-    # Depending on desired behavior, you might raise the error to stop the app
-    # raise ImportError("Could not import required utility functions.") from e
-    # Or define dummy functions to *allow* app start but log heavily:
-    def allowed_file(*args, **kwargs): raise NotImplementedError("Utils not loaded")
-    def extract_text_from_pdf(*args, **kwargs): raise NotImplementedError("Utils not loaded")
-    def extract_text_from_docx(*args, **kwargs): raise NotImplementedError("Utils not loaded")
-    def parse_resume_text(*args, **kwargs): raise NotImplementedError("Utils not loaded")
+from .utils import DocumentSource, allowed_file, extract_and_parse_resume, extract_and_parse_resumes
+from .resume_index import (
+    index_resume_keywords, find_resume_by_content_hash, claim_content_hash, forget_content_hash,
+    store_parsed_resume, load_parsed_resume, delete_parsed_resume
+)
+from .text_store import put_raw_text
+from .workers import submit_resume_parse, reset_parse_pool
+from .upload_jobs import (
+    create_job, load_job, submit_job, mark_job_running, mark_file_processing,
+    record_file_result, finish_job
+)
 
 
 # Create Blueprint
@@ -40,17 +36,50 @@ upload_bp = Blueprint('upload_resume', __name__, url_prefix='/resumes')
 # Fallback logger if needed outside app context
 fallback_logger = logging.getLogger(__name__)
 
+# --- Original File Writer ---
+# Originals are written by these threads while their text is extracted from the upload buffer,
+# so parsing never waits for the write and never reads the file back from disk.
+_persist_executor: Optional[ThreadPoolExecutor] = None
+_persist_executor_lock = threading.Lock()
+
+
+def _get_persist_executor(config) -> ThreadPoolExecutor:
+    """Returns the thread pool that writes uploaded originals to disk, creating it on first use."""
+    global _persist_executor
+    with _persist_executor_lock:
+        if _persist_executor is None:
+            _persist_executor = ThreadPoolExecutor(
+                max_workers=config.get('UPLOAD_PERSIST_WORKERS', 4),
+                thread_name_prefix="upload-persist"
+            )
+        return _persist_executor
+
+
+def _write_original(filepath: str, file_bytes: bytes) -> None:
+    with open(filepath, "wb") as f_out:
+        f_out.write(file_bytes)
+
 # --- Upload and Parse Endpoint ---
 @upload_bp.route('/upload', methods=['POST'])
 def upload_and_parse_resumes() -> Tuple[jsonify, int]:
     """
     Handles multiple resume uploads (PDF, DOCX). For each valid file:
-    1. Saves the original file with a unique timestamped name.
-    2. Extracts text content.
+    0. Hashes the file bytes; a file uploaded before is answered from its stored parse
+       (flagged 'cache_hit': true) and skips the steps below (UPLOAD_DEDUP_ENABLED).
+    1. Saves the original file with a unique timestamped name (in the background).
+    2. Extracts text content from the uploaded bytes, while the original is being saved.
     3. Parses the text using utils.parse_resume_text.
-    4. Saves the parsed data as a JSON file (also uniquely named).
+    4. Saves the parsed data in the resume store, under a unique '<name>_<timestamp>_parsed.json' ID.
+    5. Stores the extracted text in the raw text store and the resume's lemmatized keyword
+       set in the resume index (both used by /scan/batch).
+    Steps 2-3 run in a process pool when UPLOAD_PARSE_MODE is "process".
     Returns a JSON response summarizing successes and failures.
 
+    With mode=job (query string or form field), files are only saved before responding:
+    the response is 202 with a job ID once the originals are written, steps 2-5 run in a
+    background worker (reading the originals from disk) and progress is reported by
+    /resumes/jobs/<job_id>.
+
     Returns:
         Flask JSON response object and HTTP status code.
     """
@@ -67,14 +96,20 @@ def upload_and_parse_resumes() -> Tuple[jsonify, int]:
         log.warning("Upload attempt failed: No files selected or files list empty/invalid.")
         abort(400, description='No selected files or empty file parts provided.')
 
-    log.info(f"Received {len(files)} file part(s) for upload.")
+    # "sync" (default) parses before responding; "job" returns a job ID right away (202)
+    upload_mode = request.args.get('mode') or request.form.get('mode') or 'sync'
+    if upload_mode not in ('sync', 'job'):
+        log.warning(f"Upload attempt failed: Invalid mode '{upload_mode}'")
+        abort(400, description="Invalid 'mode' (must be 'sync' or 'job').")
+
+    log.info(f"Received {len(files)} file part(s) for upload (mode: {upload_mode}).")
     success_responses: List[Dict[str, Any]] = []
     error_files: List[Dict[str, str]] = []
 
     # --- Get and Validate Configuration ---
     try:
         original_folder = current_app.config['ORIGINAL_RESUME_FOLDER']
-        parsed_folder = current_app.config['PARSED_DATA_FOLDER']
+        resume_index_path = current_app.config['RESUME_INDEX_PATH']
     except KeyError as config_err:
          log.critical(f"Configuration Error: Missing key {config_err}. Cannot save files.", exc_info=True)
          abort(500, description=f'Server configuration error: Missing {config_err}')
@@ -82,15 +117,99 @@ def upload_and_parse_resumes() -> Tuple[jsonify, int]:
     # --- Ensure Storage Directories Exist ---
     try:
         os.makedirs(original_folder, exist_ok=True)
-        os.makedirs(parsed_folder, exist_ok=True)
         # Check write permissions (important on Linux/server environments)
-        if not os.access(original_folder, os.W_OK) or not os.access(parsed_folder, os.W_OK):
-             raise OSError(f"Write permission denied for '{original_folder}' or '{parsed_folder}'.")
+        if not os.access(original_folder, os.W_OK):
+             raise OSError(f"Write permission denied for '{original_folder}'.")
     except OSError as os_err:
         log.critical(f"Could not create/access required directories: {os_err}", exc_info=True)
         abort(500, description=f'Server error: Could not create/access storage directories: {os_err}')
 
-    # --- Process Each File ---
+    # --- Save Each File (always sequential: reads from the request stream) ---
+    # Re-uploads of already parsed files land in success_responses straight away
+    saved_resumes = _save_uploaded_files(log, files, original_folder, resume_index_path,
+                                         success_responses, error_files)
+
+    # --- Job Mode: return once the originals are on disk and parse them in the background ---
+    if upload_mode == 'job' and saved_resumes:
+        saved_resumes = _persist_originals(log, saved_resumes, error_files)
+        if saved_resumes:
+            return _start_upload_job(log, saved_resumes, success_responses, error_files, resume_index_path)
+
+    # --- Extract, Parse and Store Each File ---
+    for saved_resume, outcome in _iter_parse_outcomes(log, current_app.config, saved_resumes):
+        response_entry = _store_parse_outcome(log, saved_resume, outcome, resume_index_path, error_files)
+        if response_entry is not None:
+            success_responses.append(response_entry)
+
+    # --- Construct Final Response ---
+    response_data: Dict[str, Any] = {}
+    status_code: int
+
+    if success_responses:
+        response_data['success_files'] = success_responses # Renamed key for clarity
+    if error_files:
+        response_data['error_files'] = error_files # Renamed key for clarity
+
+    # Determine overall status code
+    if success_responses and error_files:
+        status_code = 207 # Multi-Status (Partial Success)
+        response_data['message'] = f"{len(success_responses)} file(s) processed successfully, {len(error_files)} failed."
+    elif success_responses:
+        status_code = 200 # OK (All processed successfully)
+        response_data['message'] = f"All {len(success_responses)} file(s) processed successfully."
+    elif error_files:
+        status_code = 400 # Bad Request (All failed, likely due to client-side file issues)
+        response_data['message'] = f"All {len(error_files)} file(s) failed processing. Check errors for details."
+    else:
+         # This case means no files were processed (e.g., all skipped invalid type)
+         log.warning("Upload request finished, but no files were successfully processed or errored out.")
+         response_data['message'] = 'No valid files were provided or processed.'
+         status_code = 400 # Bad Request
+
+    log.info(f"--- Upload request finished. Success: {len(success_responses)}, Errors: {len(error_files)}. Status Code: {status_code} ---\n")
+    return jsonify(response_data), status_code
+
+
+# --- Upload Job Status Endpoint ---
+@upload_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_upload_job_status(job_id: str):
+    """
+    Reports the progress of a background upload job (see mode=job on /resumes/upload).
+    Status is one of: queued, running, completed, completed_with_errors, failed.
+    Each entry in 'files' is pending, processing, done or error. Files parsed in the process
+    pool go straight from pending to done/error, since they are parsed concurrently.
+    """
+    log = current_app.logger if current_app else fallback_logger
+    log.debug(f"Request for upload job status: '{job_id}'")
+
+    jobs_folder = current_app.config.get('UPLOAD_JOBS_FOLDER')
+    if not jobs_folder:
+        log.error("UPLOAD_JOBS_FOLDER not configured.")
+        abort(500, "Server configuration error.")
+
+    try:
+        job = load_job(jobs_folder, job_id, stale_after_seconds=current_app.config.get('UPLOAD_JOB_STALE_SECONDS'))
+    except (OSError, ValueError) as e:
+        log.error(f"Error reading upload job '{job_id}': {e}", exc_info=True)
+        abort(500, description="Could not read upload job status.")
+
+    if job is None:
+        log.warning(f"Upload job not found: '{job_id}'")
+        abort(404, description=f"Upload job '{job_id}' not found.")
+    return jsonify(job), 200
+
+
+# --- Upload Helpers ---
+def _save_uploaded_files(log, files: List, original_folder: str, resume_index_path: str,
+                         cached_files: List[Dict[str, Any]], error_files: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Validates each uploaded file and starts saving it under a unique timestamped name on the
+    persist threads ('persisted' future; the bytes are kept as 'content' for extraction).
+    Files whose content was parsed before are not saved: their stored parse is appended to
+    cached_files. Rejected files are appended to error_files. Returns the saved files' paths and names.
+    """
+    dedup_enabled = current_app.config.get('UPLOAD_DEDUP_ENABLED', True)
+    saved_resumes: List[Dict[str, Any]] = []
     for file in files:
         # Skip potentially empty file parts in the list
         if not file or not file.filename:
@@ -115,9 +234,12 @@ def upload_and_parse_resumes() -> Tuple[jsonify, int]:
         # Use a consistent, unique base derived from the sanitized name + timestamp
         file_base_timestamped = f"{safe_base_for_json}_{timestamp}"
 
-        original_filepath = os.path.join(original_folder, f"{file_base_timestamped}{extension}")
-        parsed_json_filename = f"{file_base_timestamped}_parsed.json"
-        parsed_json_filepath = os.path.join(parsed_folder, parsed_json_filename)
+        saved_resume = {
+            'original_filename': original_filename,
+            'extension': extension,
+            'original_filepath': os.path.join(original_folder, f"{file_base_timestamped}{extension}"),
+            'parsed_json_filename': f"{file_base_timestamped}_parsed.json",
+        }
 
         # --- File Type Check (using utils.allowed_file) ---
         if not allowed_file(original_filename):
@@ -126,144 +248,335 @@ def upload_and_parse_resumes() -> Tuple[jsonify, int]:
              error_files.append({'filename': original_filename, 'error': error_msg})
              continue # Skip to the next file
 
-        # --- Processing Steps within a Try-Except Block ---
-        raw_text: Optional[str] = None
-        parsed_data: Optional[Dict[str, Any]] = None
         try:
-            # 1. Save Original File
-            log.debug(f"  Saving original to: {original_filepath}")
-            file.save(original_filepath)
-            log.info(f"  Saved original: '{original_filename}' as '{os.path.basename(original_filepath)}'")
-
-            # 2. Extract Text
-            log.debug(f"  Extracting text using extension: {extension.lower()}")
-            if extension.lower() == ".pdf":
-                raw_text = extract_text_from_pdf(original_filepath)
-            elif extension.lower() == ".docx":
-                raw_text = extract_text_from_docx(original_filepath)
-            else:
-                 # Should be caught by allowed_file, but defensive check
-                 raise ValueError(f"Internal error: Unsupported file extension '{extension}'")
-
-            if raw_text is None: # Check if extraction function failed
-                raise ValueError("Text extraction function failed (returned None). Possible file corruption or library issue.")
-            if not raw_text.strip(): # Check if file content is genuinely empty
-                raise ValueError("Text extraction successful, but the document appears to be empty or contains only whitespace.")
-            log.info(f"  Text extracted successfully (Length: {len(raw_text)} chars).")
-
-            # 3. Parse Text (using utils.parse_resume_text)
-            log.info("  Parsing extracted text...")
-            parsed_data = parse_resume_text(raw_text, original_filename=original_filename) # Pass original name for context
-
-            if parsed_data is None:
-                log.warning("  Parser function returned None. Treating as empty dictionary.")
-                parsed_data = {}
-            elif not isinstance(parsed_data, dict):
-                 log.warning(f"  Parser function returned non-dict type ({type(parsed_data)}). Treating as empty dictionary.")
-                 parsed_data = {}
-
-            # Add standard metadata
-            parsed_data['_original_filename'] = original_filename
-            parsed_data['_saved_original_filepath'] = original_filepath # Store path if needed later
-            parsed_data['_saved_parsed_filename'] = parsed_json_filename
-            parsed_data['_processed_timestamp'] = datetime.datetime.now().isoformat()
-            # Avoid including full raw text in response/saved JSON unless absolutely necessary
-            # parsed_data['_raw_text_snippet'] = raw_text[:200] + "..." # Example snippet
-
-            log.info(f"  Text parsed. Name found (best guess): '{parsed_data.get('name', 'Not Found')}'")
-
-            # 4. Save Parsed Data as JSON
-            log.debug(f"  Saving parsed JSON to: {parsed_json_filepath}")
+            # 1. Hash the bytes and answer re-uploads of a known file from the cache
+            file_bytes = file.read()
+            if dedup_enabled:
+                saved_resume['content_hash'] = hashlib.sha256(file_bytes).hexdigest()
+                cached_entry = _find_cached_parse(log, saved_resume, resume_index_path)
+                if cached_entry is not None:
+                    log.info(f"  '{original_filename}' was already processed as '{cached_entry['parsedData'].get('_saved_parsed_filename')}'. Returning the cached result.")
+                    cached_files.append(cached_entry)
+                    continue
+
+            # 2. Save Original File (awaited in _store_parse_outcome, after extraction)
+            log.debug(f"  Saving original to: {saved_resume['original_filepath']}")
+            saved_resume['content'] = file_bytes
+            saved_resume['persisted'] = _get_persist_executor(current_app.config).submit(
+                _write_original, saved_resume['original_filepath'], file_bytes)
+            saved_resumes.append(saved_resume)
+        except Exception as e:
+            _handle_processing_error(log, saved_resume, e, error_files)
+    return saved_resumes
+
+
+def _parse_source(saved_resume: Dict[str, Any]) -> DocumentSource:
+    """The upload buffer while the request still holds it, else the saved original (job mode)."""
+    content = saved_resume.get('content')
+    return content if content is not None else saved_resume['original_filepath']
+
+
+def _iter_parse_outcomes(log, config, saved_resumes: List[Dict[str, Any]], on_file_start=None):
+    """
+    Extracts and parses the uploaded files (see _parse_source), inline or concurrently in the
+    parsing process pool (UPLOAD_PARSE_MODE). Yields (saved_resume, outcome) in upload order, where outcome is
+    the dict from utils.extract_and_parse_resume or the exception raised for that file.
+    on_file_start(index) is only called for inline parsing: pooled files are parsed
+    concurrently, so waiting on one of them says nothing about which one is being parsed.
+    """
+    if config.get('UPLOAD_PARSE_MODE', 'inline') == 'process' and len(saved_resumes) > 1:
+        log.info(f"Parsing {len(saved_resumes)} file(s) in the parsing process pool...")
+        futures = [
+            submit_resume_parse(config, _parse_source(r), r['extension'], r['original_filename'])
+            for r in saved_resumes
+        ]
+        for saved_resume, future in zip(saved_resumes, futures): # Submission order keeps the response order stable
             try:
-                with open(parsed_json_filepath, "w", encoding="utf-8") as f_json:
-                    json.dump(parsed_data, f_json, indent=4, ensure_ascii=False)
-                log.info(f"  Saved parsed JSON successfully: '{parsed_json_filename}'")
-            except TypeError as json_err:
-                log.error(f"  ERROR: Could not serialize parsed data to JSON for '{original_filename}': {json_err}", exc_info=True)
-                # Add error note to the data itself before adding to success list
-                parsed_data['json_save_error'] = f"SerializationError: {json_err}"
-                success_responses.append({
-                    'filename': original_filename,
-                    'parsedData': parsed_data, # Return data even if save failed
-                    'warning': 'Parsed data contains non-serializable types; JSON save failed.'
-                })
-                continue # Skip normal success append, move to next file
-
-            # --- Add Fully Successful Result ---
-            success_responses.append({
-                'filename': original_filename,
-                'parsedData': parsed_data,
-                'message': 'Processed successfully.'
-            })
-
-        except FileNotFoundError as fnf_err:
-             # Should generally not happen after initial directory checks/creation
-             error_msg = f"File not found during processing: {fnf_err}"
-             log.error(f"  ERROR for '{original_filename}': {error_msg}", exc_info=True)
-             error_files.append({'filename': original_filename, 'error': error_msg})
+                yield saved_resume, future.result()
+            except BrokenProcessPool as e:
+                reset_parse_pool()
+                yield saved_resume, e
+            except Exception as e:
+                yield saved_resume, e
+    elif len(saved_resumes) > 1:
+        # Extracted together so the NER model sees all name chunks in nlp.pipe batches
+        outcomes = extract_and_parse_resumes(
+            [(_parse_source(r), r['extension'], r['original_filename']) for r in saved_resumes],
+            on_file_start=on_file_start
+        )
+        yield from zip(saved_resumes, outcomes)
+    else:
+        for index, saved_resume in enumerate(saved_resumes):
+            if on_file_start: on_file_start(index)
+            try:
+                yield saved_resume, extract_and_parse_resume(_parse_source(saved_resume), saved_resume['extension'], saved_resume['original_filename'])
+            except Exception as e:
+                yield saved_resume, e
+
+
+def _store_parse_outcome(log, saved_resume: Dict[str, Any], outcome, resume_index_path: str,
+                         error_files: List[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+    """
+    Stores a successful parse outcome, or records its error. Returns the success entry, if any.
+    Waits for the original file to be on disk first: the stored parse points at it, and error
+    cleanup must not race the write.
+    """
+    saved_resume.pop('content', None) # Parsed: the upload buffer is no longer needed
+    try:
+        _wait_for_original(log, saved_resume)
+    except Exception as e:
+        _handle_processing_error(log, saved_resume, e, error_files)
+        return None
+    if isinstance(outcome, Exception):
+        _handle_processing_error(log, saved_resume, outcome, error_files)
+        return None
+    try:
+        return _store_parsed_resume(log, saved_resume, outcome, resume_index_path)
+    except Exception as e:
+        _handle_processing_error(log, saved_resume, e, error_files)
+        return None
 
-        except ValueError as val_err: # Catch specific errors like empty text or parser issues
-            error_msg = f"Data processing error: {val_err}"
-            log.error(f"  ERROR for '{original_filename}': {error_msg}") # No traceback for simple ValueErrors
-            error_files.append({'filename': original_filename, 'error': error_msg})
-            # Cleanup original file if processing failed after saving it
-            if os.path.exists(original_filepath):
-                try: os.remove(original_filepath); log.info(f"Removed original file '{os.path.basename(original_filepath)}' after processing error.")
-                except OSError as rm_err: log.warning(f"Could not remove original file after error: {rm_err}")
-
-        except OSError as os_err: # Catch file system errors during save/access
-             error_msg = f"File system error: {os_err}"
-             log.error(f"  ERROR for '{original_filename}': {error_msg}", exc_info=True)
-             error_files.append({'filename': original_filename, 'error': error_msg})
-             # Cleanup original/parsed if they exist
-             if os.path.exists(original_filepath):
-                 try: os.remove(original_filepath); log.info(f"Removed original file '{os.path.basename(original_filepath)}' after OS error.")
-                 except OSError as rm_err: log.warning(f"Could not remove original file after OS error: {rm_err}")
-             if os.path.exists(parsed_json_filepath):
-                 try: os.remove(parsed_json_filepath); log.info(f"Removed parsed JSON file '{parsed_json_filename}' after OS error.")
-                 except OSError as rm_err: log.warning(f"Could not remove parsed JSON file after OS error: {rm_err}")
 
+def _wait_for_original(log, saved_resume: Dict[str, Any]) -> None:
+    """Blocks until the original file is written. Raises the write's error (e.g. OSError)."""
+    persisted: Optional[Future] = saved_resume.pop('persisted', None)
+    if persisted is not None:
+        persisted.result()
+        log.info(f"  Saved original: '{saved_resume['original_filename']}' as '{os.path.basename(saved_resume['original_filepath'])}'")
 
+
+def _persist_originals(log, saved_resumes: List[Dict[str, Any]], error_files: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Job mode: waits for every original to be written and drops its upload buffer, so a queued
+    job holds file paths rather than file contents. Files whose write failed are appended to
+    error_files. Returns the files saved.
+    """
+    persisted_resumes = []
+    for saved_resume in saved_resumes:
+        saved_resume.pop('content', None)
+        try:
+            _wait_for_original(log, saved_resume)
+        except Exception as e:
+            _handle_processing_error(log, saved_resume, e, error_files)
+            continue
+        persisted_resumes.append(saved_resume)
+    return persisted_resumes
+
+
+def _start_upload_job(log, saved_resumes: List[Dict[str, Any]], cached_files: List[Dict[str, Any]],
+                      error_files: List[Dict[str, str]], resume_index_path: str):
+    """Queues the saved files as a background upload job and returns the 202 response."""
+    jobs_folder = current_app.config['UPLOAD_JOBS_FOLDER']
+    job = create_job(jobs_folder, [r['original_filename'] for r in saved_resumes], error_files,
+                     ttl_seconds=current_app.config.get('UPLOAD_JOB_TTL_SECONDS'), success_files=cached_files)
+    # Build the response before the job starts mutating its status dict
+    response_data = {
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'status_url': url_for('upload_resume.get_upload_job_status', job_id=job['job_id']),
+        'total_files': job['total_files'],
+        'success_files': cached_files,
+        'error_files': error_files,
+        'message': f"{len(saved_resumes)} file(s) queued for processing."
+    }
+    app = current_app._get_current_object() # The background thread needs the real app, not the proxy
+    submit_job(app.config, _run_upload_job, app, job, saved_resumes, resume_index_path)
+    log.info(f"--- Queued upload job {job['job_id']} for {len(saved_resumes)} file(s). ---")
+    return jsonify(response_data), 202
+
+
+def _run_upload_job(app, job: Dict[str, Any], saved_resumes: List[Dict[str, Any]], resume_index_path: str) -> None:
+    """Background job body: parses and stores each file, recording per-file progress."""
+    with app.app_context():
+        log = app.logger
+        jobs_folder = app.config['UPLOAD_JOBS_FOLDER']
+        try:
+            mark_job_running(jobs_folder, job)
+            on_file_start = lambda index: mark_file_processing(jobs_folder, job, index)
+            for index, (saved_resume, outcome) in enumerate(_iter_parse_outcomes(log, app.config, saved_resumes, on_file_start)):
+                file_errors: List[Dict[str, str]] = []
+                response_entry = _store_parse_outcome(log, saved_resume, outcome, resume_index_path, file_errors)
+                record_file_result(jobs_folder, job, index, success_entry=response_entry,
+                                   error_entry=file_errors[0] if file_errors else None)
+            finish_job(jobs_folder, job)
         except Exception as e:
-            # Catch any other unexpected exceptions
-            error_msg = f"Unexpected error: {type(e).__name__} - {str(e)}"
-            log.critical(f"  CRITICAL ERROR for '{original_filename}': {error_msg}", exc_info=True) # Log full traceback
-            error_files.append({'filename': original_filename, 'error': "An unexpected server error occurred."}) # Generic msg to client
-            # Attempt cleanup
-            if os.path.exists(original_filepath):
-                 try: os.remove(original_filepath); log.info(f"Removed original file '{os.path.basename(original_filepath)}' after critical error.")
-                 except OSError as rm_err: log.warning(f"Could not remove original file after critical error: {rm_err}")
-            if os.path.exists(parsed_json_filepath):
-                try: os.remove(parsed_json_filepath); log.info(f"Removed parsed JSON file '{parsed_json_filename}' after critical error.")
-                except OSError as rm_err: log.warning(f"Could not remove parsed JSON file after critical error: {rm_err}")
+            log.critical(f"Upload job {job['job_id']} failed unexpectedly: {e}", exc_info=True)
+            try: finish_job(jobs_folder, job, failure="An unexpected server error occurred.")
+            except OSError as write_err: log.error(f"Could not record failure of upload job {job['job_id']}: {write_err}")
 
-    # --- Construct Final Response ---
-    response_data: Dict[str, Any] = {}
-    status_code: int
 
-    if success_responses:
-        response_data['success_files'] = success_responses # Renamed key for clarity
-    if error_files:
-        response_data['error_files'] = error_files # Renamed key for clarity
+def _store_parsed_resume(log, saved_resume: Dict[str, str], outcome: Dict[str, Any], resume_index_path: str) -> Dict[str, Any]:
+    """
+    Adds metadata to a parsed resume, saves it in the resume store and indexes its keywords.
+    Returns the per-file entry for the upload response.
+    """
+    original_filename = saved_resume['original_filename']
+    parsed_json_filename = saved_resume['parsed_json_filename']
+    parsed_data: Optional[Dict[str, Any]] = outcome.get('parsed_data')
+
+    if parsed_data is None:
+        log.warning("  Parser function returned None. Treating as empty dictionary.")
+        parsed_data = {}
+    elif not isinstance(parsed_data, dict):
+         log.warning(f"  Parser function returned non-dict type ({type(parsed_data)}). Treating as empty dictionary.")
+         parsed_data = {}
+
+    # Add standard metadata
+    parsed_data['_original_filename'] = original_filename
+    parsed_data['_saved_original_filepath'] = saved_resume['original_filepath'] # Store path if needed later
+    parsed_data['_saved_parsed_filename'] = parsed_json_filename
+    parsed_data['_processed_timestamp'] = datetime.datetime.now().isoformat()
+    if saved_resume.get('content_hash'):
+        parsed_data['_content_hash'] = saved_resume['content_hash']
+    # The full raw text goes to the raw text store (step 5), never into the response/stored parse
+
+    log.info(f"  Text parsed. Name found (best guess): '{parsed_data.get('name', 'Not Found')}'")
+
+    # 4. Save Parsed Data in the Resume Store
+    log.debug(f"  Storing parsed resume as: {parsed_json_filename}")
+    try:
+        store_parsed_resume(resume_index_path, parsed_json_filename, parsed_data)
+        log.info(f"  Stored parsed resume successfully: '{parsed_json_filename}'")
+    except TypeError as json_err:
+        log.error(f"  ERROR: Could not serialize parsed data to JSON for '{original_filename}': {json_err}", exc_info=True)
+        # Add error note to the data itself before adding to success list
+        parsed_data['json_save_error'] = f"SerializationError: {json_err}"
+        return {
+            'filename': original_filename,
+            'parsedData': parsed_data, # Return data even if save failed
+            'warning': 'Parsed data contains non-serializable types; JSON save failed.',
+            'cache_hit': False
+        }
+
+    # An identical file may have been stored meanwhile (same request in the process pool, or a
+    # concurrent upload): the first one to claim the hash is kept, this copy is dropped.
+    duplicate_entry = _claim_parsed_resume(log, saved_resume, resume_index_path)
+    if duplicate_entry is not None:
+        return duplicate_entry
+
+    # 5. Store Raw Text (compressed, outside the JSON) and Index Keywords (once per resume, so scans only intersect sets)
+    raw_text = outcome.get('raw_text')
+    raw_text_store_path = current_app.config.get('RAW_TEXT_STORE_PATH')
+    if raw_text and raw_text_store_path:
+        try:
+            put_raw_text(raw_text_store_path, parsed_json_filename, raw_text)
+        except Exception as store_err:
+            # Not fatal: only needed if the resume has to be re-indexed later
+            log.error(f"  ERROR: Could not store raw text for '{original_filename}': {store_err}", exc_info=True)
 
-    # Determine overall status code
-    if success_responses and error_files:
-        status_code = 207 # Multi-Status (Partial Success)
-        response_data['message'] = f"{len(success_responses)} file(s) processed successfully, {len(error_files)} failed."
-    elif success_responses:
-        status_code = 200 # OK (All processed successfully)
-        response_data['message'] = f"All {len(success_responses)} file(s) processed successfully."
-    elif error_files:
-        status_code = 400 # Bad Request (All failed, likely due to client-side file issues)
-        response_data['message'] = f"All {len(error_files)} file(s) failed processing. Check errors for details."
+    resume_keywords = outcome.get('keywords')
+    if resume_keywords is not None:
+        try:
+            index_resume_keywords(resume_index_path, parsed_json_filename, set(resume_keywords))
+            log.info(f"  Indexed {len(resume_keywords)} keywords for '{parsed_json_filename}'.")
+        except Exception as index_err:
+            # Not fatal: the resume is saved, it just won't be scannable until re-indexed
+            log.error(f"  ERROR: Could not index keywords for '{original_filename}': {index_err}", exc_info=True)
     else:
-         # This case means no files were processed (e.g., all skipped invalid type)
-         log.warning("Upload request finished, but no files were successfully processed or errored out.")
-         response_data['message'] = 'No valid files were provided or processed.'
-         status_code = 400 # Bad Request
+        # Left unindexed on purpose: /scan/batch backfills it from the raw text on the next scan
+        log.warning(f"  No keywords extracted (NLTK not ready or extraction failed). Skipping keyword indexing for '{original_filename}'.")
+
+    # --- Fully Successful Result ---
+    return {
+        'filename': original_filename,
+        'parsedData': parsed_data,
+        'message': 'Processed successfully.',
+        'cache_hit': False
+    }
 
-    log.info(f"--- Upload request finished. Success: {len(success_responses)}, Errors: {len(error_files)}. Status Code: {status_code} ---\n")
-    return jsonify(response_data), status_code
+
+def _find_cached_parse(log, saved_resume: Dict[str, str], resume_index_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Looks up the stored parse of an earlier upload with the same content hash.
+    Returns its upload response entry (flagged as a cache hit), or None on a miss. A hash whose
+    parse is gone from the store (deleted or never stored) is forgotten, so the file gets parsed again.
+    """
+    content_hash = saved_resume['content_hash']
+    try:
+        resume_id = find_resume_by_content_hash(resume_index_path, content_hash)
+        if resume_id is None:
+            return None
+        parsed_data = load_parsed_resume(resume_index_path, resume_id)
+        if parsed_data is None:
+            log.info(f"  Cached parse '{resume_id}' no longer exists. Processing '{saved_resume['original_filename']}' again.")
+            forget_content_hash(resume_index_path, content_hash, resume_id)
+            return None
+    except Exception as e:
+        # A broken cache must never fail the upload: just parse the file
+        log.warning(f"  Content hash lookup failed for '{saved_resume['original_filename']}': {e}. Processing it normally.")
+        return None
+    return {
+        'filename': saved_resume['original_filename'],
+        'parsedData': parsed_data,
+        'message': 'Identical file already processed; returned the stored result.',
+        'cache_hit': True
+    }
+
+
+def _claim_parsed_resume(log, saved_resume: Dict[str, str], resume_index_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Records the just-saved parse as the owner of its content hash. If another resume already
+    owns it, removes this upload's files and returns the owner's cached entry instead.
+    """
+    content_hash = saved_resume.get('content_hash')
+    if not content_hash:
+        return None
+    resume_id = saved_resume['parsed_json_filename']
+    try:
+        owner_id = claim_content_hash(resume_index_path, content_hash, resume_id)
+        if owner_id == resume_id:
+            return None
+        cached_entry = _find_cached_parse(log, saved_resume, resume_index_path)
+        if cached_entry is None: # The owner's parse is gone: this upload takes over the hash
+            claim_content_hash(resume_index_path, content_hash, resume_id)
+            return None
+    except Exception as e:
+        log.warning(f"  Could not record content hash for '{saved_resume['original_filename']}': {e}")
+        return None
+    log.info(f"  '{saved_resume['original_filename']}' duplicates '{owner_id}'. Dropping this copy.")
+    try: delete_parsed_resume(resume_index_path, resume_id)
+    except Exception as delete_err: log.warning(f"  Could not remove duplicate parse '{resume_id}': {delete_err}")
+    _remove_if_exists(log, saved_resume['original_filepath'], "duplicate upload")
+    return cached_entry
+
+
+def _remove_if_exists(log, filepath: str, reason: str) -> None:
+    """Best-effort cleanup of a partially processed upload."""
+    if os.path.exists(filepath):
+        try: os.remove(filepath); log.info(f"Removed file '{os.path.basename(filepath)}' after {reason}.")
+        except OSError as rm_err: log.warning(f"Could not remove file after {reason}: {rm_err}")
+
+
+def _handle_processing_error(log, saved_resume: Dict[str, str], err: Exception, error_files: List[Dict[str, str]]) -> None:
+    """Logs a per-file failure, records it for the response and cleans up its files."""
+    original_filename = saved_resume['original_filename']
+    if isinstance(err, FileNotFoundError):
+         # Should generally not happen after initial directory checks/creation
+         error_msg = f"File not found during processing: {err}"
+         log.error(f"  ERROR for '{original_filename}': {error_msg}", exc_info=err)
+         error_files.append({'filename': original_filename, 'error': error_msg})
+
+    elif isinstance(err, ValueError): # Catch specific errors like empty text or parser issues
+        error_msg = f"Data processing error: {err}"
+        log.error(f"  ERROR for '{original_filename}': {error_msg}") # No traceback for simple ValueErrors
+        error_files.append({'filename': original_filename, 'error': error_msg})
+        # Cleanup original file if processing failed after saving it
+        _remove_if_exists(log, saved_resume['original_filepath'], "processing error")
+
+    elif isinstance(err, OSError): # Catch file system errors during save/access
+         error_msg = f"File system error: {err}"
+         log.error(f"  ERROR for '{original_filename}': {error_msg}", exc_info=err)
+         error_files.append({'filename': original_filename, 'error': error_msg})
+         # Cleanup original if it exists
+         _remove_if_exists(log, saved_resume['original_filepath'], "OS error")
+
+    else:
+        # Catch any other unexpected exceptions
+        error_msg = f"Unexpected error: {type(err).__name__} - {str(err)}"
+        log.critical(f"  CRITICAL ERROR for '{original_filename}': {error_msg}", exc_info=err) # Log full traceback
+        error_files.append({'filename': original_filename, 'error': "An unexpected server error occurred."}) # Generic msg to client
+        # Attempt cleanup
+        _remove_if_exists(log, saved_resume['original_filepath'], "critical error")
 
 
 # --- Download Endpoint ---
@@ -328,8 +641,8 @@ def download_original_resume(filename: str):
 @upload_bp.route('/download/parsed/<path:filename>', methods=['GET'])
 def download_parsed_resume(filename: str):
     """
-    Serves a parsed resume JSON file for download.
-    Expects the *timestamped* filename (e.g., myresume_20231027103000123456_parsed.json).
+    Serves a parsed resume as a JSON file download, serialized on demand from the resume store.
+    Expects the resume's *timestamped* ID (e.g., myresume_20231027103000123456_parsed.json).
     """
     log = current_app.logger if current_app else fallback_logger
     log.info(f"Request to download parsed resume JSON: '{filename}'")
@@ -343,32 +656,24 @@ def download_parsed_resume(filename: str):
          log.warning(f"Download failed: Potentially invalid filename characters in '{filename}'")
          abort(400, description="Invalid filename format provided.")
 
-    parsed_resume_dir = current_app.config.get('PARSED_DATA_FOLDER')
-    if not parsed_resume_dir:
-        log.error("PARSED_DATA_FOLDER not configured.")
+    resume_index_path = current_app.config.get('RESUME_INDEX_PATH')
+    if not resume_index_path:
+        log.error("RESUME_INDEX_PATH not configured.")
         abort(500, "Server configuration error.")
 
-    abs_parsed_resume_dir = os.path.abspath(parsed_resume_dir)
-    target_file_path = os.path.join(abs_parsed_resume_dir, secure_name)
-    abs_target_file_path = os.path.abspath(target_file_path)
-
-    # Security Check
-    if not abs_target_file_path.startswith(abs_parsed_resume_dir + os.sep):
-        log.error(f"Security Alert: Path traversal attempt? Requested '{filename}', resolved to '{abs_target_file_path}', which is outside '{abs_parsed_resume_dir}'")
-        abort(403, description="Access denied.")
+    try:
+        parsed_data = load_parsed_resume(resume_index_path, secure_name)
+    except Exception as e:
+        log.error(f"Error reading parsed resume '{secure_name}' from the resume store: {e}", exc_info=True)
+        abort(500, description="Internal server error while serving file.")
 
-    if not os.path.isfile(abs_target_file_path):
-        log.warning(f"Download failed: Parsed JSON file not found at '{abs_target_file_path}'")
+    if parsed_data is None:
+        log.warning(f"Download failed: Parsed resume '{secure_name}' not found in the resume store.")
         abort(404, description=f"Parsed resume data '{secure_name}' not found.")
 
-    try:
-        log.info(f"Serving file: '{secure_name}' from directory '{abs_parsed_resume_dir}'")
-        return send_from_directory(
-            directory=abs_parsed_resume_dir,
-            path=secure_name,
-            mimetype='application/json', # Explicitly set mimetype for JSON
-            as_attachment=True
-        )
-    except Exception as e:
-        log.error(f"Error serving parsed JSON file '{secure_name}': {e}", exc_info=True)
-        abort(500, description="Internal server error while serving file.")
\ No newline at end of file
+    log.info(f"Serving parsed resume: '{secure_name}'")
+    return Response(
+        json.dumps(parsed_data, indent=4, ensure_ascii=False), # Same layout as the former JSON files
+        mimetype='application/json',
+        headers={'Content-Disposition': f'attachment; filename={secure_name}'}
+    )
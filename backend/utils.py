@@ -1,23 +1,39 @@
 # backend/utils.py
 # -*- coding: utf-8 -*-
 
+import io
 import os
 import re
 import fitz  # PyMuPDF
-import docx  # python-docx
-import spacy
 import traceback
 import json
 import nltk
+import itertools
+import multiprocessing
 import string
 import logging
-from typing import Dict, Any, Optional, List, Tuple, Set
+import atexit
+import threading
+import time
+import tempfile
+import zipfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from xml.etree import ElementTree
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, BinaryIO, Dict, Any, Iterable, Iterator, Optional, List, Tuple, Set, FrozenSet, Union
 
 # Use current_app from Flask to access configuration and logger within functions
 from flask import current_app
 
 # Import configuration constants directly from config within the package
 from . import config # Use relative import
+from .nlp_model import get_nlp_model
+from .nlp_bundle import (load_bundle_manifest, bundle_nltk_data_path, read_bundle_stop_words, read_bundle_lemma_table,
+                         read_lemma_file, write_lemma_file)
+
+if TYPE_CHECKING:
+    import spacy # Imported by nlp_model when the model is first loaded
 
 # --- Setup Logger ---
 # This logger can be used by functions outside the Flask app context (like initialize_nltk)
@@ -32,27 +48,27 @@ if not logger.hasHandlers():
 # These will be initialized by initialize_nltk() called from create_app()
 lemmatizer: Optional[nltk.stem.WordNetLemmatizer] = None
 all_stop_words: Set[str] = set()
+# (word, WordNet POS) -> lemma, precomputed in the NLP bundle; consulted before the lemmatizer
+lemma_table: Dict[Tuple[str, str], str] = {}
 
 # --- NLTK Initialization ---
-def initialize_nltk():
+def initialize_nltk(bundle_path: Optional[str] = None):
     """
     Initializes NLTK components (Lemmatizer, Stopwords).
     Call this ONCE during Flask app startup (within create_app).
     Handles download if data is missing. Returns True on success, False on failure.
+    With an NLP bundle (NLP_BUNDLE_PATH) everything comes from the bundle instead:
+    no data checks, no downloads.
     """
     global lemmatizer, all_stop_words
     if lemmatizer is not None:
         logger.info("NLTK components appear to be already initialized.")
         return True # Indicate success or already done
+    if bundle_path:
+        return _initialize_nltk_from_bundle(bundle_path)
 
     logger.info("--- Initializing NLTK components in utils ---")
-    required_data = [
-        ('tokenizers/punkt', 'punkt'),
-        ('corpora/stopwords', 'stopwords'),
-        ('corpora/wordnet', 'wordnet'),
-        ('corpora/omw-1.4', 'omw-1.4'), # Needed by WordNetLemmatizer
-        ('taggers/averaged_perceptron_tagger', 'averaged_perceptron_tagger')
-    ]
+    required_data = config.NLTK_DATA_PACKAGES
     all_found_or_downloaded = True
 
     # Optional: Specify download directory for serverless environments like /tmp
@@ -117,6 +133,32 @@ def initialize_nltk():
         return False
 
 
+def _initialize_nltk_from_bundle(bundle_path: str) -> bool:
+    """Loads the stop words and lemma table of an NLP bundle and points NLTK at its data."""
+    global lemmatizer, all_stop_words, lemma_table
+    logger.info(f"--- Initializing NLTK components from NLP bundle {bundle_path} ---")
+    try:
+        start_time = time.perf_counter()
+        manifest = load_bundle_manifest(bundle_path)
+        nltk_data_path = bundle_nltk_data_path(bundle_path, manifest)
+        if nltk_data_path not in nltk.data.path:
+            nltk.data.path.insert(0, nltk_data_path)
+        all_stop_words = read_bundle_stop_words(bundle_path, manifest)
+        logger.info(f"[NLTK] Bundle {manifest['bundle_id']}: {len(all_stop_words)} stop words loaded in {time.perf_counter() - start_time:.3f}s.")
+        start_time = time.perf_counter()
+        lemma_table = read_bundle_lemma_table(bundle_path, manifest)
+        logger.info(f"[NLTK] Bundle {manifest['bundle_id']}: {len(lemma_table)} precomputed lemmas loaded in {time.perf_counter() - start_time:.3f}s.")
+        lemmatizer = nltk.stem.WordNetLemmatizer() # WordNet itself is only read on a lemma table miss
+        logger.info("--- NLTK Initialization from bundle successful ---")
+        return True
+    except Exception as e:
+        logger.critical(f"[NLTK CRITICAL ERROR] Failed to load NLTK components from NLP bundle '{bundle_path}': {e}", exc_info=True)
+        lemmatizer = None
+        all_stop_words = set()
+        lemma_table = {}
+        return False
+
+
 # --- File Handling Helper ---
 def allowed_file(filename: str) -> bool:
     """Check if the file has an allowed extension (uses config)"""
@@ -124,75 +166,286 @@ def allowed_file(filename: str) -> bool:
            filename.rsplit('.', 1)[1].lower() in config.ALLOWED_EXTENSIONS
 
 # --- Text Extraction Functions ---
-def extract_text_from_pdf(pdf_path: str) -> Optional[str]:
-    """Extracts text from a PDF file using PyMuPDF (fitz), preserving basic layout."""
-    text = ""
+# Whitespace clean-up shared by the extractors
+_MULTI_SPACE_PATTERN = re.compile(r'[ \t]{2,}')
+_EXCESS_NEWLINES_PATTERN = re.compile(r'\n{3,}')
+_TEXT_LINE_PATTERN = re.compile(r'[^\n]+') # Non-empty lines
+
+# A document to extract text from: a file path, the file's bytes or a binary file-like object
+DocumentSource = Union[str, bytes, BinaryIO]
+
+def _source_name(source: DocumentSource) -> str:
+    """Name of a document source for log messages."""
+    if isinstance(source, str):
+        return os.path.basename(source)
+    if isinstance(source, bytes):
+        return f"<{len(source)}-byte buffer>"
+    name = getattr(source, 'name', None)
+    return os.path.basename(name) if isinstance(name, str) else "<stream>"
+
+def _open_pdf(pdf_source: DocumentSource) -> "fitz.Document":
+    """Opens a PDF from a path, or from its bytes / a binary stream in memory."""
+    if isinstance(pdf_source, str):
+        return fitz.open(pdf_source)
+    pdf_bytes = pdf_source if isinstance(pdf_source, bytes) else pdf_source.read()
+    return fitz.open(stream=pdf_bytes, filetype="pdf")
+
+def _pdf_page_lines(page: "fitz.Page") -> Iterator[str]:
+    """Yields the normalized, non-empty lines of one PDF page, preserving basic layout."""
+    parts: List[str] = []
+    last_y1 = 0
+    for b in page.get_text("blocks", sort=True):
+        if b[6] == 0: # Text block
+             # Add newline logic based on vertical spacing
+             if b[1] > last_y1 + 10: parts.append("\n\n") # Likely new paragraph
+             elif b[1] > last_y1 + 2: parts.append("\n")  # Likely new line
+             parts.append(b[4].strip())
+             parts.append(" ") # Add space after block text
+             last_y1 = b[3] # Update last y position
+    for line in "".join(parts).splitlines():
+        line = line.strip()
+        if line: # Skip empty lines; normalize multiple spaces within lines
+            yield _MULTI_SPACE_PATTERN.sub(' ', line)
+
+def _limit_chars(lines: Iterable[str], max_chars: Optional[int]) -> Iterator[str]:
+    """Passes lines through until max_chars characters (counting the joining newlines) are reached."""
+    if max_chars is None:
+        yield from lines
+        return
+    remaining_chars = max_chars
+    for line in lines:
+        if len(line) >= remaining_chars:
+            if remaining_chars > 0:
+                yield line[:remaining_chars]
+            logger.info(f"PDF character budget ({max_chars}) reached.")
+            return
+        remaining_chars -= len(line) + 1 # + the newline joining it to the next line
+        yield line
+
+def iter_pdf_lines(pdf_source: DocumentSource, max_pages: Optional[int] = None,
+                   max_chars: Optional[int] = None) -> Iterator[str]:
+    """
+    Yields the normalized, non-empty lines of a PDF page by page, reading at most max_pages pages
+    and max_chars characters (None: no limit). Only one page's text is held at a time.
+    Raises whatever PyMuPDF raises for unreadable documents.
+    """
+    with _open_pdf(pdf_source) as doc:
+        page_count = doc.page_count if max_pages is None else min(doc.page_count, max_pages)
+        if page_count < doc.page_count:
+            logger.info(f"PDF page budget reached: text of pages {page_count + 1}-{doc.page_count} skipped.")
+        yield from _limit_chars((line for page_num in range(page_count) for line in _pdf_page_lines(doc[page_num])), max_chars)
+
+def extract_pdf_page_range(pdf_source: Union[str, bytes], start_page: int, stop_page: int,
+                           max_chars: Optional[int] = None) -> List[str]:
+    """
+    PDF page pool entry point: the lines of pages [start_page, stop_page) of a PDF, each worker
+    opening its own document (see _iter_pdf_lines_in_parallel).
+    """
+    with _open_pdf(pdf_source) as doc:
+        return list(_limit_chars((line for page_num in range(start_page, min(stop_page, doc.page_count))
+                                  for line in _pdf_page_lines(doc[page_num])), max_chars))
+
+def _iter_pdf_lines_in_parallel(app_config, pdf_path: str, page_count: int, max_chars: Optional[int]) -> Iterator[str]:
+    """
+    iter_pdf_lines for the first page_count pages, split into one page range per worker of the
+    PDF page pool. Ranges are read back in order, so lines are yielded in document order as soon
+    as the ranges before them are done; ranges past the character budget are cancelled.
+    Workers get the file's path, not its content.
+    """
+    from .workers import submit_pdf_page_range # workers imports this module
+    worker_count = app_config.get('PDF_PARALLEL_WORKERS') or os.cpu_count() or 1
+    pages_per_range = -(-page_count // worker_count) # Ceiling division
+    futures = [
+        submit_pdf_page_range(app_config, pdf_path, start_page, min(start_page + pages_per_range, page_count), max_chars)
+        for start_page in range(0, page_count, pages_per_range)
+    ]
+    try:
+        yield from _limit_chars((line for future in futures for line in future.result()), max_chars)
+    finally:
+        for future in futures:
+            future.cancel()
+
+def _parallel_pdf_page_count(app_config, pdf_source: Union[str, bytes], max_pages: Optional[int]) -> int:
+    """
+    Number of pages to extract across the PDF page pool, or 0 to extract in this process: below
+    PDF_PARALLEL_PAGE_THRESHOLD pages (unset by default), outside the app, or inside a pool worker.
+    """
+    threshold = app_config.get('PDF_PARALLEL_PAGE_THRESHOLD', config.PDF_PARALLEL_PAGE_THRESHOLD)
+    if not threshold or not app_config or multiprocessing.parent_process() is not None:
+        return 0
+    with _open_pdf(pdf_source) as doc: # Only reads the page tree, not the page contents
+        page_count = doc.page_count if max_pages is None else min(doc.page_count, max_pages)
+    return page_count if page_count >= threshold else 0
+
+@contextmanager
+def _pdf_file(pdf_source: Union[str, bytes]) -> Iterator[str]:
+    """Path of a PDF: the path itself, or a temporary copy of in-memory bytes (removed afterwards)."""
+    if isinstance(pdf_source, str):
+        yield pdf_source
+        return
+    fd, temp_path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_source)
+        yield temp_path
+    finally:
+        os.remove(temp_path)
+
+def extract_text_from_pdf(pdf_source: DocumentSource, max_pages: Optional[int] = None,
+                          max_chars: Optional[int] = None) -> Optional[str]:
+    """
+    Extracts text from a PDF using PyMuPDF (fitz), preserving basic layout.
+    pdf_source is a path, or the PDF's bytes / a binary stream (e.g. an upload), read in memory.
+    Reads at most max_pages pages and max_chars characters (default: PDF_MAX_PAGES, PDF_MAX_CHARS).
+    With PDF_PARALLEL_PAGE_THRESHOLD set, longer PDFs are split into page ranges extracted
+    concurrently in the PDF page pool (see workers.get_pdf_page_pool).
+    """
     log = current_app.logger if current_app else logger # Use app logger if in context
-    log.debug(f"Attempting to extract text from PDF: {os.path.basename(pdf_path)}")
+    source_name = _source_name(pdf_source)
+    log.debug(f"Attempting to extract text from PDF: {source_name}")
+    app_config = current_app.config if current_app else {}
+    if max_pages is None:
+        max_pages = app_config.get('PDF_MAX_PAGES', config.PDF_MAX_PAGES)
+    if max_chars is None:
+        max_chars = app_config.get('PDF_MAX_CHARS', config.PDF_MAX_CHARS)
     try:
-        with fitz.open(pdf_path) as doc:
-            for page_num, page in enumerate(doc):
-                blocks = page.get_text("blocks", sort=True)
-                page_text = ""
-                last_y1 = 0
-                for b in blocks:
-                    if b[6] == 0: # Text block
-                         # Add newline logic based on vertical spacing
-                         if b[1] > last_y1 + 10: page_text += "\n\n" # Likely new paragraph
-                         elif b[1] > last_y1 + 2: page_text += "\n"  # Likely new line
-                         page_text += b[4].strip() + " " # Add space after block text
-                         last_y1 = b[3] # Update last y position
-                text += page_text.strip() + "\n\n" # Add double newline between pages
-
-        # Post-processing to clean up extra whitespace
-        lines = text.splitlines()
-        stripped_lines = [line.strip() for line in lines if line.strip()] # Remove empty lines
-        text = "\n".join(stripped_lines)
-        text = re.sub(r'[ \t]{2,}', ' ', text) # Normalize multiple spaces within lines
-        text = re.sub(r'\n{3,}', '\n\n', text) # Reduce excessive blank lines
-        text = text.strip()
+        if not isinstance(pdf_source, (str, bytes)):
+            pdf_source = pdf_source.read() # Read once: a stream can be neither reopened nor sent to workers
+        text = None
+        parallel_page_count = _parallel_pdf_page_count(app_config, pdf_source, max_pages)
+        if parallel_page_count:
+            log.info(f"Extracting {parallel_page_count} pages of {source_name} in the PDF page pool...")
+            try:
+                with _pdf_file(pdf_source) as pdf_path:
+                    text = "\n".join(_iter_pdf_lines_in_parallel(app_config, pdf_path, parallel_page_count, max_chars))
+            except BrokenProcessPool as e:
+                log.warning(f"PDF page pool broke during parallel extraction ({e}). Extracting {source_name} in this process.")
+                _reset_pdf_page_pool()
+        if text is None:
+            # One join over the streamed lines instead of growing the text page by page
+            text = "\n".join(iter_pdf_lines(pdf_source, max_pages, max_chars))
 
         if text:
-             log.info(f"Successfully extracted text from PDF: {os.path.basename(pdf_path)} (Length: {len(text)})")
+             log.info(f"Successfully extracted text from PDF: {source_name} (Length: {len(text)})")
              return text
         else:
-             log.warning(f"Extracted empty text from PDF: {os.path.basename(pdf_path)}")
+             log.warning(f"Extracted empty text from PDF: {source_name}")
              return None
     except Exception as e:
-        log.error(f"Error processing PDF {os.path.basename(pdf_path)}: {e}", exc_info=True)
+        log.error(f"Error processing PDF {source_name}: {e}", exc_info=True)
         return None
 
-def extract_text_from_docx(docx_path: str) -> Optional[str]:
-    """Extracts text from a DOCX file using python-docx, preserving paragraphs."""
+def _reset_pdf_page_pool() -> None:
+    from .workers import reset_pdf_page_pool # workers imports this module
+    reset_pdf_page_pool()
+
+# WordprocessingML tags read by iter_docx_paragraphs
+_W_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_DOCX_PARAGRAPH_TAG = _W_NAMESPACE + 'p'
+_DOCX_TEXT_TAG = _W_NAMESPACE + 't'
+_DOCX_BODY_TAG = _W_NAMESPACE + 'body'
+# Run content standing for a character instead of holding text
+_DOCX_SYMBOL_TAGS = {_W_NAMESPACE + 'tab': '\t', _W_NAMESPACE + 'br': '\n', _W_NAMESPACE + 'cr': '\n',
+                     _W_NAMESPACE + 'noBreakHyphen': '-'}
+# Legacy copy of a text box / drawing next to its modern version: read only once
+_DOCX_FALLBACK_TAG = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+def iter_docx_paragraphs(docx_source: DocumentSource) -> Iterator[str]:
+    """
+    Yields the non-empty paragraphs of a DOCX in document order, including those in table cells
+    (one per cell paragraph) and text boxes, by streaming word/document.xml out of the archive.
+    Parsed elements are cleared as soon as their paragraph is read, so memory does not grow
+    with the document. Raises zipfile / XML errors for unreadable documents.
+    """
+    with zipfile.ZipFile(io.BytesIO(docx_source) if isinstance(docx_source, bytes) else docx_source) as archive, \
+            archive.open('word/document.xml') as document_xml:
+        body = None
+        parts: List[str] = []
+        fallback_depth = 0
+        for event, element in ElementTree.iterparse(document_xml, events=("start", "end")):
+            tag = element.tag
+            if event == "start":
+                if tag == _DOCX_FALLBACK_TAG:
+                    fallback_depth += 1
+                elif tag == _DOCX_BODY_TAG:
+                    body = element
+            elif tag == _DOCX_TEXT_TAG:
+                if element.text and not fallback_depth:
+                    parts.append(element.text)
+            elif tag in _DOCX_SYMBOL_TAGS:
+                if not fallback_depth:
+                    parts.append(_DOCX_SYMBOL_TAGS[tag])
+            elif tag == _DOCX_PARAGRAPH_TAG:
+                paragraph = ''.join(parts).strip()
+                parts.clear()
+                element.clear()
+                if paragraph:
+                    yield paragraph
+            elif tag == _DOCX_FALLBACK_TAG:
+                fallback_depth -= 1
+            if event == "end" and body is not None and len(body) > 1:
+                # Drop the body's finished blocks (paragraphs, tables), keeping the one being parsed
+                del body[:-1]
+
+def extract_text_from_docx(docx_source: DocumentSource) -> Optional[str]:
+    """
+    Extracts text from a DOCX, one paragraph per block (table cells included, see iter_docx_paragraphs).
+    docx_source is a path, or the file's bytes / a binary stream (e.g. an upload), read in memory.
+    """
     log = current_app.logger if current_app else logger
-    log.debug(f"Attempting to extract text from DOCX: {os.path.basename(docx_path)}")
+    source_name = _source_name(docx_source)
+    log.debug(f"Attempting to extract text from DOCX: {source_name}")
     try:
-        doc = docx.Document(docx_path)
-        text_list = [para.text.strip() for para in doc.paragraphs if para.text.strip()]
-        text = '\n\n'.join(text_list) # Join paragraphs with double newlines
-
-        # Post-processing (similar to PDF)
-        text = re.sub(r'[ \t]{2,}', ' ', text) # Normalize spaces within paragraphs
-        text = re.sub(r'\n{3,}', '\n\n', text).strip() # Reduce excessive blank lines
+        # Same clean-up as before, per paragraph: spaces within paragraphs, excessive blank lines
+        text = '\n\n'.join(_EXCESS_NEWLINES_PATTERN.sub('\n\n', _MULTI_SPACE_PATTERN.sub(' ', paragraph))
+                            for paragraph in iter_docx_paragraphs(docx_source))
 
         if text:
-            log.info(f"Successfully extracted text from DOCX: {os.path.basename(docx_path)} (Length: {len(text)})")
+            log.info(f"Successfully extracted text from DOCX: {source_name} (Length: {len(text)})")
             return text
         else:
-            log.warning(f"Extracted empty text from DOCX: {os.path.basename(docx_path)}")
+            log.warning(f"Extracted empty text from DOCX: {source_name}")
             return None
     except Exception as e:
-        log.error(f"Error processing DOCX {os.path.basename(docx_path)}: {e}", exc_info=True)
+        log.error(f"Error processing DOCX {source_name}: {e}", exc_info=True)
         return None
 
 
 # --- Section Finding Function ---
+# Precompiled patterns used on every line of every resume
+_LIST_ITEM_PATTERN = re.compile(r"^\s*[\*\-•\d]+\.?\s+.{10,}") # Starts with symbol/digit, opt dot, space, then longer text
+_EDGE_SYMBOLS_PATTERN = re.compile(r"^\s*[^A-Za-z0-9]+|[^A-Za-z0-9]+\s*$") # Leading symbols / trailing punctuation
+_NON_WORD_CHAR_PATTERN = re.compile(r"\W") # Positions where a \b can close a keyword
+
+def _build_section_keyword_table(section_map: Dict[str, List[str]]) -> Dict[str, Tuple[int, str]]:
+    """
+    Compiles a section keyword map into one lookup table: keyword -> (rank, section_name).
+    The rank is the keyword's position when iterating sections and their keywords in order,
+    so taking the lowest rank reproduces the original nested-loop precedence.
+    """
+    table: Dict[str, Tuple[int, str]] = {}
+    rank = 0
+    for section_name, keywords in section_map.items():
+        if section_name == 'contact': continue # Skip matching 'contact' as a section header itself
+        for keyword in keywords:
+            table.setdefault(keyword.lower(), (rank, section_name)) # First occurrence wins
+            rank += 1
+    return table
+
+# Compiled once at import for the configured keywords
+_SECTION_KEYWORD_TABLE = _build_section_keyword_table(config.SECTION_KEYWORDS)
+
+def _word_end_positions(text: str) -> List[int]:
+    """Offsets at which a keyword ending in a word character is followed by a word boundary."""
+    return [m.start() for m in _NON_WORD_CHAR_PATTERN.finditer(text)] + [len(text)]
+
 def find_section_keyword(line: str, section_map: Dict[str, List[str]]) -> Optional[str]:
     """
     Finds if a line likely marks the start of a known section.
     Relies heavily on the comprehensiveness of SECTION_KEYWORDS in config.
+    Keyword lookups go through a table compiled once per keyword map instead of
+    building a regex per keyword and line.
     """
-    log = current_app.logger if current_app else logger
     line_stripped = line.strip()
     line_lower = line_stripped.lower()
 
@@ -200,50 +453,67 @@ def find_section_keyword(line: str, section_map: Dict[str, List[str]]) -> Option
     if not line_lower or len(line_lower) < 3 or len(line_stripped.split()) > 7: # Too short or too many words
         return None
     # Avoid identifying list items (like bullet points) as headers
-    if re.match(r"^\s*[\*\-•\d]+\.?\s+.{10,}", line_stripped): # Starts with symbol/digit, opt dot, space, then longer text
+    if _LIST_ITEM_PATTERN.match(line_stripped):
         return None
 
     # Check for mostly uppercase (common header format)
-    alpha_chars = [c for c in line_stripped if c.isalpha()]
-    if not alpha_chars: return None # No alphabetic characters
-    upper_chars = [c for c in alpha_chars if c.isupper()]
-    # Use a threshold for uppercase ratio, avoid division by zero
-    is_mostly_upper = (len(upper_chars) / len(alpha_chars)) > 0.7 if alpha_chars else False
+    alpha_count = 0
+    upper_count = 0
+    for c in line_stripped:
+        if c.isalpha():
+            alpha_count += 1
+            if c.isupper(): upper_count += 1
+    if not alpha_count: return None # No alphabetic characters
+    # Use a threshold for uppercase ratio
+    is_mostly_upper = (upper_count / alpha_count) > 0.7
 
     # Clean line for keyword matching (remove leading symbols, trailing punctuation)
-    line_cleaned_lower = re.sub(r"^\s*[^A-Za-z0-9]+|[^A-Za-z0-9]+\s*$", "", line_lower).strip()
-    line_cleaned_orig = re.sub(r"^\s*[^A-Za-z0-9]+|[^A-Za-z0-9]+\s*$", "", line_stripped).strip()
+    line_cleaned_lower = _EDGE_SYMBOLS_PATTERN.sub("", line_lower).strip()
     if not line_cleaned_lower: return None # Skip if only punctuation/symbols
 
-    # Use section_map directly (passed as argument, expected to be config.SECTION_KEYWORDS)
+    # Use the precompiled table for the configured keywords (compile others on the fly)
+    table = _SECTION_KEYWORD_TABLE if section_map is config.SECTION_KEYWORDS else _build_section_keyword_table(section_map)
+    log = current_app.logger if current_app else logger
+
     # 1. Exact Match (case-insensitive on cleaned line)
-    for section_name, keywords in section_map.items():
-        if section_name == 'contact': continue # Skip matching 'contact' as a section header itself
-        for keyword in keywords:
-            if line_cleaned_lower == keyword:
-                log.debug(f"Section keyword exact match: '{line_stripped}' -> {section_name} (keyword: {keyword})")
-                return section_name
+    exact = table.get(line_cleaned_lower)
+    if exact:
+        log.debug(f"Section keyword exact match: '{line_stripped}' -> {exact[1]} (keyword: {line_cleaned_lower})")
+        return exact[1]
 
     # 2. Starts With Match (case-insensitive on cleaned line)
-    for section_name, keywords in section_map.items():
-         if section_name == 'contact': continue
-         for keyword in keywords:
-            # Using \b ensures it matches the whole word at the beginning
-            pattern = r'^' + re.escape(keyword) + r'\b'
-            # Allow few extra chars like ':' or short non-alpha sequences after keyword
-            if re.match(pattern, line_cleaned_lower) and len(line_cleaned_lower) < len(keyword) + 10:
-                 log.debug(f"Section keyword starts-with match: '{line_stripped}' -> {section_name} (keyword: {keyword})")
-                 return section_name
-
-    # 3. Mostly Uppercase Heuristic (check if keyword is present in the original case cleaned line)
-    if is_mostly_upper and len(line_cleaned_orig.split()) <= 5: # Limit word count for uppercase headers
-        for section_name, keywords in section_map.items():
-            if section_name == 'contact': continue
-            for keyword in keywords:
-                 # Search for the keyword as a whole word within the line (case-insensitive)
-                 if re.search(r'\b' + re.escape(keyword) + r'\b', line_cleaned_orig, re.IGNORECASE):
-                      log.debug(f"Section keyword uppercase heuristic match: '{line_stripped}' -> {section_name} (keyword: {keyword})")
-                      return section_name
+    # A keyword matches if it is a prefix of the line ending on a word boundary; allow few
+    # extra chars like ':' or short non-alpha sequences after it. Lowest rank wins.
+    best: Optional[Tuple[int, str]] = None
+    best_keyword = ""
+    for end in _word_end_positions(line_cleaned_lower):
+        keyword = line_cleaned_lower[:end]
+        entry = table.get(keyword)
+        if entry and len(line_cleaned_lower) < len(keyword) + 10 and (best is None or entry[0] < best[0]):
+            best, best_keyword = entry, keyword
+    if best:
+        log.debug(f"Section keyword starts-with match: '{line_stripped}' -> {best[1]} (keyword: {best_keyword})")
+        return best[1]
+
+    # 3. Mostly Uppercase Heuristic (check if keyword is present as a whole word anywhere in the line)
+    if is_mostly_upper:
+        line_cleaned_orig = _EDGE_SYMBOLS_PATTERN.sub("", line_stripped).strip()
+        if len(line_cleaned_orig.split()) <= 5: # Limit word count for uppercase headers
+            line_cleaned_folded = line_cleaned_orig.lower()
+            end_positions = _word_end_positions(line_cleaned_folded)
+            # Word starts: beginning of line or right after a non-word character
+            start_positions = [0] + [p + 1 for p in end_positions[:-1]]
+            for start in start_positions:
+                if start >= len(line_cleaned_folded) or _NON_WORD_CHAR_PATTERN.match(line_cleaned_folded, start):
+                    continue # \b needs a word character right after the start
+                for end in end_positions:
+                    if end <= start: continue
+                    entry = table.get(line_cleaned_folded[start:end])
+                    if entry and (best is None or entry[0] < best[0]):
+                        best, best_keyword = entry, line_cleaned_folded[start:end]
+            if best:
+                log.debug(f"Section keyword uppercase heuristic match: '{line_stripped}' -> {best[1]} (keyword: {best_keyword})")
+                return best[1]
 
     # No match found
     return None
@@ -272,23 +542,86 @@ COMMON_NON_NAME_WORDS = {
 }
 
 
+# --- Contact & Name Patterns ---
+# Compiled once from config; parse_resume_text runs these over every uploaded resume
+_CONTACT_PATTERNS = {
+    "email": re.compile(config.EMAIL_REGEX, re.IGNORECASE),
+    "phone": re.compile(config.PHONE_REGEX, re.VERBOSE),
+    "github": re.compile(config.GITHUB_REGEX, re.IGNORECASE),
+    "linkedin": re.compile(config.LINKEDIN_REGEX, re.IGNORECASE),
+}
+# Email and phone in a single scan; an email is tried first so digits inside it are not read as a phone
+_EMAIL_OR_PHONE_PATTERN = re.compile(f"(?P<email>(?i:{config.EMAIL_REGEX}))|(?P<phone>(?x:{config.PHONE_REGEX}))")
+_NON_DIGIT_PATTERN = re.compile(r'\D')
+_YEAR_PATTERN = re.compile(r"^(19|20)\d{2}$")
+_DIGIT_RUN_PATTERN = re.compile(r'\d{3,}')
+_NAME_EDGE_PUNCT_PATTERN = re.compile(r"^[^\w\s]+|[^\w\s]+$")
+_EDGE_NON_WORD_PATTERN = re.compile(r"^\W+|\W+$")
+_NAME_CHARS_PATTERN = re.compile(r"[A-Za-z\s'\-\.]+")
+
+def _find_emails_and_phones(top_text_chunk: str, wider_text_chunk: str) -> Tuple[List[str], List[str]]:
+    """
+    Finds emails and phone numbers in one pass over the text covered by both chunks.
+    Both chunks are prefixes of the same lines (joined by newlines vs. spaces), so scanning
+    the longer one covers the other. Results are de-duplicated in document order.
+    """
+    region = top_text_chunk if len(top_text_chunk) > len(wider_text_chunk) else wider_text_chunk
+    emails: Dict[str, None] = {}
+    phones: Dict[str, None] = {}
+    for match in _EMAIL_OR_PHONE_PATTERN.finditer(region):
+        if match.lastgroup == "email":
+            emails[match.group()] = None
+        else:
+            phones[match.group()] = None
+    return list(emails), list(phones)
+
+
+# --- Batched Name Extraction ---
+def _name_ner_chunk(lines_stripped: List[str]) -> str:
+    """The part of a resume the NER model sees: the top of the text with line breaks as spaces."""
+    return ' '.join(lines_stripped)[:NAME_NER_CHUNK_SIZE]
+
+
+def extract_name_docs(texts: List[str], nlp: "spacy.language.Language",
+                      batch_size: Optional[int] = None) -> List[Optional["spacy.tokens.Doc"]]:
+    """
+    Runs the name chunks of several resume texts through the NER model in batches (nlp.pipe),
+    for parse_resume_text(..., ner_doc=...). Returns one Doc per text, or all None if NER
+    failed, so parsing falls back to the heuristics as it does for a single text.
+    """
+    log = current_app.logger if current_app else logger
+    if batch_size is None:
+        batch_size = current_app.config.get('NLP_PIPE_BATCH_SIZE', config.NLP_PIPE_BATCH_SIZE) if current_app else config.NLP_PIPE_BATCH_SIZE
+    chunks = [_name_ner_chunk([line for line in (text or "").split('\n') if line.strip()]) for text in texts]
+    try:
+        return list(nlp.pipe(chunks, batch_size=max(1, batch_size)))
+    except Exception as ner_error:
+        log.error(f"Error during batched spaCy NER processing: {ner_error}", exc_info=True)
+        return [None] * len(texts)
+
+
 # --- MAIN RESUME PARSING FUNCTION ---
-def parse_resume_text(text: str, original_filename: Optional[str]) -> Optional[Dict[str, Any]]:
+def parse_resume_text(text: str, original_filename: Optional[str], nlp: Optional["spacy.language.Language"] = None,
+                      ner_doc: Optional["spacy.tokens.Doc"] = None) -> Optional[Dict[str, Any]]:
     """
     Parses extracted resume text to identify contact info, name, and section content.
-    Uses current_app.config for NLP model and settings.
+    Uses current_app.config for the NLP model unless one is passed explicitly
+    (e.g. by a parsing worker process, which has no app context).
+    ner_doc is this text's name chunk already run through the model (see extract_name_docs);
+    the model is then not needed here.
     """
-    log = current_app.logger # Use Flask's logger within request context
+    log = current_app.logger if current_app else logger # Use Flask's logger within request context
     if not text or not isinstance(text, str):
         log.warning(f"Attempting to parse empty or non-string text for {original_filename}")
         return None
 
     log.info(f"--- Starting parsing for: {original_filename} ---")
 
-    # --- Get NLP model from Flask app context ---
-    nlp = current_app.config.get('NLP_MODEL', None)
-    if not nlp:
-        log.warning("SpaCy NLP model ('NLP_MODEL') not found in app config. Name extraction will be limited.")
+    # --- Get NLP model from Flask app context (loaded on the first parse) ---
+    if ner_doc is None and nlp is None and current_app:
+        nlp = get_nlp_model()
+    if ner_doc is None and not nlp:
+        log.warning("SpaCy NLP model not available. Name extraction will be limited.")
 
     # Initialize data structure with defaults using config SECTION_KEYWORDS
     parsed_data = {
@@ -299,12 +632,11 @@ def parse_resume_text(text: str, original_filename: Optional[str]) -> Optional[D
         "linkedin": "Not Found",
         "github": "Not Found",
         **{key: "Not Found" for key in config.SECTION_KEYWORDS if key != 'contact'},
-        # "_raw_text": text # Uncomment this line if you want to include the full raw text in the output JSON
+        # The full raw text is kept in the raw text store (see text_store.py), not in the parsed JSON
     }
 
-    lines = text.split('\n')
-    # Remove empty lines for easier processing, but keep original indices if needed later
-    lines_stripped = [line for line in lines if line.strip()]
+    # Remove empty lines for easier processing (one pass over the text, no list of all lines)
+    lines_stripped = [match.group() for match in _TEXT_LINE_PATTERN.finditer(text) if not match.group().isspace()]
     if not lines_stripped:
         log.warning(f"Resume text contains no content after stripping lines for {original_filename}")
         return parsed_data # Return default data if text was just whitespace
@@ -319,25 +651,21 @@ def parse_resume_text(text: str, original_filename: Optional[str]) -> Optional[D
     # Wider check using normalized text if not found in top lines chunk
     wider_text_chunk = text_normalized_spaces[:1500] # Check first ~1500 chars
 
-    # Email (using config regex)
-    emails = list(set(re.findall(config.EMAIL_REGEX, top_text_chunk, re.IGNORECASE) + \
-                      re.findall(config.EMAIL_REGEX, wider_text_chunk, re.IGNORECASE)))
+    # Email & Phone (one pass over the region covered by both chunks, in document order)
+    emails, phones = _find_emails_and_phones(top_text_chunk, wider_text_chunk)
     if emails:
         emails.sort(key=len) # Prefer shorter emails if multiple found near top
         parsed_data["email"] = emails[0].strip()
         log.info(f"Found Email: {parsed_data['email']}")
 
-    # Phone (using config regex)
-    phones = list(set(re.findall(config.PHONE_REGEX, top_text_chunk) + \
-                      re.findall(config.PHONE_REGEX, wider_text_chunk)))
     valid_phones = []
     seen_normalized_phones = set()
     for p in phones:
         p_strip = p.strip()
-        normalized_phone = re.sub(r'\D', '', p_strip) # Get only digits
+        normalized_phone = _NON_DIGIT_PATTERN.sub('', p_strip) # Get only digits
         # Basic validation: length and diversity of digits, avoid simple sequences/years
         if 9 <= len(normalized_phone) <= 15 and len(set(normalized_phone)) > 3 \
-           and not re.match(r"^(19|20)\d{2}$", normalized_phone) \
+           and not _YEAR_PATTERN.match(normalized_phone) \
            and normalized_phone not in seen_normalized_phones:
                  valid_phones.append(p_strip) # Store original format found
                  seen_normalized_phones.add(normalized_phone)
@@ -351,13 +679,13 @@ def parse_resume_text(text: str, original_filename: Optional[str]) -> Optional[D
 
 
     # LinkedIn & GitHub (using config regex, search entire normalized text)
-    github_links = list(set(re.findall(config.GITHUB_REGEX, text_normalized_spaces, re.IGNORECASE)))
+    github_links = list(set(_CONTACT_PATTERNS["github"].findall(text_normalized_spaces)))
     if github_links:
         github_links.sort(key=len) # Prefer shorter URLs
         parsed_data["github"] = github_links[0].strip().rstrip('/')
         log.info(f"Found GitHub: {parsed_data['github']}")
 
-    linkedin_links = list(set(re.findall(config.LINKEDIN_REGEX, text_normalized_spaces, re.IGNORECASE)))
+    linkedin_links = list(set(_CONTACT_PATTERNS["linkedin"].findall(text_normalized_spaces)))
     if linkedin_links:
         linkedin_links.sort(key=len)
         parsed_data["linkedin"] = linkedin_links[0].strip().rstrip('/')
@@ -369,16 +697,16 @@ def parse_resume_text(text: str, original_filename: Optional[str]) -> Optional[D
     name_candidates: List[Tuple[str, int, str]] = [] # (name, score, source)
 
     # Strategy 1: spaCy NER (if model is available)
-    if nlp:
+    if ner_doc is not None or nlp:
         try:
             # Analyze only the top portion for efficiency
-            doc = nlp(text_normalized_spaces[:NAME_NER_CHUNK_SIZE]) # Use normalized text chunk
+            doc = ner_doc if ner_doc is not None else nlp(_name_ner_chunk(lines_stripped))
 
             for ent in doc.ents:
                 if ent.label_ == "PERSON":
                     name_text = ent.text.strip()
                     # Clean up potential leading/trailing non-alpha chars missed by NER
-                    name_text = re.sub(r"^[^\w\s]+|[^\w\s]+$", "", name_text).strip()
+                    name_text = _NAME_EDGE_PUNCT_PATTERN.sub("", name_text).strip()
                     words = name_text.split()
                     word_count = len(words)
 
@@ -386,7 +714,7 @@ def parse_resume_text(text: str, original_filename: Optional[str]) -> Optional[D
                     if (NAME_MIN_LEN <= len(name_text) <= NAME_MAX_LEN and
                         NAME_MIN_WORDS <= word_count <= NAME_MAX_WORDS and
                         name_text[0].isupper() and # Starts with capital
-                        re.fullmatch(r"^[A-Za-z\s'\-\.]+$", name_text) and # Allows internal hyphens, apostrophes, periods
+                        _NAME_CHARS_PATTERN.fullmatch(name_text) and # Allows internal hyphens, apostrophes, periods
                         all(w.lower() not in COMMON_NON_NAME_WORDS for w in words) and
                         not find_section_keyword(name_text, config.SECTION_KEYWORDS)): # Check it's not a section header
 
@@ -416,7 +744,7 @@ def parse_resume_text(text: str, original_filename: Optional[str]) -> Optional[D
     log.debug("Attempting heuristic name check...")
     for line_num, line in enumerate(lines_stripped[:NAME_HEURISTIC_LINES]):
         # Use the line directly as it's already stripped
-        line_cleaned = re.sub(r"^\W+|\W+$", "", line).strip() # More aggressive cleaning
+        line_cleaned = _EDGE_NON_WORD_PATTERN.sub("", line).strip() # More aggressive cleaning
 
         if not line_cleaned or len(line_cleaned) < NAME_MIN_LEN or len(line_cleaned) > NAME_MAX_LEN:
             continue
@@ -426,13 +754,13 @@ def parse_resume_text(text: str, original_filename: Optional[str]) -> Optional[D
         if any(kw in line.lower() for kw in ['http', 'www.', '.com', '@', 'phone', 'email', 'fax']): continue
         if parsed_data["email"] != "Not Found" and parsed_data["email"].lower() in line.lower(): continue
         if parsed_data["phone"] != "Not Found" and parsed_data["phone"] in line: continue
-        if re.search(r'\d{3,}', line): continue # Contains 3+ consecutive digits
+        if _DIGIT_RUN_PATTERN.search(line): continue # Contains 3+ consecutive digits
 
         words = line_cleaned.split()
         word_count = len(words)
         # Check name pattern, capitalization, non-common words
         if (NAME_MIN_WORDS <= word_count <= NAME_MAX_WORDS and
-            re.fullmatch(r"^[A-Za-z\s'\-\.]+$", line_cleaned) and
+            _NAME_CHARS_PATTERN.fullmatch(line_cleaned) and
             any(c.isupper() for c in line_cleaned) and # Must contain at least one uppercase
             all(w.lower() not in COMMON_NON_NAME_WORDS for w in words)):
 
@@ -599,9 +927,230 @@ def parse_resume_text(text: str, original_filename: Optional[str]) -> Optional[D
     return parsed_data
 
 
+# --- Single-File Processing (shared by the upload endpoint and parsing workers) ---
+def extract_and_parse_resume(source: DocumentSource, extension: str, original_filename: str,
+                             nlp: Optional["spacy.language.Language"] = None) -> Dict[str, Any]:
+    """
+    Extracts text from a resume (a saved file's path or the uploaded bytes), parses it and
+    extracts its keyword set. Raises ValueError for unusable documents. Safe to run without an app context.
+    Returns a dict with 'raw_text', 'parsed_data' and 'keywords' (None if NLTK is unavailable
+    or keyword extraction failed, so the resume is left for the scan-time backfill to index).
+    """
+    raw_text = _extract_resume_text(source, extension)
+    return _parse_extracted_resume(raw_text, original_filename, nlp=nlp)
+
+
+def extract_and_parse_resumes(files: List[Tuple[DocumentSource, str, str]], nlp: Optional["spacy.language.Language"] = None,
+                              batch_size: Optional[int] = None, on_file_start=None) -> List[Any]:
+    """
+    Batch version of extract_and_parse_resume for (source, extension, original_filename)
+    tuples: texts are extracted first, then their name chunks go through the NER model
+    together (extract_name_docs) instead of one model call per file.
+    Returns one outcome per file, in order: the result dict or the exception raised for it.
+    on_file_start(index) is called as each file's extraction starts.
+    """
+    log = current_app.logger if current_app else logger
+    if nlp is None and current_app:
+        nlp = get_nlp_model()
+
+    outcomes: List[Any] = []
+    for index, (source, extension, original_filename) in enumerate(files):
+        if on_file_start: on_file_start(index)
+        try:
+            outcomes.append(_extract_resume_text(source, extension))
+        except Exception as e:
+            outcomes.append(e)
+
+    extracted = [index for index, outcome in enumerate(outcomes) if isinstance(outcome, str)]
+    ner_docs = extract_name_docs([outcomes[index] for index in extracted], nlp, batch_size) if nlp and extracted else []
+    if ner_docs:
+        log.info(f"  Ran name extraction for {len(extracted)} resume(s) through nlp.pipe.")
+    for position, index in enumerate(extracted):
+        try:
+            outcomes[index] = _parse_extracted_resume(outcomes[index], files[index][2], nlp=nlp,
+                                                      ner_doc=ner_docs[position] if ner_docs else None)
+        except Exception as e:
+            outcomes[index] = e
+    return outcomes
+
+
+def _extract_resume_text(source: DocumentSource, extension: str) -> str:
+    """Extracts the text of a resume file or buffer. Raises ValueError for unusable documents."""
+    log = current_app.logger if current_app else logger
+
+    # 1. Extract Text
+    log.debug(f"  Extracting text using extension: {extension.lower()}")
+    if extension.lower() == ".pdf":
+        raw_text = extract_text_from_pdf(source)
+    elif extension.lower() == ".docx":
+        raw_text = extract_text_from_docx(source)
+    else:
+         # Should be caught by allowed_file, but defensive check
+         raise ValueError(f"Internal error: Unsupported file extension '{extension}'")
+
+    if raw_text is None: # Check if extraction function failed
+        raise ValueError("Text extraction function failed (returned None). Possible file corruption or library issue.")
+    if not raw_text.strip(): # Check if file content is genuinely empty
+        raise ValueError("Text extraction successful, but the document appears to be empty or contains only whitespace.")
+    log.info(f"  Text extracted successfully (Length: {len(raw_text)} chars).")
+    return raw_text
+
+
+def _parse_extracted_resume(raw_text: str, original_filename: str, nlp: Optional["spacy.language.Language"] = None,
+                            ner_doc: Optional["spacy.tokens.Doc"] = None) -> Dict[str, Any]:
+    """Parses extracted text and extracts its keyword set (steps 2 and 3 of extract_and_parse_resume)."""
+    log = current_app.logger if current_app else logger
+
+    # 2. Parse Text
+    log.info("  Parsing extracted text...")
+    parsed_data = parse_resume_text(raw_text, original_filename=original_filename, nlp=nlp, ner_doc=ner_doc) # Pass original name for context
+
+    # 3. Extract Keywords (indexed by the caller so scans never re-run NLTK)
+    keywords = preprocess_and_extract_keywords_nltk(raw_text) if lemmatizer else None
+
+    return {"raw_text": raw_text, "parsed_data": parsed_data, "keywords": keywords}
+
+
+# --- Lemma Cache ---
+# LRU of WordNet lemmas keyed by (token, WordNet POS class). Resumes and JDs share most of their
+# vocabulary, so after a few files nearly every lemma comes from here instead of WordNet's
+# morphy rules. Configured by configure_lemma_cache() from create_app() and in each parsing
+# worker; with a persist path the cache is reloaded on startup and saved every
+# LEMMA_CACHE_SAVE_INTERVAL new entries and at exit (worker processes skip atexit handlers,
+# so they only save periodically).
+_lemma_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_lemma_cache_lock = threading.Lock()
+_lemma_cache_stats = {"hits": 0, "misses": 0}
+_lemma_cache_settings: Dict[str, Any] = {
+    "max_size": config.LEMMA_CACHE_SIZE, "path": None, "save_interval": config.LEMMA_CACHE_SAVE_INTERVAL}
+_lemma_cache_unsaved = 0 # New entries since the last save
+# One save at a time. Lock order: _lemma_cache_save_lock, then _lemma_cache_lock (save_lemma_cache
+# snapshots the cache under both, so saves write snapshots in the order they were taken); never
+# take the save lock while holding _lemma_cache_lock.
+_lemma_cache_save_lock = threading.Lock()
+_lemma_cache_atexit_registered = False
+
+def configure_lemma_cache(max_size: int, persist_path: Optional[str] = None,
+                          save_interval: int = config.LEMMA_CACHE_SAVE_INTERVAL) -> None:
+    """
+    (Re)configures the lemma cache: max_size entries (0 disables it), optionally persisted
+    to persist_path. Entries already saved there are loaded right away.
+    """
+    global _lemma_cache_unsaved, _lemma_cache_atexit_registered
+    loaded: Dict[Tuple[str, str], str] = {}
+    if persist_path and max_size > 0 and os.path.exists(persist_path):
+        try:
+            loaded = read_lemma_file(persist_path)
+        except (OSError, ValueError) as e: # ValueError covers corrupt gzip and JSON
+            logger.warning(f"Could not load the lemma cache from {persist_path}: {e}. Starting empty.")
+    with _lemma_cache_lock:
+        _lemma_cache.clear()
+        for key, lemma in loaded.items():
+            _lemma_cache[key] = lemma
+        while len(_lemma_cache) > max_size:
+            _lemma_cache.popitem(last=False)
+        _lemma_cache_stats["hits"] = _lemma_cache_stats["misses"] = 0
+        _lemma_cache_settings.update(max_size=max_size, path=persist_path, save_interval=save_interval)
+        _lemma_cache_unsaved = 0
+    if loaded:
+        logger.info(f"Lemma cache: {len(_lemma_cache)} entries loaded from {persist_path}.")
+    if persist_path and not _lemma_cache_atexit_registered:
+        atexit.register(save_lemma_cache)
+        _lemma_cache_atexit_registered = True
+
+def save_lemma_cache() -> bool:
+    """Writes the lemma cache to its persist path, if one is configured. Returns True if saved."""
+    global _lemma_cache_unsaved
+    with _lemma_cache_save_lock:
+        with _lemma_cache_lock: # Held briefly, for the snapshot only
+            path = _lemma_cache_settings["path"]
+            if not path or not _lemma_cache:
+                return False
+            snapshot = dict(_lemma_cache)
+            _lemma_cache_unsaved = 0
+        try:
+            write_lemma_file(path, snapshot) # Outside the cache lock: compressing takes a while
+        except OSError as e:
+            logger.warning(f"Could not save the lemma cache to {path}: {e}")
+            return False
+    logger.debug(f"Lemma cache: {len(snapshot)} entries saved to {path}.")
+    return True
+
+def lemma_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters and fill level of the lemma cache, for /health."""
+    with _lemma_cache_lock:
+        return {**_lemma_cache_stats, "size": len(_lemma_cache), "max_size": _lemma_cache_settings["max_size"]}
+
+def _lemmatize_all(pairs: Set[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+    """
+    Lemmatizes a text's distinct (token, WordNet POS) pairs: from the bundle's lemma table,
+    then the lemma cache, then WordNet. Takes the cache lock twice per text, not per token.
+    """
+    global _lemma_cache_unsaved
+    lemmas = {}
+    misses = []
+    with _lemma_cache_lock:
+        max_size = _lemma_cache_settings["max_size"]
+        for pair in pairs:
+            lemma = lemma_table.get(pair)
+            if lemma is None and max_size > 0:
+                lemma = _lemma_cache.get(pair)
+                if lemma is not None:
+                    _lemma_cache.move_to_end(pair)
+                    _lemma_cache_stats["hits"] += 1
+            if lemma is None:
+                misses.append(pair)
+            else:
+                lemmas[pair] = lemma
+    if not misses:
+        return lemmas
+
+    for word, wordnet_pos in misses: # Outside the lock: WordNet lookups are the slow part
+        lemmas[(word, wordnet_pos)] = lemmatizer.lemmatize(word, pos=wordnet_pos)
+    if max_size <= 0:
+        return lemmas
+    with _lemma_cache_lock:
+        _lemma_cache_stats["misses"] += len(misses)
+        for pair in misses:
+            _lemma_cache[pair] = lemmas[pair]
+        while len(_lemma_cache) > max_size:
+            _lemma_cache.popitem(last=False)
+        _lemma_cache_unsaved += len(misses)
+        save_due = bool(_lemma_cache_settings["path"]) and _lemma_cache_unsaved >= _lemma_cache_settings["save_interval"]
+    if save_due:
+        save_lemma_cache()
+    return lemmas
+
+# --- Keyword Tokenizer ---
+# A translate per line and a regex scan instead of word_tokenize and a translate per token.
+# Punctuation nltk.word_tokenize splits on (and the apostrophe of clitics like 's and n't) becomes
+# a separator; the rest of the punctuation and the digits are dropped from inside tokens
+# ("node.js" -> "nodejs", "e-mail" -> "email"), as before. Other non-letters (bullets, dashes,
+# symbols) separate tokens too, instead of sticking to the word after them.
+_KEYWORD_SPLIT_CHARS = '!"#$%&\'()*,:;<>?@[]`{}'
+_KEYWORD_TRANSLATE_TABLE = str.maketrans(
+    _KEYWORD_SPLIT_CHARS, ' ' * len(_KEYWORD_SPLIT_CHARS),
+    ''.join(c for c in string.punctuation + string.digits if c not in _KEYWORD_SPLIT_CHARS))
+_KEYWORD_TOKEN_PATTERN = re.compile(r"[^\W\d_]{2,}") # Runs of 2+ letters
+
+def iter_keyword_tokens(text: str, stop_words: Set[str]) -> Iterator[str]:
+    """
+    Yields the lowercased tokens of text that can become keywords: 2+ letters, not a stop word.
+    Works a line at a time, so no copy of the whole text is made.
+    """
+    for line in _TEXT_LINE_PATTERN.finditer(text):
+        for match in _KEYWORD_TOKEN_PATTERN.finditer(line.group().lower().translate(_KEYWORD_TRANSLATE_TABLE)):
+            token = match.group()
+            if token not in stop_words:
+                yield token
+
 # --- Keyword Extraction/Matching Functions ---
-def preprocess_and_extract_keywords_nltk(text: str) -> Set[str]:
-    """Applies NLTK preprocessing to extract relevant keywords from text."""
+def preprocess_and_extract_keywords_nltk(text: str) -> Optional[Set[str]]:
+    """
+    Applies NLTK preprocessing to extract relevant keywords from text.
+    Returns None if extraction failed (e.g. missing NLTK data), so callers never
+    mistake a failure for a text without keywords.
+    """
     log = current_app.logger if current_app else logger
     global lemmatizer, all_stop_words # Use the globally initialized objects
     keywords = set()
@@ -613,41 +1162,81 @@ def preprocess_and_extract_keywords_nltk(text: str) -> Set[str]:
         return keywords
 
     try:
-        # Tokenize, lowercase
-        tokens = word_tokenize(text.lower())
-
-        # Remove punctuation and digits more robustly
-        # Keep internal hyphens/apostrophes if desired? Current table removes them.
-        table = str.maketrans('', '', string.punctuation + string.digits)
-        stripped_tokens = [w.translate(table) for w in tokens]
-
-        # Filter tokens: non-empty, length > 1, not a stopword (use global all_stop_words)
-        filtered_tokens = [
-            word for word in stripped_tokens
-            if word and len(word) > 1 and word not in all_stop_words
-        ]
-
-        # Part-of-Speech Tagging
-        tagged_tokens = nltk.pos_tag(filtered_tokens)
+        # Tokenize, lowercase, strip punctuation/digits and drop stop words in one streaming pass
+        tokens = iter_keyword_tokens(text, all_stop_words)
 
+        # Part-of-Speech Tagging, a window of tokens at a time so memory stays flat on long resumes
         # Lemmatize based on POS tag (use config.ALLOWED_POS_TAGS)
         pos_map = {'J': 'a', 'V': 'v', 'N': 'n', 'R': 'r'} # Adjective, Verb, Noun, Adverb
-        for word, tag in tagged_tokens:
-            # Check against configured allowed POS tags
-            if tag[:2] in config.ALLOWED_POS_TAGS:
-                 # Get WordNet POS tag, default to Noun ('n')
-                 wordnet_pos = pos_map.get(tag[0].upper(), 'n')
-                 lemma = lemmatizer.lemmatize(word, pos=wordnet_pos)
-                 # Final check for lemma validity (non-empty, >1 char, not stopword again)
-                 if lemma and len(lemma) > 1 and lemma not in all_stop_words:
-                     keywords.add(lemma)
+        pairs = set()
+        while True:
+            window = list(itertools.islice(tokens, config.KEYWORD_TAG_WINDOW))
+            if not window:
+                break
+            # Check against configured allowed POS tags; get WordNet POS tag, default to Noun ('n')
+            pairs.update((word, pos_map.get(tag[0].upper(), 'n')) for word, tag in nltk.pos_tag(window)
+                         if tag[:2] in config.ALLOWED_POS_TAGS)
+        for lemma in _lemmatize_all(pairs).values():
+            # Final check for lemma validity (non-empty, >1 char, not stopword again)
+            if lemma and len(lemma) > 1 and lemma not in all_stop_words:
+                keywords.add(lemma)
 
         log.debug(f"Extracted {len(keywords)} keywords from text snippet (length {len(text)}).")
         return keywords
 
     except Exception as e:
         log.error(f"Error during NLTK keyword extraction: {e}", exc_info=True)
-        return set() # Return empty set on error
+        return None # Distinguishes a failure from an empty keyword set
+
+# --- JD Keyword Cache ---
+# LRU of extracted JD keyword sets keyed by (path, mtime, size), so an edited or re-saved JD
+# gets a new entry automatically. Sized by JD_KEYWORD_CACHE_SIZE from the app config.
+_jd_keyword_cache: "OrderedDict[Tuple[str, int, int], FrozenSet[str]]" = OrderedDict()
+_jd_keyword_cache_lock = threading.Lock()
+_jd_keyword_cache_stats = {"hits": 0, "misses": 0}
+
+def _extract_jd_keywords(jd_file_path: str) -> FrozenSet[str]:
+    """
+    Reads a JD file and extracts its keyword set.
+    Raises ValueError if extraction failed, so the failure is never cached.
+    """
+    with open(jd_file_path, 'r', encoding='utf-8') as f:
+        jd_text = f.read()
+    jd_keywords = preprocess_and_extract_keywords_nltk(jd_text)
+    if jd_keywords is None:
+        raise ValueError(f"Keyword extraction failed for job description '{os.path.basename(jd_file_path)}'.")
+    return frozenset(jd_keywords)
+
+def get_jd_keywords(jd_file_path: str) -> FrozenSet[str]:
+    """
+    Returns the precompiled keyword set of a job description file.
+    The JD is POS-tagged once per (filename, mtime) and reused across resumes and scans.
+    Raises OSError if the file cannot be read and ValueError if keyword extraction failed.
+    """
+    log = current_app.logger if current_app else logger
+    if not lemmatizer:
+        # Don't cache empty results while NLTK is unavailable
+        log.warning("NLTK Lemmatizer not available. Skipping JD keyword extraction.")
+        return frozenset()
+
+    max_size = current_app.config.get('JD_KEYWORD_CACHE_SIZE', config.JD_KEYWORD_CACHE_SIZE) if current_app else config.JD_KEYWORD_CACHE_SIZE
+    jd_stat = os.stat(jd_file_path)
+    cache_key = (os.path.abspath(jd_file_path), jd_stat.st_mtime_ns, jd_stat.st_size)
+    with _jd_keyword_cache_lock:
+        jd_keywords = _jd_keyword_cache.get(cache_key)
+        if jd_keywords is not None:
+            _jd_keyword_cache.move_to_end(cache_key)
+            _jd_keyword_cache_stats["hits"] += 1
+    if jd_keywords is None:
+        jd_keywords = _extract_jd_keywords(cache_key[0]) # Outside the lock: POS tagging is slow
+        with _jd_keyword_cache_lock:
+            _jd_keyword_cache_stats["misses"] += 1
+            if max_size > 0:
+                _jd_keyword_cache[cache_key] = jd_keywords
+                while len(_jd_keyword_cache) > max_size:
+                    _jd_keyword_cache.popitem(last=False)
+    log.debug(f"JD keyword cache: {_jd_keyword_cache_stats} (size {len(_jd_keyword_cache)}/{max_size})")
+    return jd_keywords
 
 def get_match_results(resume_text: str, jd_text: str) -> Dict[str, Any]:
     """
@@ -676,6 +1265,28 @@ def get_match_results(resume_text: str, jd_text: str) -> Dict[str, Any]:
     resume_keywords = preprocess_and_extract_keywords_nltk(resume_text)
     log.debug("Extracting keywords from job description...")
     jd_keywords = preprocess_and_extract_keywords_nltk(jd_text)
+    if resume_keywords is None or jd_keywords is None:
+        analysis_result["error"] = "Keyword extraction failed. Cannot perform keyword analysis."
+        return analysis_result
+
+    return match_keyword_sets(resume_keywords, frozenset(jd_keywords))
+
+def match_keyword_sets(resume_keywords: Set[str], jd_keywords: FrozenSet[str]) -> Dict[str, Any]:
+    """
+    Calculates keyword match score and details from prebuilt keyword sets.
+    Used by /scan/batch with resume keyword sets loaded from the resume index and
+    the cached JD keywords from get_jd_keywords, so no NLTK processing happens per resume.
+    """
+    log = current_app.logger if current_app else logger
+    analysis_result = {
+        "score": 0.0,
+        "matching_keywords": [],
+        "missing_keywords": [],
+        "jd_keyword_count": 0,
+        "resume_keyword_count": 0,
+        "match_count": 0,
+        "error": None
+    }
 
     analysis_result["resume_keyword_count"] = len(resume_keywords)
     analysis_result["jd_keyword_count"] = len(jd_keywords)
@@ -705,7 +1316,7 @@ def get_match_results(resume_text: str, jd_text: str) -> Dict[str, Any]:
     except ZeroDivisionError:
          analysis_result["score"] = 0.0
 
-    log.info(f"Match calculation complete. Score: {analysis_result['score']}%, Matches: {analysis_result['match_count']}/{analysis_result['jd_keyword_count']}")
+    log.debug(f"Match calculation complete. Score: {analysis_result['score']}%, Matches: {analysis_result['match_count']}/{analysis_result['jd_keyword_count']}")
     return analysis_result
 
 # Note: No `if __name__ == '__main__':` block should be here.
\ No newline at end of file
@@ -0,0 +1,144 @@
+# backend/workers.py
+# -*- coding: utf-8 -*-
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+
+from flask import current_app
+
+# --- Relative Imports ---
+from . import utils
+from .nlp_model import get_nlp_model_path, load_spacy_pipeline
+
+if TYPE_CHECKING:
+    import spacy
+
+# --- Setup Logger ---
+# Worker processes have no Flask app context, so everything here logs through this logger
+logger = logging.getLogger(__name__)
+
+# --- Per-Worker State ---
+# Set once by _init_parse_worker in each worker process
+_worker_nlp: Optional["spacy.language.Language"] = None
+
+# --- Parent-Side Pool ---
+# Created lazily on first use, so each gunicorn worker (after fork) gets its own pool.
+# The same pool serves upload parsing and the keyword extraction done by /scan/batch
+# for resumes missing from the keyword index.
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+# Page-range PDF extraction (utils.extract_text_from_pdf) only needs PyMuPDF, so it has its own
+# pool without the parsing pool's initializer: starting it never loads spaCy or NLTK data.
+_pdf_page_pool: Optional[ProcessPoolExecutor] = None
+_pdf_page_pool_lock = threading.Lock()
+
+
+# --- Worker Process Functions ---
+def _init_parse_worker(nlp_model_path: Optional[str], nlp_components: Optional[List[str]] = None,
+                       nlp_bundle_path: Optional[str] = None, lemma_cache_settings: Optional[Tuple[Any, ...]] = None) -> None:
+    """
+    Runs ONCE in every parsing worker process: loads the spaCy model and NLTK components,
+    so individual files never pay the model load.
+    """
+    global _worker_nlp
+    if nlp_model_path:
+        try:
+            _worker_nlp = load_spacy_pipeline(nlp_model_path, nlp_components)
+            logger.info(f"[Parse Worker] spaCy model loaded from {nlp_model_path}.")
+        except Exception as e:
+            logger.error(f"[Parse Worker] Failed to load spaCy model from {nlp_model_path}: {e}. Name extraction will be limited.")
+            _worker_nlp = None
+    utils.initialize_nltk(nlp_bundle_path)
+    if lemma_cache_settings:
+        # Workers share the persisted lemma cache file with the parent (saves are atomic replaces)
+        utils.configure_lemma_cache(*lemma_cache_settings)
+
+
+def _parse_resume_in_worker(source: "utils.DocumentSource", extension: str, original_filename: str) -> Dict[str, Any]:
+    """Pool entry point: extracts, parses and keyword-indexes one resume (file path or uploaded bytes)."""
+    return utils.extract_and_parse_resume(source, extension, original_filename, nlp=_worker_nlp)
+
+
+# --- Pool Management ---
+def get_parse_pool(config) -> ProcessPoolExecutor:
+    """Returns the process pool used for resume parsing, creating it on first use."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            max_workers = config.get('UPLOAD_PARSE_WORKERS') or None # None -> os.cpu_count()
+            # 'spawn' avoids forking a (possibly multi-threaded) server process
+            mp_context = multiprocessing.get_context(config.get('UPLOAD_PARSE_START_METHOD', 'spawn'))
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=mp_context,
+                initializer=_init_parse_worker,
+                # Workers load the model themselves; the parent only makes sure it is installed
+                initargs=(get_nlp_model_path() if current_app else config.get('NLP_MODEL_PATH'),
+                          config.get('NLP_PIPELINE_COMPONENTS'), config.get('NLP_BUNDLE_PATH'),
+                          (config.get('LEMMA_CACHE_SIZE', 0), config.get('LEMMA_CACHE_PATH'),
+                           config.get('LEMMA_CACHE_SAVE_INTERVAL', 1000)))
+            )
+            logger.info(f"Started resume parsing process pool (max_workers={max_workers or 'cpu_count'}).")
+        return _parse_pool
+
+
+def reset_parse_pool() -> None:
+    """Discards a broken pool (e.g. a worker was killed) so the next request starts a fresh one."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=False, cancel_futures=True)
+            _parse_pool = None
+
+
+def submit_to_worker_pool(config, fn, *args):
+    """
+    Submits fn(*args) to the worker pool and returns its Future.
+    fn must be a module-level function; it runs with spaCy and NLTK already initialized.
+    """
+    try:
+        return get_parse_pool(config).submit(fn, *args)
+    except BrokenProcessPool:
+        logger.warning("Resume parsing pool is broken. Restarting it.")
+        reset_parse_pool()
+        return get_parse_pool(config).submit(fn, *args)
+
+
+def submit_resume_parse(config, source: "utils.DocumentSource", extension: str, original_filename: str):
+    """Submits one resume (file path or uploaded bytes) to the parsing pool and returns its Future."""
+    return submit_to_worker_pool(config, _parse_resume_in_worker, source, extension, original_filename)
+
+
+def get_pdf_page_pool(config) -> ProcessPoolExecutor:
+    """Returns the process pool extracting PDF page ranges, creating it on first use."""
+    global _pdf_page_pool
+    with _pdf_page_pool_lock:
+        if _pdf_page_pool is None:
+            max_workers = config.get('PDF_PARALLEL_WORKERS') or None # None -> os.cpu_count()
+            mp_context = multiprocessing.get_context(config.get('UPLOAD_PARSE_START_METHOD', 'spawn'))
+            _pdf_page_pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context)
+            logger.info(f"Started PDF page process pool (max_workers={max_workers or 'cpu_count'}).")
+        return _pdf_page_pool
+
+
+def reset_pdf_page_pool() -> None:
+    """Discards the PDF page pool (broken, or at shutdown in tests); the next use starts a fresh one."""
+    global _pdf_page_pool
+    with _pdf_page_pool_lock:
+        if _pdf_page_pool is not None:
+            _pdf_page_pool.shutdown(wait=False, cancel_futures=True)
+            _pdf_page_pool = None
+
+
+def submit_pdf_page_range(config, pdf_path: str, start_page: int, stop_page: int, max_chars: Optional[int]):
+    """Submits the extraction of pages [start_page, stop_page) of a PDF file to the PDF page pool."""
+    try:
+        return get_pdf_page_pool(config).submit(utils.extract_pdf_page_range, pdf_path, start_page, stop_page, max_chars)
+    except BrokenProcessPool:
+        logger.warning("PDF page pool is broken. Restarting it.")
+        reset_pdf_page_pool()
+        return get_pdf_page_pool(config).submit(utils.extract_pdf_page_range, pdf_path, start_page, stop_page, max_chars)
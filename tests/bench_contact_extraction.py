@@ -0,0 +1,103 @@
+# tests/bench_contact_extraction.py
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for contact extraction in parse_resume_text.
+
+Compares the previous approach (raw-string regexes, two findall passes per field over
+overlapping chunks, nested PHONE_REGEX) with the compiled single-pass one, on the sample
+resumes in backend/uploads, and checks the new output against the stored parsed JSON.
+
+Run from the project root:  python tests/bench_contact_extraction.py [repeats]
+"""
+import glob
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+logging.disable(logging.CRITICAL)
+
+from flask import Flask  # noqa: E402
+
+from backend import config, utils  # noqa: E402
+
+OLD_PHONE_REGEX = r'(?:(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{1,4}\)?[-.\s]?)|(?:\d{1,4}[-.\s]?)){1,}\d{3,4}[-.\s]?\d{3,4}(?:\s*(?:ext|x|extension)\.?\s*\d+)?'
+UPLOADS = os.path.join(PROJECT_ROOT, "backend", "uploads")
+
+
+def old_emails_and_phones(top_text_chunk, wider_text_chunk):
+    emails = list(set(re.findall(config.EMAIL_REGEX, top_text_chunk, re.IGNORECASE) +
+                      re.findall(config.EMAIL_REGEX, wider_text_chunk, re.IGNORECASE)))
+    phones = list(set(re.findall(OLD_PHONE_REGEX, top_text_chunk) +
+                      re.findall(OLD_PHONE_REGEX, wider_text_chunk)))
+    return emails, phones
+
+
+def chunks(text):
+    lines_stripped = [line for line in text.split('\n') if line.strip()]
+    top_text_chunk = "\n".join(lines_stripped[:max(utils.NAME_HEURISTIC_LINES, 5)])
+    return top_text_chunk, ' '.join(lines_stripped)[:1500]
+
+
+def timed(fn, items, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for item in items:
+            fn(*item)
+    return time.perf_counter() - start
+
+
+def main(repeats):
+    app = Flask(__name__)
+    with app.app_context():
+        texts = {}
+        for pdf_path in sorted(glob.glob(os.path.join(UPLOADS, "resumes_original", "*.pdf"))):
+            texts[os.path.basename(pdf_path)] = utils.extract_text_from_pdf(pdf_path)
+
+        # Output check against the stored parses
+        parsed_by_file = {}
+        for json_path in glob.glob(os.path.join(UPLOADS, "resumes_parsed", "*.json")):
+            with open(json_path, 'r', encoding='utf-8') as f:
+                parsed = json.load(f)
+            parsed_by_file[os.path.splitext(os.path.basename(json_path))[0]] = parsed
+        mismatches = 0
+        for filename, text in texts.items():
+            stem = os.path.splitext(filename)[0]
+            stored = next((p for name, p in parsed_by_file.items() if name.startswith(stem)), None)
+            current = utils.parse_resume_text(text, filename, nlp=None)
+            for field in ("email", "phone", "github", "linkedin"):
+                if stored is not None and stored[field] != current[field]:
+                    mismatches += 1
+                    print(f"  MISMATCH {filename} {field}: stored={stored[field]!r} now={current[field]!r}")
+        print(f"{len(texts)} sample resumes, contact fields differing from stored parses: {mismatches}")
+
+        items = [chunks(text) for text in texts.values()]
+        old = timed(old_emails_and_phones, items, repeats)
+        new = timed(utils._find_emails_and_phones, items, repeats)
+        print(f"email+phone, {repeats} x {len(items)} resumes: old {old:.3f}s  new {new:.3f}s  ({old / new:.1f}x)")
+
+        full = [(text, name, None) for name, text in texts.items()]
+        print(f"parse_resume_text (no NER), {repeats} x {len(full)} resumes: {timed(utils.parse_resume_text, full, repeats):.3f}s")
+
+    # Backtracking: the old pattern is exponential in the length of a digit/space run
+    for n in (4, 5, 6, 7):
+        adversarial = "12 " * n + "a"
+        start = time.perf_counter()
+        re.findall(OLD_PHONE_REGEX, adversarial)
+        old = time.perf_counter() - start
+        start = time.perf_counter()
+        utils._CONTACT_PATTERNS["phone"].findall(adversarial)
+        new = time.perf_counter() - start
+        print(f"'12 ' * {n} + 'a': old {old:.4f}s  new {new:.6f}s")
+    adversarial = "12 " * 100_000 + "a"
+    start = time.perf_counter()
+    utils._CONTACT_PATTERNS["phone"].findall(adversarial)
+    print(f"'12 ' * 100000 + 'a': new {time.perf_counter() - start:.4f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,91 @@
+# tests/bench_docx_extraction.py
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for DOCX text extraction.
+
+Compares the previous approach (the python-docx object model, doc.paragraphs only) with the
+streaming extract_text_from_docx on generated resumes of growing length, with a three-column
+skills table every 100 paragraphs: time, peak memory (tracemalloc), and whether both agree
+once the table cells only the streaming extractor reads are left out.
+
+Run from the project root:  python tests/bench_docx_extraction.py [repeats]
+"""
+import io
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+logging.disable(logging.CRITICAL)
+
+import docx  # noqa: E402
+
+from backend import utils  # noqa: E402
+
+TABLE_TEXT_PREFIX = "Skill "
+
+
+def make_docx(paragraph_count):
+    document = docx.Document()
+    for n in range(paragraph_count):
+        document.add_paragraph(f"Paragraph {n}:  built   APIs with Python, Flask and Kubernetes for team {n}")
+        if n % 100 == 0:
+            table = document.add_table(rows=5, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = f"{TABLE_TEXT_PREFIX}{n} Go"
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def old_extract(content):
+    document = docx.Document(io.BytesIO(content))
+    text = '\n\n'.join(para.text.strip() for para in document.paragraphs if para.text.strip())
+    text = utils._MULTI_SPACE_PATTERN.sub(' ', text)
+    return utils._EXCESS_NEWLINES_PATTERN.sub('\n\n', text).strip()
+
+
+def new_extract(content):
+    return utils.extract_text_from_docx(content)
+
+
+def new_streamed(content):
+    # What a consumer of iter_docx_paragraphs holds at once: one paragraph
+    for _ in utils.iter_docx_paragraphs(content):
+        pass
+
+
+def timed(fn, content, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(content)
+    return (time.perf_counter() - start) / repeats
+
+
+def peak_memory(fn, content):
+    tracemalloc.start()
+    fn(content)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(repeats):
+    for paragraph_count in (300, 3000, 12000):
+        content = make_docx(paragraph_count)
+        old_text, new_text = old_extract(content), new_extract(content)
+        without_tables = '\n\n'.join(p for p in new_text.split('\n\n') if not p.startswith(TABLE_TEXT_PREFIX))
+        old, new = timed(old_extract, content, repeats), timed(new_extract, content, repeats)
+        print(f"{paragraph_count} paragraphs ({len(content) // 1024} KiB): old {old * 1000:.1f}ms  new {new * 1000:.1f}ms  "
+              f"({old / new:.1f}x); +{len(new_text) - len(old_text)} chars of table text; same otherwise: {without_tables == old_text}")
+        print(f"  peak memory: old {peak_memory(old_extract, content) / 1024:.0f} KiB  "
+              f"new (text) {peak_memory(new_extract, content) / 1024:.0f} KiB  "
+              f"new (streamed) {peak_memory(new_streamed, content) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
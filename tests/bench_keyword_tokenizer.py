@@ -0,0 +1,115 @@
+# tests/bench_keyword_tokenizer.py
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for the tokenizing stage of preprocess_and_extract_keywords_nltk.
+
+Compares the previous approach (nltk.word_tokenize, a translate per token with a table rebuilt
+per call, then a filtered list) with the streaming iter_keyword_tokens, on the sample resumes in
+backend/uploads: time, peak memory (tracemalloc) and how many distinct tokens differ. The same
+comparison runs on one long document made of all samples repeated (~20 pages).
+
+Without the NLTK punkt_tab data, the old path tokenizes with preserve_line=True (no sentence
+splitting), which only differs from the full word_tokenize at sentence-final periods.
+
+Run from the project root:  python tests/bench_keyword_tokenizer.py [repeats]
+"""
+import glob
+import logging
+import os
+import string
+import sys
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+logging.disable(logging.CRITICAL)
+
+import nltk  # noqa: E402
+from flask import Flask  # noqa: E402
+
+from backend import config, utils  # noqa: E402
+
+UPLOADS = os.path.join(PROJECT_ROOT, "backend", "uploads")
+LONG_DOCUMENT_CHARS = 20 * 3000 # ~20 pages of resume text
+
+
+def _has_punkt():
+    try:
+        nltk.data.find("tokenizers/punkt_tab")
+        return True
+    except LookupError:
+        return False
+
+
+PRESERVE_LINE = not _has_punkt()
+
+
+def old_tokens(text, stop_words):
+    tokens = nltk.word_tokenize(text.lower(), preserve_line=PRESERVE_LINE)
+    table = str.maketrans('', '', string.punctuation + string.digits)
+    stripped_tokens = [w.translate(table) for w in tokens]
+    return [word for word in stripped_tokens if word and len(word) > 1 and word not in stop_words]
+
+
+def new_tokens(text, stop_words):
+    return list(utils.iter_keyword_tokens(text, stop_words))
+
+
+def new_tokens_streamed(text, stop_words):
+    # What keyword extraction actually holds at once: one tagging window
+    for _ in utils.iter_keyword_tokens(text, stop_words):
+        pass
+
+
+def timed(fn, texts, stop_words, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            fn(text, stop_words)
+    return time.perf_counter() - start
+
+
+def peak_memory(fn, text, stop_words):
+    tracemalloc.start()
+    fn(text, stop_words)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(repeats):
+    stop_words = utils.all_stop_words or set(config.custom_stops)
+    app = Flask(__name__)
+    with app.app_context():
+        texts = [utils.extract_text_from_pdf(path) for path in sorted(glob.glob(os.path.join(UPLOADS, "resumes_original", "*.pdf")))]
+    texts = [text for text in texts if text]
+    long_text = "\n".join(texts)
+    long_text = (long_text * (LONG_DOCUMENT_CHARS // len(long_text) + 1))[:LONG_DOCUMENT_CHARS]
+    print(f"{len(texts)} sample resumes, {sum(map(len, texts))} chars; word_tokenize {'without' if PRESERVE_LINE else 'with'} sentence splitting")
+
+    only_old, only_new = set(), set()
+    for text in texts:
+        old, new = set(old_tokens(text, stop_words)), set(new_tokens(text, stop_words))
+        only_old |= old - new
+        only_new |= new - old
+    distinct = len(set().union(*(new_tokens(text, stop_words) for text in texts)))
+    print(f"distinct tokens: {distinct}; only from the old path: {len(only_old)}, only from the new one: {len(only_new)}")
+    print(f"  e.g. old only: {sorted(only_old)[:10]}")
+    print(f"  e.g. new only: {sorted(only_new)[:10]}")
+
+    old = timed(old_tokens, texts, stop_words, repeats)
+    new = timed(new_tokens, texts, stop_words, repeats)
+    print(f"tokenize+filter, {repeats} x {len(texts)} resumes: old {old:.3f}s  new {new:.3f}s  ({old / new:.1f}x)")
+
+    old = timed(old_tokens, [long_text], stop_words, repeats)
+    new = timed(new_tokens, [long_text], stop_words, repeats)
+    print(f"tokenize+filter, {repeats} x {len(long_text)}-char document: old {old:.3f}s  new {new:.3f}s  ({old / new:.1f}x)")
+    for text, label in ((texts[0], "first resume"), (long_text, "long document")):
+        print(f"peak memory, {label}: old {peak_memory(old_tokens, text, stop_words) / 1024:.0f} KiB  "
+              f"new (list) {peak_memory(new_tokens, text, stop_words) / 1024:.0f} KiB  "
+              f"new (streamed) {peak_memory(new_tokens_streamed, text, stop_words) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,68 @@
+# tests/bench_pdf_page_ranges.py
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for page-range PDF extraction (PDF_PARALLEL_PAGE_THRESHOLD).
+
+Extracts generated text-heavy PDFs of growing length in this process and across the PDF page
+pool (workers started beforehand, as in a running server), and checks both give the same text.
+Use it to decide whether, and from how many pages, enabling the threshold pays off on the
+deployment's hardware: with few cores, the pool only adds IPC and a temporary file.
+
+Run from the project root:  python tests/bench_pdf_page_ranges.py [workers] [repeats]
+"""
+import logging
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+logging.disable(logging.CRITICAL)
+
+import fitz  # noqa: E402
+from flask import Flask  # noqa: E402
+
+from backend import utils, workers  # noqa: E402
+
+LINES_PER_PAGE = 40
+
+
+def make_pdf(page_count):
+    document = fitz.open()
+    for page_number in range(page_count):
+        page = document.new_page()
+        for line in range(LINES_PER_PAGE):
+            page.insert_text((40, 40 + line * 18), f"Line {line} of page {page_number}: Python, Kubernetes, SQL and Go")
+    content = document.tobytes()
+    document.close()
+    return content
+
+
+def timed(content, page_count, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        text = utils.extract_text_from_pdf(content, max_pages=page_count, max_chars=10**9)
+    return (time.perf_counter() - start) / repeats, text
+
+
+def main(worker_count, repeats):
+    app = Flask(__name__)
+    app.config.update(PDF_PARALLEL_WORKERS=worker_count)
+    print(f"{os.cpu_count()} CPU(s), {worker_count} page pool workers")
+    try:
+        for page_count in (20, 50, 200):
+            content = make_pdf(page_count)
+            sequential, sequential_text = timed(content, page_count, repeats)
+            with app.app_context():
+                app.config["PDF_PARALLEL_PAGE_THRESHOLD"] = 1
+                utils.extract_text_from_pdf(content, max_pages=page_count) # Starts the pool's workers
+                parallel, parallel_text = timed(content, page_count, repeats)
+            print(f"{page_count} pages: in-process {sequential * 1000:.0f}ms  page pool {parallel * 1000:.0f}ms  "
+                  f"({sequential / parallel:.2f}x); same text: {sequential_text == parallel_text}")
+    finally:
+        workers.reset_pdf_page_pool()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1),
+         int(sys.argv[2]) if len(sys.argv) > 2 else 3)
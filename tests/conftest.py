@@ -0,0 +1,54 @@
+# tests/conftest.py
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+# Make the 'backend' package importable when running pytest from the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import backend  # noqa: E402
+from backend import nlp_model, utils, workers  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """
+    App with all storage under tmp_path. Model loading is skipped (no spaCy download,
+    no NLTK download); tests that need keywords provide them directly.
+    """
+    monkeypatch.setattr(nlp_model, "install_spacy_model_on_demand", lambda app, *args: None)
+    monkeypatch.setattr(utils, "initialize_nltk", lambda *args: True)
+    test_app = backend.create_app({
+        "TESTING": True,
+        "JOB_DESC_FOLDER": str(tmp_path / "job_descriptions"),
+        "ORIGINAL_RESUME_FOLDER": str(tmp_path / "resumes_original"),
+        "PARSED_DATA_FOLDER": str(tmp_path / "resumes_parsed"),
+        "UPLOAD_JOBS_FOLDER": str(tmp_path / "upload_jobs"),
+        "RESUME_INDEX_PATH": str(tmp_path / "resume_index.sqlite3"),
+        "RAW_TEXT_STORE_PATH": str(tmp_path / "raw_text.seg"),
+    })
+    yield test_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def parse_pool(monkeypatch):
+    """
+    A real spawn pool in place of the parsing pool, without its initializer (which loads spaCy
+    and downloads missing NLTK data in every worker): pooled work runs in worker processes
+    with no model, like the inline tests.
+    """
+    pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+    monkeypatch.setattr(workers, "get_parse_pool", lambda config: pool)
+    yield pool
+    pool.shutdown(cancel_futures=True)
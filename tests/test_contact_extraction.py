@@ -0,0 +1,107 @@
+# tests/test_contact_extraction.py
+# -*- coding: utf-8 -*-
+import glob
+import json
+import os
+import random
+import re
+import time
+
+import pytest
+
+from backend import utils
+
+# The pre-registry pattern, kept as the reference the linear-time PHONE_REGEX must agree with
+BASELINE_PHONE_REGEX = r'(?:(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{1,4}\)?[-.\s]?)|(?:\d{1,4}[-.\s]?)){1,}\d{3,4}[-.\s]?\d{3,4}(?:\s*(?:ext|x|extension)\.?\s*\d+)?'
+
+UPLOADS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend", "uploads")
+
+
+def _generated_lines(count, seed=7):
+    """Short strings with one or two phone-like numbers between digit-free words."""
+    rng = random.Random(seed)
+
+    def digits(n):
+        return "".join(rng.choice("0123456789") for _ in range(n))
+
+    def phone():
+        sep = rng.choice([" ", "-", ".", ""])
+        body = rng.choice([
+            lambda: digits(10),
+            lambda: digits(5) + sep + digits(5),
+            lambda: digits(3) + sep + digits(3) + sep + digits(4),
+            lambda: "(" + digits(3) + ") " + digits(3) + "-" + digits(4),
+            lambda: digits(2) + " " + digits(4) + " " + digits(4),
+            lambda: digits(3) + "-" + digits(4),
+            lambda: digits(rng.randint(6, 12)),
+            lambda: "(" + digits(4) + ")" + digits(6),
+        ])()
+        code = rng.choice(["+91", "+1", "+44", "91", "0", "(+91)", "(+1)", ""])
+        return (code + rng.choice([" ", "-", ""]) if code else "") + body
+
+    words = ["Phone:", "Mob", "|", "Email: a.b@c.com", "•", "(Remote)", "Ph.", "Tel -", "B.Tech", "+"]
+    for _ in range(count):
+        parts = [phone()]
+        if rng.random() < 0.5:
+            parts += [rng.choice(words), phone()]
+        if rng.random() < 0.5:
+            parts.insert(0, rng.choice(words))
+        yield " ".join(parts)
+
+
+def test_phone_regex_matches_baseline_on_generated_lines():
+    phone_pattern = utils._CONTACT_PATTERNS["phone"]
+    for line in _generated_lines(3000):
+        assert phone_pattern.findall(line) == re.findall(BASELINE_PHONE_REGEX, line), line
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Phone: +91 9133115280", ["+91 9133115280"]),
+    ("+91-637-644-3946 | a@b.com", ["+91-637-644-3946"]),
+    ("Call (555) 123-4567 ext. 89", ["(555) 123-4567 ext. 89"]),
+    ("07607013603", ["07607013603"]),
+    ("+91 9163-260-693", ["+91 9163-260-693"]),
+    ("2019 - 2023", []),
+    # The old pattern's match: the '+' is kept after a '(' (the subscriber part stops at 4+4 digits)
+    ("(+91) 98765-43210", ["+91) 98765-4321"]),
+])
+def test_phone_regex_formats(text, expected):
+    assert utils._CONTACT_PATTERNS["phone"].findall(text) == expected
+
+
+@pytest.mark.parametrize("unit", ["12 ", "1 ", "1) ", "(1", "+12 ", "+1 (2)", "1-(1", "1)+2"])
+def test_phone_regex_is_linear_on_adversarial_runs(unit):
+    # The baseline pattern needs seconds for about 8 repetitions of "12 "
+    start = time.perf_counter()
+    utils._CONTACT_PATTERNS["phone"].findall(unit * 50_000 + "a")
+    assert time.perf_counter() - start < 2.0
+
+
+def test_find_emails_and_phones_single_pass_in_document_order():
+    top = "Jane Doe\n+91 9876543210 | jane.doe@example.com\nalt: 080-2345-6789"
+    wider = top.replace("\n", " ") + " Experience ... other@example.com"
+    emails, phones = utils._find_emails_and_phones(top, wider)
+    assert emails == ["jane.doe@example.com", "other@example.com"]
+    assert phones == ["+91 9876543210", "080-2345-6789"]
+
+
+def test_digits_inside_email_are_not_a_phone():
+    emails, phones = utils._find_emails_and_phones("", "john9876543210@gmail.com")
+    assert emails == ["john9876543210@gmail.com"]
+    assert phones == []
+
+
+@pytest.mark.skipif(not glob.glob(os.path.join(UPLOADS, "resumes_original", "*.pdf")),
+                    reason="sample resumes not present")
+def test_sample_resumes_contact_fields_unchanged(app):
+    parsed_files = glob.glob(os.path.join(UPLOADS, "resumes_parsed", "*.json"))
+    with app.app_context():
+        for pdf_path in sorted(glob.glob(os.path.join(UPLOADS, "resumes_original", "*.pdf"))):
+            stem = os.path.splitext(os.path.basename(pdf_path))[0]
+            stored_path = next(p for p in parsed_files if os.path.basename(p).startswith(stem))
+            with open(stored_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            text = utils.extract_text_from_pdf(pdf_path)
+            parsed = utils.parse_resume_text(text, os.path.basename(pdf_path), nlp=None)
+            for field in ("email", "phone", "github", "linkedin"):
+                assert parsed[field] == stored[field], (stem, field)
@@ -0,0 +1,77 @@
+# tests/test_jd_keyword_cache.py
+# -*- coding: utf-8 -*-
+import os
+from collections import OrderedDict
+
+import pytest
+
+from backend import utils
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    """
+    Replaces JD keyword extraction (POS tagging needs NLTK data) with one that reads the file's
+    words and records each call; the cache and its stats start empty.
+    """
+    calls = []
+
+    def fake_extract_jd_keywords(jd_file_path):
+        calls.append(os.path.basename(jd_file_path))
+        with open(jd_file_path, "r", encoding="utf-8") as f:
+            return frozenset(f.read().split())
+
+    monkeypatch.setattr(utils, "lemmatizer", object())
+    monkeypatch.setattr(utils, "_extract_jd_keywords", fake_extract_jd_keywords)
+    monkeypatch.setattr(utils, "_jd_keyword_cache", OrderedDict())
+    monkeypatch.setattr(utils, "_jd_keyword_cache_stats", {"hits": 0, "misses": 0})
+    return calls
+
+
+def _write_jd(tmp_path, name, text, mtime=None):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_repeated_scan_is_a_cache_hit(tmp_path, extractions):
+    jd_path = _write_jd(tmp_path, "jd.txt", "python flask")
+    assert utils.get_jd_keywords(jd_path) == {"python", "flask"}
+    assert utils.get_jd_keywords(jd_path) == {"python", "flask"}
+    assert extractions == ["jd.txt"]
+    assert utils._jd_keyword_cache_stats == {"hits": 1, "misses": 1}
+
+
+def test_changed_jd_is_extracted_again(tmp_path, extractions):
+    jd_path = _write_jd(tmp_path, "jd.txt", "python flask", mtime=1_700_000_000)
+    utils.get_jd_keywords(jd_path)
+    # Same size, new mtime: only the modification time tells the edit apart
+    _write_jd(tmp_path, "jd.txt", "python django", mtime=1_700_000_060)
+    assert utils.get_jd_keywords(jd_path) == {"python", "django"}
+    assert extractions == ["jd.txt", "jd.txt"]
+
+
+def test_least_recently_used_jd_is_evicted(app, tmp_path, extractions):
+    app.config["JD_KEYWORD_CACHE_SIZE"] = 2
+    paths = {name: _write_jd(tmp_path, f"{name}.txt", name) for name in ("a", "b", "c")}
+    with app.app_context():
+        utils.get_jd_keywords(paths["a"])
+        utils.get_jd_keywords(paths["b"])
+        utils.get_jd_keywords(paths["a"]) # 'a' is now the most recently used
+        utils.get_jd_keywords(paths["c"]) # Evicts 'b'
+        assert len(utils._jd_keyword_cache) == 2
+        utils.get_jd_keywords(paths["a"])
+        utils.get_jd_keywords(paths["b"])
+    assert extractions == ["a.txt", "b.txt", "c.txt", "b.txt"]
+
+
+def test_cache_can_be_disabled(app, tmp_path, extractions):
+    app.config["JD_KEYWORD_CACHE_SIZE"] = 0
+    jd_path = _write_jd(tmp_path, "jd.txt", "python")
+    with app.app_context():
+        utils.get_jd_keywords(jd_path)
+        utils.get_jd_keywords(jd_path)
+    assert extractions == ["jd.txt", "jd.txt"]
+    assert not utils._jd_keyword_cache
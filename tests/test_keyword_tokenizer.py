@@ -0,0 +1,39 @@
+# tests/test_keyword_tokenizer.py
+# -*- coding: utf-8 -*-
+import nltk
+import pytest
+
+from backend import config, utils
+
+
+@pytest.mark.parametrize("text, tokens", [
+    ("Python, Java and SQL", ["python", "java", "and", "sql"]),
+    ("skills:python,java;go", ["skills", "python", "java", "go"]),
+    ("Node.js e-mail CI/CD", ["nodejs", "email", "cicd"]),
+    ("C++ C# R 3.5 2024 x", []),
+    ("women's don't", ["women", "don"]),
+    ("•Python ◦Docker ∗AWS—Azure", ["python", "docker", "aws", "azure"]),
+    ("Résumé naïve\nline two", ["résumé", "naïve", "line", "two"]),
+])
+def test_tokens_match_word_tokenize_plus_strip(text, tokens):
+    assert list(utils.iter_keyword_tokens(text, set())) == tokens
+
+
+def test_stop_words_are_dropped():
+    assert list(utils.iter_keyword_tokens("The Python and the Java", {"the", "and"})) == ["python", "java"]
+
+
+def test_tokens_are_tagged_in_bounded_windows(monkeypatch):
+    windows = []
+
+    def fake_pos_tag(tokens):
+        windows.append(len(tokens))
+        return [(token, "NN") for token in tokens]
+
+    monkeypatch.setattr(nltk, "pos_tag", fake_pos_tag)
+    monkeypatch.setattr(utils, "lemmatizer", nltk.stem.WordNetLemmatizer())
+    monkeypatch.setattr(utils, "lemma_table", {(f"skill{chr(97 + i % 26)}{chr(97 + i // 26)}", "n"): "skill" for i in range(250)})
+    monkeypatch.setattr(config, "KEYWORD_TAG_WINDOW", 100)
+    text = " ".join(f"skill{chr(97 + i % 26)}{chr(97 + i // 26)}" for i in range(250))
+    assert utils.preprocess_and_extract_keywords_nltk(text) == {"skill"}
+    assert windows == [100, 100, 50]
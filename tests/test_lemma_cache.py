@@ -0,0 +1,111 @@
+# tests/test_lemma_cache.py
+# -*- coding: utf-8 -*-
+import threading
+
+import nltk
+import pytest
+
+from backend import config, utils
+
+
+class CountingLemmatizer:
+    """Stand-in for WordNetLemmatizer (WordNet data is not available offline) that counts lookups."""
+
+    def __init__(self):
+        self.calls = []
+
+    def lemmatize(self, word, pos="n"):
+        self.calls.append((word, pos))
+        return word[:-1] if pos == "n" and word.endswith("s") else word
+
+
+@pytest.fixture
+def lemmatizer(monkeypatch):
+    """Counting lemmatizer, no bundle lemma table, a fresh in-memory cache; defaults restored afterwards."""
+    counting = CountingLemmatizer()
+    monkeypatch.setattr(utils, "lemmatizer", counting)
+    monkeypatch.setattr(utils, "lemma_table", {})
+    utils.configure_lemma_cache(100)
+    yield counting
+    utils.configure_lemma_cache(config.LEMMA_CACHE_SIZE)
+
+
+def test_repeated_pairs_are_served_from_the_cache(lemmatizer):
+    assert utils._lemmatize_all({("apis", "n"), ("apis", "v")}) == {("apis", "n"): "api", ("apis", "v"): "apis"}
+    assert utils._lemmatize_all({("apis", "n"), ("servers", "n")}) == {("apis", "n"): "api", ("servers", "n"): "server"}
+    assert lemmatizer.calls.count(("apis", "n")) == 1
+    assert utils.lemma_cache_stats() == {"hits": 1, "misses": 3, "size": 3, "max_size": 100}
+
+
+def test_bundle_lemma_table_is_consulted_first(lemmatizer, monkeypatch):
+    monkeypatch.setattr(utils, "lemma_table", {("data", "n"): "datum"})
+    assert utils._lemmatize_all({("data", "n")}) == {("data", "n"): "datum"}
+    assert lemmatizer.calls == []
+    assert utils.lemma_cache_stats()["size"] == 0
+
+
+def test_cache_is_bounded_lru(lemmatizer):
+    utils.configure_lemma_cache(2)
+    utils._lemmatize_all({("a1", "n")})
+    utils._lemmatize_all({("b1", "n")})
+    utils._lemmatize_all({("a1", "n")}) # Most recently used now
+    utils._lemmatize_all({("c1", "n")})
+    assert list(utils._lemma_cache) == [("a1", "n"), ("c1", "n")]
+
+
+def test_size_zero_disables_the_cache(lemmatizer):
+    utils.configure_lemma_cache(0)
+    utils._lemmatize_all({("apis", "n")})
+    utils._lemmatize_all({("apis", "n")})
+    assert len(lemmatizer.calls) == 2
+    assert utils.lemma_cache_stats() == {"hits": 0, "misses": 0, "size": 0, "max_size": 0}
+
+
+def test_concurrent_lookups(lemmatizer):
+    words = {(f"word{i}s", "n") for i in range(200)}
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(utils._lemmatize_all(words))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(result == results[0] for result in results) and len(results) == 8
+    stats = utils.lemma_cache_stats()
+    assert stats["size"] == 100 and stats["hits"] + stats["misses"] == 8 * 200
+
+
+def test_cache_is_persisted_between_restarts(lemmatizer, tmp_path):
+    path = str(tmp_path / "cache" / "lemmas.json.gz")
+    utils.configure_lemma_cache(100, path, save_interval=3)
+    utils._lemmatize_all({("apis", "n"), ("servers", "n")})
+    assert not (tmp_path / "cache").exists() # Below the save interval
+    utils._lemmatize_all({("tests", "v")})
+    assert (tmp_path / "cache" / "lemmas.json.gz").is_file()
+
+    # "Restart": a new configuration reloads the saved entries
+    utils.configure_lemma_cache(100, path)
+    lemmatizer.calls.clear()
+    assert utils._lemmatize_all({("apis", "n"), ("tests", "v")}) == {("apis", "n"): "api", ("tests", "v"): "tests"}
+    assert lemmatizer.calls == []
+
+
+def test_corrupt_cache_file_starts_empty(lemmatizer, tmp_path):
+    path = tmp_path / "lemmas.json.gz"
+    path.write_bytes(b"not gzip")
+    utils.configure_lemma_cache(100, str(path))
+    assert utils.lemma_cache_stats()["size"] == 0
+    utils._lemmatize_all({("apis", "n")})
+    assert utils.save_lemma_cache()
+    assert utils.lemma_cache_stats()["size"] == 1
+
+
+def test_keyword_extraction_uses_the_cache(lemmatizer, monkeypatch):
+    monkeypatch.setattr(nltk, "pos_tag", lambda tokens: [(token, "NNS") for token in tokens])
+    assert utils.preprocess_and_extract_keywords_nltk("Servers servers APIs") == {"server", "api"}
+    assert utils.preprocess_and_extract_keywords_nltk("servers") == {"server"}
+    assert sorted(lemmatizer.calls) == [("apis", "n"), ("servers", "n")]
+
+
+def test_health_reports_cache_counters(lemmatizer, app):
+    assert app.test_client().get("/health").get_json()["lemma_cache"] == {
+        "hits": 0, "misses": 0, "size": 0, "max_size": config.LEMMA_CACHE_SIZE}
@@ -0,0 +1,134 @@
+# tests/test_nlp_bundle.py
+# -*- coding: utf-8 -*-
+import json
+import os
+
+import nltk
+import pytest
+
+import backend
+from backend import config, nlp_bundle, nlp_model, utils
+
+STORAGE_KEYS = ("JOB_DESC_FOLDER", "ORIGINAL_RESUME_FOLDER", "PARSED_DATA_FOLDER", "UPLOAD_JOBS_FOLDER",
+                "RESUME_INDEX_PATH", "RAW_TEXT_STORE_PATH")
+
+
+class SuffixLemmatizer:
+    """Stand-in for WordNetLemmatizer (WordNet data is not available offline)."""
+
+    def lemmatize(self, word, pos="n"):
+        return word[:-1] if pos == "n" and word.endswith("s") else word
+
+
+@pytest.fixture
+def build_inputs(tmp_path, monkeypatch):
+    """A saved spaCy pipeline, an nltk_data directory with a stopwords corpus and a vocabulary file."""
+    import spacy
+    nlp = spacy.blank("en")
+    nlp.add_pipe("tagger").add_label("NN")
+    nlp.add_pipe("ner").add_label("PERSON")
+    nlp.initialize()
+    nlp.to_disk(tmp_path / "model")
+
+    stopwords_dir = tmp_path / "nltk_data" / "corpora" / "stopwords"
+    stopwords_dir.mkdir(parents=True)
+    (stopwords_dir / "english").write_text("the\nand\nof\n", encoding="utf-8")
+    monkeypatch.setattr(nltk.data, "path", [str(tmp_path / "nltk_data")])
+    monkeypatch.setattr(nltk.stem, "WordNetLemmatizer", SuffixLemmatizer)
+
+    (tmp_path / "vocabulary.txt").write_text("Developers, APIs and the databases! 2024", encoding="utf-8")
+    return {
+        "model_path": str(tmp_path / "model"),
+        "vocabulary_paths": [str(tmp_path / "vocabulary.txt")],
+        "nltk_packages": [("corpora/stopwords", "stopwords")],
+        "components": ["ner"],
+    }
+
+
+@pytest.fixture
+def nltk_globals(monkeypatch):
+    """Restores the NLTK globals of utils after the test."""
+    for name in ("lemmatizer", "all_stop_words", "lemma_table"):
+        monkeypatch.setattr(utils, name, getattr(utils, name))
+
+
+def test_build_bundle(tmp_path, build_inputs):
+    bundle_path = str(tmp_path / "bundle")
+    manifest = nlp_bundle.build_bundle(bundle_path, **build_inputs)
+    assert nlp_bundle.load_bundle_manifest(bundle_path) == manifest
+    assert manifest["spacy"]["components"] == ["ner"]
+    assert os.path.isfile(os.path.join(bundle_path, "nltk_data", "corpora", "stopwords", "english"))
+
+    stop_words = nlp_bundle.read_bundle_stop_words(bundle_path, manifest)
+    assert {"the", "and", "of"} <= stop_words and set(config.custom_stops) <= stop_words
+    lemmas = nlp_bundle.read_bundle_lemma_table(bundle_path, manifest)
+    assert lemmas[("developers", "n")] == "developer"
+    assert lemmas[("developers", "v")] == "developers"
+    assert ("the", "n") not in lemmas and ("", "n") not in lemmas
+
+    # Same inputs, same bundle id; the old bundle is replaced
+    assert nlp_bundle.build_bundle(bundle_path, **build_inputs)["bundle_id"] == manifest["bundle_id"]
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".nlp_bundle_")]
+
+
+def test_vocabulary_is_tokenized_like_keywords(tmp_path):
+    text = "Node.js, e-mail\u2022Kubernetes's APIs (REST) 2024 the"
+    (tmp_path / "vocabulary.txt").write_text(text, encoding="utf-8")
+    vocabulary = nlp_bundle._read_vocabulary([str(tmp_path)], {"the"})
+    assert vocabulary == set(utils.iter_keyword_tokens(text, {"the"}))
+    assert vocabulary == {"nodejs", "email", "kubernetes", "apis", "rest"}
+
+
+def test_missing_nltk_package_fails_the_build(tmp_path, build_inputs):
+    build_inputs["nltk_packages"].append(("corpora/wordnet", "wordnet"))
+    with pytest.raises(ValueError, match="wordnet"):
+        nlp_bundle.build_bundle(str(tmp_path / "bundle"), **build_inputs)
+    assert not os.path.exists(tmp_path / "bundle")
+
+
+def test_incompatible_bundle_is_rejected(tmp_path, build_inputs):
+    bundle_path = str(tmp_path / "bundle")
+    manifest = nlp_bundle.build_bundle(bundle_path, **build_inputs)
+    with open(os.path.join(bundle_path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({**manifest, "format_version": 0}, f)
+    with pytest.raises(ValueError, match="format"):
+        nlp_bundle.load_bundle_manifest(bundle_path)
+
+
+def test_nltk_initializes_from_bundle_without_downloads(tmp_path, build_inputs, nltk_globals, monkeypatch):
+    bundle_path = str(tmp_path / "bundle")
+    nlp_bundle.build_bundle(bundle_path, **build_inputs)
+    monkeypatch.setattr(nltk, "download", lambda *args, **kwargs: pytest.fail("download attempted"))
+    monkeypatch.setattr(nltk.data, "find", lambda *args, **kwargs: pytest.fail("data check attempted"))
+    utils.lemmatizer = None
+
+    assert utils.initialize_nltk(bundle_path) is True
+    assert "the" in utils.all_stop_words
+    assert utils.lemma_table[("apis", "n")] == "api"
+    assert nltk.data.path[0] == os.path.join(bundle_path, "nltk_data")
+
+
+def test_app_loads_spacy_model_from_bundle(app, tmp_path, build_inputs):
+    bundle_path = str(tmp_path / "bundle")
+    nlp_bundle.build_bundle(bundle_path, **build_inputs)
+    app.config["NLP_BUNDLE_PATH"] = bundle_path # conftest: the regular install step always fails
+
+    model = nlp_model.get_nlp_model(app)
+    assert model is not None and model.pipe_names == ["ner"]
+    assert app.config["NLP_MODEL_PATH"] == os.path.join(bundle_path, "spacy_model")
+
+
+def test_app_without_usable_bundle_runs_without_ner(app, tmp_path):
+    app.config["NLP_BUNDLE_PATH"] = str(tmp_path / "missing_bundle")
+    assert nlp_model.get_nlp_model(app) is None
+    assert app.test_client().get("/health").get_json()["spacy_model"].endswith("(Failed/Unavailable)")
+
+
+def test_startup_phases_are_timed(app):
+    assert list(app.config["STARTUP_PHASE_SECONDS"]) == ["configuration", "directories", "resume store", "nltk", "routes"]
+    assert all(seconds >= 0 for seconds in app.config["STARTUP_PHASE_SECONDS"].values())
+
+
+def test_build_command_reports_missing_model(tmp_path, capsys):
+    assert nlp_bundle.main(["build", "--output", str(tmp_path / "bundle"), "--model-path", str(tmp_path / "no_model")]) == 1
+    assert not os.path.exists(tmp_path / "bundle")
@@ -0,0 +1,166 @@
+# tests/test_nlp_model.py
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+import pytest
+
+import backend
+from backend import nlp_model, utils
+
+STORAGE_KEYS = ("JOB_DESC_FOLDER", "ORIGINAL_RESUME_FOLDER", "PARSED_DATA_FOLDER", "UPLOAD_JOBS_FOLDER",
+                "RESUME_INDEX_PATH", "RAW_TEXT_STORE_PATH")
+
+
+class FakeModel:
+    def __call__(self, text):
+        raise AssertionError("not used")
+
+
+@pytest.fixture
+def model_loads(monkeypatch):
+    """Replaces the real loader with a slow fake one and records each load."""
+    loads = []
+
+    def fake_load(app, *args):
+        loads.append(threading.get_ident())
+        time.sleep(0.05)
+        app.config["NLP_MODEL"] = FakeModel()
+        return app.config["NLP_MODEL"]
+
+    monkeypatch.setattr(nlp_model, "load_spacy_model_on_demand", fake_load)
+    return loads
+
+
+def test_model_is_not_loaded_at_startup(app, model_loads):
+    assert model_loads == []
+    data = app.test_client().get("/health").get_json()
+    assert data["spacy_model"].endswith("(Not loaded yet)")
+    assert model_loads == []
+
+
+def test_concurrent_first_use_loads_once(app, model_loads):
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(nlp_model.get_nlp_model(app))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(model_loads) == 1
+    assert len(models) == 8 and all(model is models[0] for model in models)
+
+
+def test_warmup_endpoint(app, model_loads):
+    client = app.test_client()
+    response = client.post("/admin/warmup")
+    assert response.status_code == 200
+    assert response.get_json()["spacy_model"].endswith("(Loaded)")
+    assert client.get("/health").get_json()["spacy_model"].endswith("(Loaded)")
+    client.post("/admin/warmup")
+    assert len(model_loads) == 1
+
+
+def test_failed_load_is_reported_and_not_retried(app):
+    client = app.test_client()
+    assert client.post("/admin/warmup").status_code == 503 # conftest: the model is never installed
+    assert client.get("/health").get_json()["spacy_model"].endswith("(Failed/Unavailable)")
+    assert app.config["NLP_MODEL_LOADED"] is True
+
+
+def test_preload_mode_loads_in_create_app(app, model_loads):
+    preloaded_app = backend.create_app({"TESTING": True, "NLP_PRELOAD": True, **{key: app.config[key] for key in STORAGE_KEYS}})
+    assert len(model_loads) == 1
+    assert isinstance(preloaded_app.config["NLP_MODEL"], FakeModel)
+
+
+def test_parse_resume_text_loads_model_on_first_use(app, monkeypatch):
+    monkeypatch.setattr(nlp_model, "load_spacy_model_on_demand",
+                        lambda app, *args: app.config.__setitem__("NLP_MODEL", lambda text: type("Doc", (), {"ents": []})()))
+    with app.app_context():
+        text = "Jane Doe\njane@example.com\nBengaluru\nSkills\nPython, SQL\nExperience\nAcme Corp, 2020 - 2023"
+        assert utils.parse_resume_text(text, "jane.pdf")["email"] == "jane@example.com"
+    assert app.config["NLP_MODEL_LOADED"] is True
+
+
+# --- Trimmed Pipeline and Batched NER ---
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    """A small saved pipeline: tagger and 'ner' share a tok2vec, 'ner_own' embeds on its own."""
+    import spacy
+    nlp = spacy.blank("en")
+    nlp.add_pipe("tok2vec")
+    nlp.add_pipe("tagger").add_label("NN")
+    nlp.add_pipe("ner", config={"model": {
+        "@architectures": "spacy.TransitionBasedParser.v2", "state_type": "ner", "extra_state_tokens": False,
+        "hidden_width": 32, "maxout_pieces": 2, "use_upper": True, "nO": None,
+        "tok2vec": {"@architectures": "spacy.Tok2VecListener.v1", "width": 96, "upstream": "*"},
+    }}).add_label("PERSON")
+    nlp.add_pipe("ner", name="ner_own").add_label("PERSON")
+    nlp.initialize()
+    path = tmp_path_factory.mktemp("model") / "tiny_model"
+    nlp.to_disk(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("components, expected", [
+    (["ner"], ["tok2vec", "ner"]), # Keeps the tok2vec 'ner' listens to
+    (["ner_own"], ["ner_own"]),
+    ([], ["tok2vec", "tagger", "ner", "ner_own"]),
+    (None, ["tok2vec", "tagger", "ner", "ner_own"]),
+])
+def test_load_spacy_pipeline_keeps_only_needed_components(model_dir, components, expected):
+    assert nlp_model.load_spacy_pipeline(model_dir, components).pipe_names == expected
+
+
+@pytest.fixture
+def person_nlp():
+    """Deterministic stand-in for the NER model: tags 'Jane Doe' and 'John Smith' as PERSON."""
+    import spacy
+    nlp = spacy.blank("en")
+    nlp.add_pipe("entity_ruler").add_patterns([
+        {"label": "PERSON", "pattern": "Jane Doe"}, {"label": "PERSON", "pattern": "John Smith"}])
+    return nlp
+
+
+RESUME_TEXTS = [
+    "Jane Doe\njane@example.com\nBengaluru\nSkills\nPython, SQL\nExperience\nAcme Corp, 2020 - 2023",
+    "Curriculum Vitae\nJohn Smith | john.smith@example.com\nSummary\nData engineer\nEducation\nB.Tech, 2019",
+]
+
+
+def test_batched_name_docs_match_single_parses(app, person_nlp, monkeypatch):
+    pipe_batch_sizes = []
+    original_pipe = person_nlp.pipe
+    monkeypatch.setattr(person_nlp, "pipe", lambda texts, batch_size: pipe_batch_sizes.append(batch_size) or original_pipe(texts, batch_size=batch_size))
+    app.config["NLP_PIPE_BATCH_SIZE"] = 7
+    with app.app_context():
+        docs = utils.extract_name_docs(RESUME_TEXTS, person_nlp)
+        assert pipe_batch_sizes == [7]
+        for text, doc in zip(RESUME_TEXTS, docs):
+            batched = utils.parse_resume_text(text, "resume.pdf", ner_doc=doc)
+            assert batched == utils.parse_resume_text(text, "resume.pdf", nlp=person_nlp)
+        assert [utils.parse_resume_text(t, "r.pdf", ner_doc=d)["name"] for t, d in zip(RESUME_TEXTS, docs)] == ["Jane Doe", "John Smith"]
+
+
+def test_extract_and_parse_resumes_runs_ner_once_per_batch(app, person_nlp, monkeypatch, tmp_path):
+    import docx
+    files = []
+    for index, text in enumerate(RESUME_TEXTS):
+        document = docx.Document()
+        for line in text.split("\n"):
+            document.add_paragraph(line)
+        document.save(tmp_path / f"r{index}.docx")
+        files.append((str(tmp_path / f"r{index}.docx"), ".docx", f"r{index}.docx"))
+    files.insert(1, (str(tmp_path / "broken.pdf"), ".pdf", "broken.pdf"))
+
+    pipe_calls = []
+    original_pipe = person_nlp.pipe
+    monkeypatch.setattr(person_nlp, "pipe", lambda texts, batch_size: pipe_calls.append(list(texts)) or original_pipe(pipe_calls[-1], batch_size=batch_size))
+    started = []
+    with app.app_context():
+        outcomes = utils.extract_and_parse_resumes(files, nlp=person_nlp, on_file_start=started.append)
+    assert started == [0, 1, 2]
+    assert len(pipe_calls) == 1 and len(pipe_calls[0]) == 2
+    assert outcomes[0]["parsed_data"]["name"] == "Jane Doe"
+    assert isinstance(outcomes[1], Exception)
+    assert outcomes[2]["parsed_data"]["name"] == "John Smith"
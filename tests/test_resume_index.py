@@ -0,0 +1,157 @@
+# tests/test_resume_index.py
+# -*- coding: utf-8 -*-
+import json
+import math
+import os
+import sqlite3
+
+import pytest
+
+from backend import resume_index
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "index" / "resume_index.sqlite3")
+
+
+def test_empty_index(db_path):
+    assert resume_index.list_indexed_resume_ids(db_path) == set()
+    assert resume_index.count_keyword_matches(db_path, {"python"}) == {}
+    assert resume_index.find_keyword_matches(db_path, {"python"}, ["a_parsed.json"]) == {}
+
+
+def test_index_count_and_find_round_trip(db_path):
+    resume_index.index_resume_keywords(db_path, "a_parsed.json", {"python", "flask", "sql"})
+    resume_index.index_resume_keywords(db_path, "b_parsed.json", {"java", "sql"})
+    resume_index.index_resume_keywords(db_path, "c_parsed.json", set())
+
+    assert resume_index.list_indexed_resume_ids(db_path) == {"a_parsed.json", "b_parsed.json", "c_parsed.json"}
+    assert resume_index.count_keyword_matches(db_path, {"python", "sql", "rust"}) == {"a_parsed.json": 2, "b_parsed.json": 1}
+    assert resume_index.find_keyword_matches(db_path, {"python", "sql", "rust"}, ["a_parsed.json", "b_parsed.json", "c_parsed.json"]) == {
+        "a_parsed.json": ["python", "sql"],
+        "b_parsed.json": ["sql"],
+    }
+    # Only the requested resumes are returned
+    assert resume_index.find_keyword_matches(db_path, {"sql"}, ["b_parsed.json"]) == {"b_parsed.json": ["sql"]}
+
+
+def test_reindex_replaces_keywords(db_path):
+    resume_index.index_resume_keywords(db_path, "a_parsed.json", {"python", "flask"})
+    resume_index.index_resume_keywords(db_path, "a_parsed.json", {"rust"})
+
+    assert resume_index.list_indexed_resume_ids(db_path) == {"a_parsed.json"}
+    assert resume_index.count_keyword_matches(db_path, {"python", "flask"}) == {}
+    assert resume_index.count_keyword_matches(db_path, {"rust"}) == {"a_parsed.json": 1}
+
+
+def test_failed_extraction_is_not_indexed(db_path):
+    with pytest.raises(ValueError):
+        resume_index.index_resume_keywords(db_path, "a_parsed.json", None)
+    assert resume_index.list_indexed_resume_ids(db_path) == set()
+
+
+def test_large_jd_vocabulary_is_chunked(db_path):
+    jd_keywords = {f"kw{i}" for i in range(3 * resume_index._MAX_QUERY_PARAMS)}
+    resume_index.index_resume_keywords(db_path, "a_parsed.json", {"kw1", "kw999", "kw1400", "other"})
+
+    assert resume_index.count_keyword_matches(db_path, jd_keywords) == {"a_parsed.json": 3}
+    assert resume_index.find_keyword_matches(db_path, jd_keywords, ["a_parsed.json"]) == {"a_parsed.json": ["kw1", "kw1400", "kw999"]}
+
+
+def test_content_hash_claim_and_forget(db_path):
+    assert resume_index.find_resume_by_content_hash(db_path, "abc") is None
+    assert resume_index.claim_content_hash(db_path, "abc", "a_parsed.json") == "a_parsed.json"
+    # A later claim for the same content loses to the first one
+    assert resume_index.claim_content_hash(db_path, "abc", "b_parsed.json") == "a_parsed.json"
+    assert resume_index.find_resume_by_content_hash(db_path, "abc") == "a_parsed.json"
+
+    resume_index.forget_content_hash(db_path, "abc", "b_parsed.json") # Not the owner: no-op
+    assert resume_index.find_resume_by_content_hash(db_path, "abc") == "a_parsed.json"
+    resume_index.forget_content_hash(db_path, "abc", "a_parsed.json")
+    assert resume_index.find_resume_by_content_hash(db_path, "abc") is None
+
+
+def test_parsed_resume_store_round_trip(db_path):
+    parsed = {"_original_filename": "jane.pdf", "name": "Jane Doe", "email": "jane@example.com", "phone": "Not Found", "skills": "Python"}
+    resume_index.store_parsed_resume(db_path, "a_parsed.json", parsed)
+    resume_index.index_resume_keywords(db_path, "a_parsed.json", {"python"})
+
+    assert resume_index.list_stored_resume_ids(db_path) == {"a_parsed.json"}
+    assert resume_index.load_parsed_resume(db_path, "a_parsed.json") == parsed
+    assert resume_index.load_resume_summaries(db_path, ["a_parsed.json", "missing_parsed.json"]) == {
+        "a_parsed.json": {"_original_filename": "jane.pdf", "name": "Jane Doe", "email": "jane@example.com", "phone": "Not Found"}
+    }
+    with pytest.raises(TypeError):
+        resume_index.store_parsed_resume(db_path, "b_parsed.json", {"name": object()})
+
+    resume_index.delete_parsed_resume(db_path, "a_parsed.json")
+    assert resume_index.load_parsed_resume(db_path, "a_parsed.json") is None
+    assert resume_index.list_indexed_resume_ids(db_path) == set()
+
+
+def test_parsed_json_folder_is_imported_once(db_path, tmp_path):
+    parsed_folder = tmp_path / "resumes_parsed"
+    parsed_folder.mkdir()
+    (parsed_folder / "a_parsed.json").write_text(json.dumps({"_original_filename": "a.pdf", "name": "A"}), encoding="utf-8")
+    (parsed_folder / "broken_parsed.json").write_text("{not json", encoding="utf-8")
+
+    assert resume_index.import_parsed_json_folder(db_path, str(parsed_folder)) == 1
+    assert resume_index.load_resume_summaries(db_path, ["a_parsed.json"])["a_parsed.json"]["name"] == "A"
+
+    (parsed_folder / "b_parsed.json").write_text(json.dumps({"name": "B"}), encoding="utf-8")
+    assert resume_index.import_parsed_json_folder(db_path, str(parsed_folder)) == 0
+    assert resume_index.list_stored_resume_ids(db_path) == {"a_parsed.json"}
+
+
+def test_weighted_scoring(db_path):
+    resume_index.index_resume_keywords(db_path, "a_parsed.json", {"python"})
+    resume_index.index_resume_keywords(db_path, "b_parsed.json", {"python", "rust"})
+    resume_index.index_resume_keywords(db_path, "c_parsed.json", {"java"})
+    resume_index.index_resume_keywords(db_path, "d_parsed.json", {"python", "java", "sql", "excel", "word", "jira"})
+
+    # Smoothed IDF: the rare "rust" outweighs the common "python"
+    idf_python, idf_rust = math.log(5 / 4) + 1, math.log(5 / 2) + 1
+    scores = resume_index.score_keyword_matches(db_path, {"python", "rust"}, "tfidf")
+    assert scores == {
+        "a_parsed.json": round(idf_python / (idf_python + idf_rust) * 100, 2),
+        "b_parsed.json": 100.0,
+        "d_parsed.json": round(idf_python / (idf_python + idf_rust) * 100, 2),
+    }
+
+    # BM25: same matches, but the shorter resume ranks higher; scores stay within 0-100
+    scores = resume_index.score_keyword_matches(db_path, {"python", "rust"}, "bm25")
+    assert set(scores) == {"a_parsed.json", "b_parsed.json", "d_parsed.json"}
+    assert scores["b_parsed.json"] > scores["a_parsed.json"] > scores["d_parsed.json"] > 0
+    assert all(0 < score <= 100 for score in scores.values())
+
+    with pytest.raises(ValueError):
+        resume_index.score_keyword_matches(db_path, {"python"}, "cosine")
+
+
+@pytest.mark.parametrize("scoring", ["overlap", "tfidf", "bm25"])
+def test_chunked_scores_equal_whole_corpus_scores(db_path, scoring):
+    vocabulary = ["python", "java", "sql", "rust", "go"]
+    for n in range(7): # Resume n has the keywords of n's bits, plus vocabulary[n] (varied lengths for BM25)
+        resume_index.index_resume_keywords(db_path, f"r{n}_parsed.json", {kw for i, kw in enumerate(vocabulary) if (n >> i) & 1 or i == n})
+    resume_ids = resume_index.list_indexed_resume_ids(db_path)
+    chunks = list(resume_index.iter_keyword_scores(db_path, {"python", "rust", "go"}, resume_ids, scoring, chunk_size=3))
+    assert len(chunks) == 3
+    merged = {resume_id: score for chunk in chunks for resume_id, score in chunk.items()}
+    assert merged == resume_index.score_keyword_matrix(db_path, {"": {"python", "rust", "go"}}, scoring)[""]
+    # Only the requested resumes are scored
+    assert list(resume_index.iter_keyword_scores(db_path, {"python"}, ["r1_parsed.json"], scoring)) == [
+        {"r1_parsed.json": resume_index.score_keyword_matrix(db_path, {"": {"python"}}, scoring)[""]["r1_parsed.json"]}]
+
+
+def test_keyword_counts_are_added_to_old_indexes(db_path):
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE resume_keywords (resume_id TEXT PRIMARY KEY, keywords TEXT NOT NULL, indexed_at REAL NOT NULL)")
+    conn.execute("INSERT INTO resume_keywords VALUES ('a_parsed.json', 'python sql', 0)")
+    conn.commit()
+    conn.close()
+
+    with resume_index._connect(db_path) as conn:
+        assert conn.execute("SELECT keyword_count FROM resume_keywords").fetchone() == (2,)
+    assert resume_index.score_keyword_matches(db_path, {"python"}, "bm25") == {"a_parsed.json": pytest.approx(100 * 1 / (1 + 1.2), abs=0.01)}
@@ -0,0 +1,341 @@
+# tests/test_scan_batch.py
+# -*- coding: utf-8 -*-
+import json
+import os
+import sqlite3
+
+import pytest
+
+from backend import scan_resumes, utils
+from backend.resume_index import delete_parsed_resume, index_resume_keywords, list_indexed_resume_ids, store_parsed_resume
+from backend.text_store import put_raw_text
+
+JD_KEYWORDS = frozenset({"python", "flask", "sql", "docker"})
+
+# resume_id -> indexed keywords; scores against JD_KEYWORDS: 100, 50, 25, 0
+RESUMES = {
+    "alice_parsed.json": {"python", "flask", "sql", "docker", "react"},
+    "bob_parsed.json": {"python", "sql", "java"},
+    "carol_parsed.json": {"docker"},
+    "dave_parsed.json": {"excel"},
+}
+
+
+@pytest.fixture
+def scan_app(app, monkeypatch):
+    """App with one JD and four parsed, indexed resumes."""
+    os.makedirs(app.config["JOB_DESC_FOLDER"], exist_ok=True)
+    with open(os.path.join(app.config["JOB_DESC_FOLDER"], "jd.txt"), "w", encoding="utf-8") as f:
+        f.write("Python developer with Flask, SQL and Docker.")
+    for resume_id, keywords in RESUMES.items():
+        name = resume_id.replace("_parsed.json", "")
+        store_parsed_resume(app.config["RESUME_INDEX_PATH"], resume_id,
+                            {"_original_filename": f"{name}.pdf", "name": name.title(), "email": f"{name}@example.com", "phone": "Not Found"})
+        index_resume_keywords(app.config["RESUME_INDEX_PATH"], resume_id, keywords)
+    monkeypatch.setattr(scan_resumes, "get_jd_keywords", lambda path: JD_KEYWORDS)
+    return app
+
+
+def _scan(client, **body):
+    return client.post("/scan/batch", json={"jd_filename": "jd.txt", **body})
+
+
+def test_results_are_ordered_by_score(scan_app):
+    response = _scan(scan_app.test_client())
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [(r["name"], r["score"]) for r in data["results"]] == [("Alice", 100.0), ("Bob", 50.0), ("Carol", 25.0)]
+    assert data["results"][1]["matching_keywords"] == ["python", "sql"]
+
+
+def test_full_tfidf_match_scores_100(scan_app):
+    data = _scan(scan_app.test_client(), scoring="tfidf").get_json()
+    assert data["results"][0]["score"] == 100.0
+    assert data["results"][1]["missing_keywords"] == ["docker", "flask"]
+    assert data["summary"]["total_resumes_found"] == 4
+    assert data["summary"]["successfully_scanned"] == 4
+    assert data["summary"]["matching_candidates"] == 3
+
+
+def test_top_k_and_min_score(scan_app):
+    client = scan_app.test_client()
+
+    data = _scan(client, top_k=2).get_json()
+    assert [r["name"] for r in data["results"]] == ["Alice", "Bob"]
+    assert data["summary"]["returned_results"] == 2
+
+    data = _scan(client, min_score=50).get_json()
+    assert [r["name"] for r in data["results"]] == ["Alice", "Bob"]
+    assert data["summary"]["matching_candidates"] == 2
+
+    data = _scan(client, top_k=1, min_score=30.5).get_json()
+    assert [r["name"] for r in data["results"]] == ["Alice"]
+
+
+@pytest.mark.parametrize("body", [
+    {"top_k": 0},
+    {"top_k": -3},
+    {"top_k": 2.5},
+    {"top_k": "5"},
+    {"top_k": True},
+    {"min_score": -1},
+    {"min_score": 101},
+    {"min_score": "50"},
+    {"min_score": False},
+    {"scoring": "cosine"},
+    {"scoring": None},
+])
+def test_invalid_limits_are_rejected(scan_app, body):
+    response = _scan(scan_app.test_client(), **body)
+    assert response.status_code == 400
+
+
+def test_unindexed_resume_is_indexed_from_raw_text_store(scan_app, monkeypatch):
+    store_parsed_resume(scan_app.config["RESUME_INDEX_PATH"], "erin_parsed.json", {"_original_filename": "erin.pdf", "name": "Erin"})
+    put_raw_text(scan_app.config["RAW_TEXT_STORE_PATH"], "erin_parsed.json", "python flask")
+    monkeypatch.setattr(utils, "lemmatizer", object())
+    monkeypatch.setattr(utils, "preprocess_and_extract_keywords_nltk", lambda text: set(text.split()))
+
+    data = _scan(scan_app.test_client()).get_json()
+    assert ("Erin", 50.0) in [(r["name"], r["score"]) for r in data["results"]]
+    assert data["scan_errors"] == []
+    assert "erin_parsed.json" in list_indexed_resume_ids(scan_app.config["RESUME_INDEX_PATH"])
+
+
+def test_unindexed_resume_without_raw_text_is_reported(scan_app, monkeypatch):
+    store_parsed_resume(scan_app.config["RESUME_INDEX_PATH"], "erin_parsed.json", {"_original_filename": "erin.pdf", "name": "Erin"})
+    monkeypatch.setattr(utils, "lemmatizer", object())
+
+    response = _scan(scan_app.test_client())
+    assert response.status_code == 207
+    assert [e["filename"] for e in response.get_json()["scan_errors"]] == ["erin_parsed.json"]
+
+
+def test_legacy_inline_raw_text_is_still_used(scan_app, monkeypatch):
+    store_parsed_resume(scan_app.config["RESUME_INDEX_PATH"], "erin_parsed.json",
+                        {"_original_filename": "erin.pdf", "name": "Erin", "_raw_text": "docker"})
+    monkeypatch.setattr(utils, "lemmatizer", object())
+    monkeypatch.setattr(utils, "preprocess_and_extract_keywords_nltk", lambda text: set(text.split()))
+
+    data = _scan(scan_app.test_client()).get_json()
+    assert ("Erin", 25.0) in [(r["name"], r["score"]) for r in data["results"]]
+
+
+def _extract_keywords_chunk_without_nltk(*args):
+    """Pool entry point for the process-mode test: the real chunk extraction, with NLTK stubbed in the worker."""
+    utils.lemmatizer = object()
+    utils.preprocess_and_extract_keywords_nltk = lambda text: set(text.split())
+    return scan_resumes._extract_keywords_chunk(*args)
+
+
+def test_process_mode_backfills_the_same_index_as_inline(scan_app, monkeypatch, tmp_path, parse_pool):
+    # NLTK data (tagger) is not available offline, so the workers run the stand-in above
+    submit_to_worker_pool = scan_resumes.submit_to_worker_pool
+    monkeypatch.setattr(scan_resumes, "submit_to_worker_pool",
+                        lambda config, fn, *args: submit_to_worker_pool(config, _extract_keywords_chunk_without_nltk, *args))
+    monkeypatch.setattr(utils, "lemmatizer", object())
+    monkeypatch.setattr(utils, "preprocess_and_extract_keywords_nltk", lambda text: set(text.split()))
+    scan_app.config["SCAN_CHUNK_SIZE"] = 2
+    raw_texts = {"erin_parsed.json": "python flask", "frank_parsed.json": "docker sql python",
+                 "gina_parsed.json": "excel", "hal_parsed.json": "flask", "ivy_parsed.json": "python flask sql docker"}
+    for resume_id, text in raw_texts.items():
+        put_raw_text(scan_app.config["RAW_TEXT_STORE_PATH"], resume_id, text)
+
+    backfilled = {}
+    for mode in ("inline", "process"):
+        scan_app.config["SCAN_EXECUTION_MODE"] = mode
+        scan_app.config["RESUME_INDEX_PATH"] = index_path = str(tmp_path / f"{mode}_index.sqlite3")
+        for resume_id in raw_texts: # Stored but not yet indexed
+            store_parsed_resume(index_path, resume_id, {"_original_filename": resume_id.replace("_parsed.json", ".pdf"),
+                                                        "name": resume_id.split("_")[0].title()})
+        data = _scan(scan_app.test_client()).get_json()
+        assert data["scan_errors"] == []
+        with sqlite3.connect(index_path) as conn:
+            index = {resume_id: (set(keywords.split()), count) for resume_id, keywords, count
+                     in conn.execute("SELECT resume_id, keywords, keyword_count FROM resume_keywords")}
+        backfilled[mode] = (index, [(r["name"], r["score"]) for r in data["results"]])
+
+    assert backfilled["process"] == backfilled["inline"]
+    index, results = backfilled["process"]
+    assert {resume_id: keywords for resume_id, (keywords, _) in index.items()} == {
+        resume_id: set(text.split()) for resume_id, text in raw_texts.items()}
+    assert results[0] == ("Ivy", 100.0)
+
+
+@pytest.mark.parametrize("scoring", ["tfidf", "bm25"])
+def test_weighted_scoring_is_selectable_per_request(scan_app, scoring):
+    data = _scan(scan_app.test_client(), scoring=scoring).get_json()
+    assert data["summary"]["scoring"] == scoring
+    assert [r["name"] for r in data["results"]] == ["Alice", "Bob", "Carol"]
+    # Bob's "python" + "sql" are shared by two resumes each, as is Carol's "docker"
+    assert 0 < data["results"][2]["score"] < data["results"][1]["score"]
+    assert data["results"][1]["matching_keywords"] == ["python", "sql"]
+
+
+
+def test_rescan_reuses_cached_matches(scan_app):
+    client = scan_app.test_client()
+    first = _scan(client).get_json()
+    assert (first["summary"]["cache_hits"], first["summary"]["computed"]) == (0, 4)
+    second = _scan(client).get_json()
+    # Only the three matching resumes are cached; none is scored again
+    assert (second["summary"]["cache_hits"], second["summary"]["computed"]) == (3, 0)
+    assert second["results"] == first["results"]
+
+
+def test_only_matches_and_the_watermark_are_stored(scan_app):
+    _scan(scan_app.test_client())
+    with sqlite3.connect(scan_app.config["RESUME_INDEX_PATH"]) as conn:
+        assert sorted(row[0] for row in conn.execute("SELECT resume_id FROM scan_matches")) == [
+            "alice_parsed.json", "bob_parsed.json", "carol_parsed.json"]
+        latest_indexed_at = conn.execute("SELECT MAX(indexed_at) FROM resume_keywords").fetchone()[0]
+        assert conn.execute("SELECT jd_name, indexed_through FROM scan_watermarks").fetchall() == [("jd.txt", latest_indexed_at)]
+
+
+@pytest.mark.parametrize("scoring", ["tfidf", "bm25"])
+def test_weighted_scores_are_not_cached(scan_app, scoring):
+    client = scan_app.test_client()
+    first = _scan(client, scoring=scoring).get_json()
+    second = _scan(client, scoring=scoring).get_json()
+    assert (second["summary"]["cache_hits"], second["summary"]["computed"]) == (0, 4)
+    assert second["results"] == first["results"]
+
+
+def test_rescan_scores_only_new_and_reindexed_resumes(scan_app):
+    client = scan_app.test_client()
+    _scan(client)
+    index_path = scan_app.config["RESUME_INDEX_PATH"]
+    store_parsed_resume(index_path, "erin_parsed.json", {"_original_filename": "erin.pdf", "name": "Erin"})
+    index_resume_keywords(index_path, "erin_parsed.json", {"python", "flask", "sql"})
+    index_resume_keywords(index_path, "dave_parsed.json", {"excel", "docker"}) # Re-parsed
+
+    data = _scan(client).get_json()
+    assert (data["summary"]["cache_hits"], data["summary"]["computed"]) == (3, 2)
+    assert [(r["name"], r["score"]) for r in data["results"]] == [
+        ("Alice", 100.0), ("Erin", 75.0), ("Bob", 50.0), ("Carol", 25.0), ("Dave", 25.0)]
+
+    # A re-indexed resume that no longer matches loses its cached match
+    index_resume_keywords(index_path, "carol_parsed.json", {"excel"})
+    data = _scan(client).get_json()
+    assert (data["summary"]["cache_hits"], data["summary"]["computed"]) == (4, 1)
+    assert "Carol" not in [r["name"] for r in data["results"]]
+
+
+def test_changed_jd_is_scored_again(scan_app, monkeypatch):
+    client = scan_app.test_client()
+    _scan(client)
+    monkeypatch.setattr(scan_resumes, "get_jd_keywords", lambda path: frozenset({"python", "excel"}))
+    data = _scan(client).get_json()
+    assert (data["summary"]["cache_hits"], data["summary"]["computed"]) == (0, 4)
+    assert [(r["name"], r["score"]) for r in data["results"]] == [("Alice", 50.0), ("Bob", 50.0), ("Dave", 50.0)]
+
+
+def test_deleted_resume_leaves_the_cache(scan_app):
+    client = scan_app.test_client()
+    _scan(client)
+    delete_parsed_resume(scan_app.config["RESUME_INDEX_PATH"], "alice_parsed.json")
+    data = _scan(client).get_json()
+    assert (data["summary"]["cache_hits"], data["summary"]["computed"]) == (2, 0)
+    assert [r["name"] for r in data["results"]] == ["Bob", "Carol"]
+
+
+def test_scan_result_cache_can_be_disabled(scan_app):
+    scan_app.config["SCAN_RESULT_CACHE_ENABLED"] = False
+    client = scan_app.test_client()
+    _scan(client)
+    data = _scan(client).get_json()
+    assert (data["summary"]["cache_hits"], data["summary"]["computed"]) == (0, 4)
+    assert data["results"][0]["score"] == 100.0
+
+
+def _stream(client, **body):
+    response = client.post("/scan/batch", json={"jd_filename": "jd.txt", **body}, headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+@pytest.mark.parametrize("scoring", ["overlap", "tfidf", "bm25"])
+def test_ndjson_streams_each_result_then_the_summary(scan_app, scoring):
+    scan_app.config["SCAN_STREAM_CHUNK_SIZE"] = 1
+    client = scan_app.test_client()
+    records = _stream(client, scoring=scoring)
+    expected = _scan(client, scoring=scoring).get_json()
+
+    assert [record.pop("type") for record in records] == ["result"] * 3 + ["summary"]
+    assert sorted(records[:-1], key=lambda r: -r["score"]) == expected["results"]
+    summary = records[-1]
+    assert summary["jd_used"] == "jd.txt" and summary["scan_errors"] == []
+    assert {key: summary["summary"][key] for key in ("total_resumes_found", "successfully_scanned", "matching_candidates", "returned_results")} == {
+        "total_resumes_found": 4, "successfully_scanned": 4, "matching_candidates": 3, "returned_results": 3}
+    assert "cache_hits" not in summary["summary"] and "computed" not in summary["summary"] # The stream never reads the cache
+
+
+def test_ndjson_top_k_snapshots(scan_app):
+    scan_app.config["SCAN_STREAM_CHUNK_SIZE"] = 1
+    records = _stream(scan_app.test_client(), top_k=2)
+    # Resumes are scored in ID order: alice (100), bob (50), carol (25, no change), dave (0)
+    assert [[r["name"] for r in record["results"]] for record in records[:-1]] == [["Alice"], ["Alice", "Bob"]]
+    assert records[-1]["type"] == "summary" and records[-1]["summary"]["returned_results"] == 2
+
+
+def test_ndjson_reports_backfill_progress_before_results(scan_app, monkeypatch):
+    monkeypatch.setattr(utils, "lemmatizer", object())
+    monkeypatch.setattr(utils, "preprocess_and_extract_keywords_nltk", lambda text: set(text.split()))
+    scan_app.config["SCAN_CHUNK_SIZE"] = 2
+    for name, text in (("erin", "python flask"), ("frank", "sql"), ("gina", "excel")):
+        store_parsed_resume(scan_app.config["RESUME_INDEX_PATH"], f"{name}_parsed.json", {"_original_filename": f"{name}.pdf", "name": name.title()})
+        put_raw_text(scan_app.config["RAW_TEXT_STORE_PATH"], f"{name}_parsed.json", text)
+    store_parsed_resume(scan_app.config["RESUME_INDEX_PATH"], "hal_parsed.json", {"_original_filename": "hal.pdf", "name": "Hal"}) # No raw text
+
+    records = _stream(scan_app.test_client())
+    assert [(r["type"], r["indexed"], r["total"]) for r in records[:3]] == [("backfill", 0, 4), ("backfill", 2, 4), ("backfill", 4, 4)]
+    assert {r["name"] for r in records[3:-1]} == {"Alice", "Bob", "Carol", "Erin", "Frank"}
+    summary = records[-1]
+    assert [e["filename"] for e in summary["scan_errors"]] == ["hal_parsed.json"]
+    assert summary["summary"]["successfully_scanned"] == 7
+    assert "erin_parsed.json" in list_indexed_resume_ids(scan_app.config["RESUME_INDEX_PATH"])
+
+
+def test_ndjson_first_result_is_sent_after_one_chunk(scan_app, monkeypatch):
+    scored_chunks = []
+    real_iter_keyword_scores = scan_resumes.iter_keyword_scores
+
+    def counting_iter_keyword_scores(*args, **kwargs):
+        for chunk in real_iter_keyword_scores(*args, **kwargs):
+            scored_chunks.append(chunk)
+            yield chunk
+
+    monkeypatch.setattr(scan_resumes, "iter_keyword_scores", counting_iter_keyword_scores)
+    scan_app.config["SCAN_STREAM_CHUNK_SIZE"] = 1
+    response = scan_app.test_client().post("/scan/batch", json={"jd_filename": "jd.txt"}, buffered=False,
+                                           headers={"Accept": "application/x-ndjson"})
+    lines = iter(response.response)
+    assert json.loads(next(lines))["name"] == "Alice"
+    assert len(scored_chunks) == 1
+    assert json.loads(list(lines)[-1])["type"] == "summary"
+    assert len(scored_chunks) == 4
+    response.close()
+
+
+def test_ndjson_empty_store_sends_the_summary(app):
+    os.makedirs(app.config["JOB_DESC_FOLDER"], exist_ok=True)
+    with open(os.path.join(app.config["JOB_DESC_FOLDER"], "jd.txt"), "w", encoding="utf-8") as f:
+        f.write("Python developer.")
+    records = _stream(app.test_client())
+    assert [record["type"] for record in records] == ["summary"]
+    assert records[0]["summary"]["total_resumes_found"] == 0
+
+
+def test_ndjson_scoring_failure_ends_with_an_error_record(scan_app, monkeypatch):
+    def failing_iter_keyword_scores(*args, **kwargs):
+        raise RuntimeError("database is locked")
+        yield
+
+    monkeypatch.setattr(scan_resumes, "iter_keyword_scores", failing_iter_keyword_scores)
+    assert _stream(scan_app.test_client()) == [{"type": "error", "error": "Could not query the resume keyword index."}]
+
+
+def test_json_stays_the_default(scan_app):
+    response = scan_app.test_client().post("/scan/batch", json={"jd_filename": "jd.txt"}, headers={"Accept": "*/*"})
+    assert response.mimetype == "application/json"
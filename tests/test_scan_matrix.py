@@ -0,0 +1,103 @@
+# tests/test_scan_matrix.py
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from backend import resume_index, scan_resumes
+from backend.resume_index import index_resume_keywords, store_parsed_resume
+
+JD_KEYWORDS = {
+    "backend.txt": frozenset({"python", "flask", "sql", "docker"}),
+    "data.txt": frozenset({"python", "sql", "excel", "pandas"}),
+}
+
+RESUMES = {
+    "alice_parsed.json": {"python", "flask", "sql", "docker", "react"},
+    "bob_parsed.json": {"python", "sql", "java"},
+    "carol_parsed.json": {"docker"},
+    "dave_parsed.json": {"excel"},
+    "erin_parsed.json": {"photoshop"},
+}
+
+
+@pytest.fixture
+def matrix_app(app, monkeypatch):
+    """App with two JDs and five parsed, indexed resumes."""
+    os.makedirs(app.config["JOB_DESC_FOLDER"], exist_ok=True)
+    for jd_filename in JD_KEYWORDS:
+        with open(os.path.join(app.config["JOB_DESC_FOLDER"], jd_filename), "w", encoding="utf-8") as f:
+            f.write(" ".join(sorted(JD_KEYWORDS[jd_filename])))
+    for resume_id, keywords in RESUMES.items():
+        name = resume_id.replace("_parsed.json", "")
+        store_parsed_resume(app.config["RESUME_INDEX_PATH"], resume_id, {"_original_filename": f"{name}.pdf", "name": name.title()})
+        index_resume_keywords(app.config["RESUME_INDEX_PATH"], resume_id, keywords)
+    monkeypatch.setattr(scan_resumes, "get_jd_keywords", lambda path: JD_KEYWORDS[os.path.basename(path)])
+    return app
+
+
+def _matrix(client, **body):
+    return client.post("/scan/matrix", json={"jd_filenames": ["backend.txt", "data.txt"], **body})
+
+
+def test_matrix_and_top_candidates(matrix_app):
+    response = _matrix(matrix_app.test_client())
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["jd_used"] == ["backend.txt", "data.txt"]
+    assert [(row["name"], row["scores"]) for row in data["matrix"]] == [
+        ("Alice", [100.0, 50.0]),
+        ("Bob", [50.0, 50.0]),
+        ("Carol", [25.0, 0]),
+        ("Dave", [0, 25.0]),
+    ]
+    assert [(r["name"], r["score"]) for r in data["top_candidates"]["backend.txt"]] == [("Alice", 100.0), ("Bob", 50.0), ("Carol", 25.0)]
+    assert [r["name"] for r in data["top_candidates"]["data.txt"]] == ["Bob", "Alice", "Dave"]
+    assert data["summary"]["total_resumes_found"] == 5
+    assert data["summary"]["matching_resumes"] == 4
+
+
+def test_matrix_matches_single_jd_scans(matrix_app):
+    client = matrix_app.test_client()
+    for scoring in ("overlap", "tfidf", "bm25"):
+        rows = _matrix(client, scoring=scoring).get_json()["matrix"]
+        for column, jd_filename in enumerate(JD_KEYWORDS):
+            results = client.post("/scan/batch", json={"jd_filename": jd_filename, "scoring": scoring}).get_json()["results"]
+            expected = {r["_parsed_json_filename"]: r["score"] for r in results}
+            assert {row["_parsed_json_filename"]: row["scores"][column] for row in rows if row["scores"][column]} == expected
+
+
+def test_matrix_top_k_and_min_score(matrix_app):
+    data = _matrix(matrix_app.test_client(), top_k=1, min_score=60).get_json()
+    assert {jd: [r["name"] for r in results] for jd, results in data["top_candidates"].items()} == {"backend.txt": ["Alice"], "data.txt": []}
+    assert len(data["matrix"]) == 4 # The limits only apply to the top candidate lists
+
+
+def test_matrix_loads_each_resume_once(matrix_app, monkeypatch):
+    calls = []
+    original = scan_resumes.load_resume_summaries
+    monkeypatch.setattr(scan_resumes, "load_resume_summaries", lambda db, ids: calls.append(set(ids)) or original(db, ids))
+    _matrix(matrix_app.test_client())
+    assert calls == [{"alice_parsed.json", "bob_parsed.json", "carol_parsed.json", "dave_parsed.json"}]
+
+
+@pytest.mark.parametrize("body", [
+    {"jd_filenames": []},
+    {"jd_filenames": "backend.txt"},
+    {"jd_filenames": ["backend.txt", 3]},
+    {"jd_filenames": ["backend.txt", "../data.txt"]},
+    {"jd_filenames": [f"jd{i}.txt" for i in range(21)]},
+    {"scoring": "cosine"},
+    {"top_k": 0},
+])
+def test_invalid_requests_are_rejected(matrix_app, body):
+    response = matrix_app.test_client().post("/scan/matrix", json={"jd_filenames": ["backend.txt"], **body})
+    assert response.status_code == 400
+
+
+def test_score_keyword_matrix_single_query(matrix_app):
+    db_path = matrix_app.config["RESUME_INDEX_PATH"]
+    matrix = resume_index.score_keyword_matrix(db_path, JD_KEYWORDS, "tfidf")
+    for jd_filename, jd_keywords in JD_KEYWORDS.items():
+        assert matrix[jd_filename] == resume_index.score_keyword_matches(db_path, jd_keywords, "tfidf")
+    assert resume_index.score_keyword_matrix(db_path, {"empty.txt": set()}) == {"empty.txt": {}}
@@ -0,0 +1,105 @@
+# tests/test_section_keywords.py
+# -*- coding: utf-8 -*-
+import glob
+import json
+import os
+import random
+import re
+
+import pytest
+
+from backend import config
+from backend.utils import find_section_keyword
+
+SAMPLE_PARSED_FOLDER = os.path.join(os.path.dirname(config.__file__), "uploads", "resumes_parsed")
+
+
+def baseline_find_section_keyword(line, section_map):
+    """The original nested-loop matcher, kept as the reference for the compiled lookup table."""
+    line_stripped = line.strip()
+    line_lower = line_stripped.lower()
+    if not line_lower or len(line_lower) < 3 or len(line_stripped.split()) > 7:
+        return None
+    if re.match(r"^\s*[\*\-•\d]+\.?\s+.{10,}", line_stripped):
+        return None
+    alpha_chars = [c for c in line_stripped if c.isalpha()]
+    if not alpha_chars: return None
+    upper_chars = [c for c in alpha_chars if c.isupper()]
+    is_mostly_upper = (len(upper_chars) / len(alpha_chars)) > 0.7
+    line_cleaned_lower = re.sub(r"^\s*[^A-Za-z0-9]+|[^A-Za-z0-9]+\s*$", "", line_lower).strip()
+    line_cleaned_orig = re.sub(r"^\s*[^A-Za-z0-9]+|[^A-Za-z0-9]+\s*$", "", line_stripped).strip()
+    if not line_cleaned_lower: return None
+    for section_name, keywords in section_map.items():
+        if section_name == 'contact': continue
+        for keyword in keywords:
+            if line_cleaned_lower == keyword:
+                return section_name
+    for section_name, keywords in section_map.items():
+        if section_name == 'contact': continue
+        for keyword in keywords:
+            if re.match(r'^' + re.escape(keyword) + r'\b', line_cleaned_lower) and len(line_cleaned_lower) < len(keyword) + 10:
+                return section_name
+    if is_mostly_upper and len(line_cleaned_orig.split()) <= 5:
+        for section_name, keywords in section_map.items():
+            if section_name == 'contact': continue
+            for keyword in keywords:
+                if re.search(r'\b' + re.escape(keyword) + r'\b', line_cleaned_orig, re.IGNORECASE):
+                    return section_name
+    return None
+
+
+def _sample_resume_lines():
+    lines = []
+    for path in sorted(glob.glob(os.path.join(SAMPLE_PARSED_FOLDER, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            for value in json.load(f).values():
+                if isinstance(value, str):
+                    lines.extend(value.split("\n"))
+    return lines
+
+
+def _generated_header_lines(count, seed=1234):
+    """Header-like lines: section keywords with random casing, punctuation and extra words."""
+    rng = random.Random(seed)
+    keywords = [k for words in config.SECTION_KEYWORDS.values() for k in words]
+    fillers = ["and", "my", "key", "2023", "-", "&", "OF", "Summary", "Python", "(cont.)", "•", "Ltd.", "x"]
+    decorations = ["", ":", " :", "-", "  ", "*", "•", "#", "1.", ")", "!!"]
+    lines = []
+    for _ in range(count):
+        parts = [rng.choice(keywords if rng.random() < 0.6 else fillers) for _ in range(rng.randint(1, 5))]
+        line = " ".join(parts)
+        casing = rng.random()
+        if casing < 0.3: line = line.upper()
+        elif casing < 0.5: line = line.title()
+        lines.append(rng.choice(decorations) + line + rng.choice(decorations))
+    return lines
+
+
+def test_sample_resume_lines_match_baseline():
+    lines = _sample_resume_lines()
+    assert lines, "sample parsed resumes are missing"
+    for line in lines:
+        assert find_section_keyword(line, config.SECTION_KEYWORDS) == baseline_find_section_keyword(line, config.SECTION_KEYWORDS), line
+
+
+def test_generated_header_lines_match_baseline():
+    for line in _generated_header_lines(5000):
+        assert find_section_keyword(line, config.SECTION_KEYWORDS) == baseline_find_section_keyword(line, config.SECTION_KEYWORDS), line
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("EDUCATION", "education"),
+    ("Technical Skills:", "skills"),
+    ("  Work Experience  ", "experience"),
+    ("PROFESSIONAL EXPERIENCE & PROJECTS", "experience"),
+    ("- Built a REST API with Flask and PostgreSQL", None),
+    ("Contact", None),
+])
+def test_known_headers(line, expected):
+    assert find_section_keyword(line, config.SECTION_KEYWORDS) == expected
+
+
+def test_custom_section_map():
+    section_map = {"contact": ["phone"], "hobbies": ["hobbies", "interests"]}
+    assert find_section_keyword("Interests:", section_map) == "hobbies"
+    assert find_section_keyword("Phone", section_map) is None
@@ -0,0 +1,182 @@
+# tests/test_text_extraction.py
+# -*- coding: utf-8 -*-
+import io
+import os
+import zipfile
+from concurrent.futures import Future
+
+import docx
+import fitz
+import pytest
+
+from backend import config, upload_resume, utils, workers
+
+
+def _pdf_bytes(*pages):
+    document = fitz.open()
+    for page_text in pages:
+        document.new_page().insert_text((72, 72), page_text)
+    content = document.tobytes()
+    document.close()
+    return content
+
+
+def _docx_bytes(*paragraphs):
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("as_source", [bytes, io.BytesIO, "path"])
+def test_pdf_from_path_bytes_or_stream(tmp_path, as_source):
+    content = _pdf_bytes("Jane Doe", "Skills: Python")
+    if as_source == "path":
+        (tmp_path / "cv.pdf").write_bytes(content)
+        source = str(tmp_path / "cv.pdf")
+    else:
+        source = as_source(content)
+    assert utils.extract_text_from_pdf(source) == "Jane Doe\nSkills: Python"
+
+
+@pytest.mark.parametrize("as_source", [bytes, io.BytesIO])
+def test_docx_from_bytes_or_stream(as_source):
+    assert utils.extract_text_from_docx(as_source(_docx_bytes("Jane Doe", "", "Python"))) == "Jane Doe\n\nPython"
+
+
+def test_docx_table_cells_in_document_order():
+    document = docx.Document()
+    document.add_paragraph("Skills")
+    table = document.add_table(rows=2, cols=2)
+    for row, cells in zip(table.rows, (("Python", "Go"), ("Kubernetes", "SQL"))):
+        for cell, cell_text in zip(row.cells, cells):
+            cell.text = cell_text
+    document.add_paragraph("Experience")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    assert list(utils.iter_docx_paragraphs(buffer.getvalue())) == ["Skills", "Python", "Go", "Kubernetes", "SQL", "Experience"]
+
+
+def test_docx_runs_symbols_and_text_boxes():
+    w = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    mc = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+    body = (
+        '<w:p><w:r><w:t>Jane</w:t></w:r><w:r><w:t xml:space="preserve">   Doe</w:t></w:r></w:p>'
+        '<w:p><w:r><w:t>Email</w:t><w:tab/><w:t>jane@example.com</w:t></w:r></w:p>'
+        '<w:p><w:hyperlink><w:r><w:t>github.com/jane</w:t></w:r></w:hyperlink></w:p>'
+        '<w:p><w:r><w:t>Full</w:t><w:noBreakHyphen/><w:t>stack</w:t><w:br/><w:br/><w:br/><w:t>Remote</w:t></w:r></w:p>'
+        '<w:p><w:r><w:delText>deleted</w:delText></w:r></w:p>'
+        '<w:p><w:r><mc:AlternateContent><mc:Choice><w:txbxContent><w:p><w:r><w:t>Python</w:t></w:r></w:p>'
+        '</w:txbxContent></mc:Choice><mc:Fallback><w:txbxContent><w:p><w:r><w:t>Python</w:t></w:r></w:p>'
+        '</w:txbxContent></mc:Fallback></mc:AlternateContent></w:r></w:p>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", f'<w:document {w} {mc}><w:body>{body}</w:body></w:document>')
+    assert utils.extract_text_from_docx(buffer.getvalue()) == (
+        "Jane Doe\n\nEmail\tjane@example.com\n\ngithub.com/jane\n\nFull-stack\n\nRemote\n\nPython")
+
+
+def test_unreadable_buffer_returns_none():
+    assert utils.extract_text_from_pdf(b"%PDF-1.4 truncated") is None
+    assert utils.extract_text_from_docx(b"not a zip") is None
+
+
+def test_upload_is_extracted_from_memory(app, client, monkeypatch):
+    sources = []
+
+    def fake_extract_and_parse(source, extension, original_filename, nlp=None):
+        sources.append(source)
+        return {"raw_text": "text", "parsed_data": {"name": "Jane Doe"}, "keywords": {"python"}}
+
+    monkeypatch.setattr(upload_resume, "extract_and_parse_resume", fake_extract_and_parse)
+    content = _pdf_bytes("Jane Doe")
+    response = client.post("/resumes/upload", data={"files": [(io.BytesIO(content), "jane.pdf")]},
+                           content_type="multipart/form-data")
+    assert response.status_code == 200
+    assert sources == [content]
+    saved_path = response.get_json()["success_files"][0]["parsedData"]["_saved_original_filepath"]
+    with open(saved_path, "rb") as f:
+        assert f.read() == content
+
+
+def test_failed_original_write_fails_the_file(app, client, monkeypatch):
+    def failing_write(filepath, file_bytes):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(upload_resume, "_write_original", failing_write)
+    monkeypatch.setattr(upload_resume, "extract_and_parse_resume",
+                        lambda *args, **kwargs: {"raw_text": "text", "parsed_data": {"name": "Jane"}, "keywords": set()})
+    response = client.post("/resumes/upload", data={"files": [(io.BytesIO(b"%PDF-1.4 x"), "jane.pdf")]},
+                           content_type="multipart/form-data")
+    assert response.status_code == 400
+    assert "disk full" in response.get_json()["error_files"][0]["error"]
+    assert os.listdir(app.config["ORIGINAL_RESUME_FOLDER"]) == []
+
+
+def test_pdf_lines_are_streamed_page_by_page():
+    lines = utils.iter_pdf_lines(_pdf_bytes("Page one", "Page  two", "Page three"))
+    assert next(lines) == "Page one"
+    assert list(lines) == ["Page two", "Page three"]
+
+
+def test_pdf_page_budget():
+    content = _pdf_bytes(*(f"Page {n}" for n in range(1, 81)))
+    assert list(utils.iter_pdf_lines(content, max_pages=2)) == ["Page 1", "Page 2"]
+    assert utils.extract_text_from_pdf(content, max_pages=3) == "Page 1\nPage 2\nPage 3"
+
+
+def test_pdf_character_budget():
+    content = _pdf_bytes("Jane Doe", "Skills: Python")
+    assert utils.extract_text_from_pdf(content, max_chars=12) == "Jane Doe\nSki"
+    assert utils.extract_text_from_pdf(content, max_chars=9) == "Jane Doe"
+    assert utils.extract_text_from_pdf(content, max_chars=1000) == "Jane Doe\nSkills: Python"
+
+
+def test_pdf_budgets_default_to_app_config(app):
+    app.config["PDF_MAX_PAGES"] = 1
+    with app.app_context():
+        assert utils.extract_text_from_pdf(_pdf_bytes("Jane Doe", "Skills: Python")) == "Jane Doe"
+
+
+@pytest.fixture
+def pdf_page_pool():
+    """A real two-worker PDF page pool, shut down afterwards."""
+    yield
+    workers.reset_pdf_page_pool()
+
+
+def test_long_pdf_is_extracted_across_the_pool(app, pdf_page_pool):
+    content = _pdf_bytes(*(f"Page {n}\nSkills: Python {n}" for n in range(1, 41)))
+    sequential = "\n".join(utils.iter_pdf_lines(content, max_pages=30))
+    app.config.update(PDF_PARALLEL_WORKERS=2, PDF_PARALLEL_PAGE_THRESHOLD=16, PDF_MAX_PAGES=30)
+    with app.app_context():
+        assert utils.extract_text_from_pdf(content) == sequential
+        assert workers._pdf_page_pool is not None and workers._parse_pool is None # spaCy/NLTK pool never started
+        assert utils.extract_text_from_pdf(content, max_chars=50) == sequential[:50]
+        assert utils.extract_text_from_pdf(_pdf_bytes("Jane Doe", "Python")) == "Jane Doe\nPython" # Below the threshold
+
+
+def test_pdf_page_ranges_follow_the_worker_count(app, monkeypatch):
+    submitted = []
+
+    def fake_submit(config, pdf_path, start_page, stop_page, max_chars):
+        assert os.path.isfile(pdf_path) # Workers get a path, not the PDF's bytes
+        submitted.append((start_page, stop_page))
+        future = Future()
+        future.set_result(utils.extract_pdf_page_range(pdf_path, start_page, stop_page, max_chars))
+        return future
+
+    monkeypatch.setattr(workers, "submit_pdf_page_range", fake_submit)
+    content = _pdf_bytes(*(f"Page {n}" for n in range(1, 21)))
+    app.config.update(PDF_PARALLEL_WORKERS=3, PDF_PARALLEL_PAGE_THRESHOLD=16)
+    with app.app_context():
+        assert utils.extract_text_from_pdf(content) == "\n".join(f"Page {n}" for n in range(1, 21))
+        assert submitted == [(0, 7), (7, 14), (14, 20)]
+
+        # Off by default
+        app.config["PDF_PARALLEL_PAGE_THRESHOLD"] = config.PDF_PARALLEL_PAGE_THRESHOLD
+        utils.extract_text_from_pdf(content)
+    assert config.PDF_PARALLEL_PAGE_THRESHOLD is None and len(submitted) == 3
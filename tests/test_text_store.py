@@ -0,0 +1,80 @@
+# tests/test_text_store.py
+# -*- coding: utf-8 -*-
+import pytest
+
+from backend import text_store
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "store" / "raw_text.seg")
+
+
+def _fresh_process_view(store_path):
+    """Drops the in-process offset index, as a newly started worker would see the file."""
+    text_store._indexes.pop(store_path, None)
+
+
+def test_missing_store_is_empty(store_path):
+    assert text_store.get_raw_text(store_path, "a_parsed.json") is None
+    assert text_store.list_raw_text_ids(store_path) == set()
+
+
+def test_round_trip_replace_and_delete(store_path):
+    text_store.put_raw_text(store_path, "a_parsed.json", "Jane Doe\nPython developer ü")
+    text_store.put_raw_text(store_path, "b_parsed.json", "John Roe\nJava" * 1000)
+    assert text_store.get_raw_text(store_path, "a_parsed.json") == "Jane Doe\nPython developer ü"
+
+    text_store.put_raw_text(store_path, "a_parsed.json", "Jane Doe\nRust developer")
+    text_store.delete_raw_text(store_path, "b_parsed.json")
+    assert text_store.get_raw_texts(store_path, ["a_parsed.json", "b_parsed.json", "c_parsed.json"]) == {
+        "a_parsed.json": "Jane Doe\nRust developer"
+    }
+
+    _fresh_process_view(store_path)
+    assert text_store.list_raw_text_ids(store_path) == {"a_parsed.json"}
+    assert text_store.get_raw_text(store_path, "a_parsed.json") == "Jane Doe\nRust developer"
+
+
+def test_text_is_compressed(store_path):
+    text = "Python developer with Flask and SQL experience.\n" * 200
+    text_store.put_raw_text(store_path, "a_parsed.json", text)
+    with open(store_path, "rb") as f:
+        assert len(f.read()) < len(text) // 10
+
+
+def test_empty_text_is_rejected(store_path):
+    with pytest.raises(ValueError):
+        text_store.put_raw_text(store_path, "a_parsed.json", "")
+
+
+def test_incomplete_tail_is_picked_up_once_written(store_path):
+    text_store.put_raw_text(store_path, "a_parsed.json", "first")
+    record = open(store_path, "rb").read()
+    text_store.put_raw_text(store_path, "b_parsed.json", "second")
+    full = open(store_path, "rb").read()
+    second_record = full[len(record):]
+
+    # A record still being appended by another worker is not read half-way...
+    with open(store_path, "wb") as f:
+        f.write(record + second_record[:-3])
+    _fresh_process_view(store_path)
+    assert text_store.list_raw_text_ids(store_path) == {"a_parsed.json"}
+    # ...and is read as soon as it is complete
+    with open(store_path, "ab") as f:
+        f.write(second_record[-3:])
+    assert text_store.get_raw_text(store_path, "b_parsed.json") == "second"
+
+
+def test_corrupt_record_is_skipped(store_path):
+    text_store.put_raw_text(store_path, "a_parsed.json", "first")
+    text_store.put_raw_text(store_path, "b_parsed.json", "second")
+    data = bytearray(open(store_path, "rb").read())
+    data[-1] ^= 0xFF # Damage the last payload byte of b
+    with open(store_path, "wb") as f:
+        f.write(bytes(data))
+    text_store.put_raw_text(store_path, "c_parsed.json", "third")
+
+    _fresh_process_view(store_path)
+    assert text_store.list_raw_text_ids(store_path) == {"a_parsed.json", "c_parsed.json"}
+    assert text_store.get_raw_text(store_path, "c_parsed.json") == "third"
@@ -0,0 +1,152 @@
+# tests/test_upload_dedup.py
+# -*- coding: utf-8 -*-
+import io
+import os
+
+import docx
+import pytest
+
+from backend import upload_resume, workers
+from backend.resume_index import delete_parsed_resume, list_stored_resume_ids
+from backend.text_store import get_raw_text
+
+PDF_BYTES = b"%PDF-1.4 same candidate"
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """Replaces extraction/parsing with a fake that records the files it was asked to parse."""
+    calls = []
+
+    def fake_extract_and_parse(file_path, extension, original_filename, nlp=None):
+        calls.append(original_filename)
+        return {"raw_text": "text", "parsed_data": {"name": "Jane Doe"}, "keywords": {"python"}}
+
+    def fake_extract_and_parse_batch(files, on_file_start=None, **kwargs):
+        return [fake_extract_and_parse(*file) for file in files]
+
+    monkeypatch.setattr(upload_resume, "extract_and_parse_resume", fake_extract_and_parse)
+    monkeypatch.setattr(upload_resume, "extract_and_parse_resumes", fake_extract_and_parse_batch)
+    return calls
+
+
+def _upload(client, *files, mode=None):
+    data = {"files": [(io.BytesIO(content), name) for name, content in files]}
+    query = f"?mode={mode}" if mode else ""
+    return client.post(f"/resumes/upload{query}", data=data, content_type="multipart/form-data")
+
+
+def _stored(app):
+    return list_stored_resume_ids(app.config["RESUME_INDEX_PATH"]), os.listdir(app.config["ORIGINAL_RESUME_FOLDER"])
+
+
+def test_reupload_returns_cached_parse(app, client, parse_calls):
+    first = _upload(client, ("jane.pdf", PDF_BYTES)).get_json()["success_files"][0]
+    assert first["cache_hit"] is False
+
+    response = _upload(client, ("jane_again.pdf", PDF_BYTES))
+    assert response.status_code == 200
+    second = response.get_json()["success_files"][0]
+    assert second["cache_hit"] is True
+    assert second["filename"] == "jane_again.pdf"
+    assert second["parsedData"]["_saved_parsed_filename"] == first["parsedData"]["_saved_parsed_filename"]
+
+    assert parse_calls == ["jane.pdf"]
+    parsed, originals = _stored(app)
+    assert len(parsed) == 1 and len(originals) == 1
+
+
+def test_duplicate_within_one_request_is_dropped(app, client, parse_calls):
+    response = _upload(client, ("a.pdf", PDF_BYTES), ("b.pdf", PDF_BYTES), ("c.pdf", b"%PDF-1.4 other"))
+    entries = response.get_json()["success_files"]
+    assert [(e["filename"], e["cache_hit"]) for e in entries] == [("a.pdf", False), ("b.pdf", True), ("c.pdf", False)]
+    parsed, originals = _stored(app)
+    assert len(parsed) == 2 and len(originals) == 2
+
+
+def test_deleted_parse_is_processed_again(app, client, parse_calls):
+    first = _upload(client, ("jane.pdf", PDF_BYTES)).get_json()["success_files"][0]
+    delete_parsed_resume(app.config["RESUME_INDEX_PATH"], first["parsedData"]["_saved_parsed_filename"])
+
+    second = _upload(client, ("jane.pdf", PDF_BYTES)).get_json()["success_files"][0]
+    assert second["cache_hit"] is False
+    assert parse_calls == ["jane.pdf", "jane.pdf"]
+    # The new parse now owns the hash
+    assert _upload(client, ("jane.pdf", PDF_BYTES)).get_json()["success_files"][0]["cache_hit"] is True
+
+
+def test_dedup_can_be_disabled(app, client, parse_calls):
+    app.config["UPLOAD_DEDUP_ENABLED"] = False
+    _upload(client, ("jane.pdf", PDF_BYTES))
+    second = _upload(client, ("jane.pdf", PDF_BYTES)).get_json()["success_files"][0]
+    assert second["cache_hit"] is False
+    assert parse_calls == ["jane.pdf", "jane.pdf"]
+
+
+def test_job_mode_reports_cache_hits_as_done(app, client, parse_calls):
+    _upload(client, ("jane.pdf", PDF_BYTES))
+    response = _upload(client, ("jane.pdf", PDF_BYTES), ("new.pdf", b"%PDF-1.4 new"), mode="job")
+    assert response.status_code == 202
+    data = response.get_json()
+    assert data["total_files"] == 2
+    assert [e["filename"] for e in data["success_files"]] == ["jane.pdf"]
+    assert data["success_files"][0]["cache_hit"] is True
+
+
+def test_raw_text_goes_to_the_store_not_the_json(app, client, parse_calls):
+    entry = _upload(client, ("jane.pdf", PDF_BYTES)).get_json()["success_files"][0]
+    resume_id = entry["parsedData"]["_saved_parsed_filename"]
+    assert "_raw_text" not in entry["parsedData"]
+    assert get_raw_text(app.config["RAW_TEXT_STORE_PATH"], resume_id) == "text"
+
+
+def test_parsed_download_is_serialized_from_the_store(app, client, parse_calls):
+    resume_id = _upload(client, ("jane.pdf", PDF_BYTES)).get_json()["success_files"][0]["parsedData"]["_saved_parsed_filename"]
+    assert not os.path.exists(app.config["PARSED_DATA_FOLDER"]) # No JSON file per resume anymore
+
+    response = client.get(f"/resumes/download/parsed/{resume_id}")
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert resume_id in response.headers["Content-Disposition"]
+    assert response.get_json()["name"] == "Jane Doe"
+
+    assert client.get("/resumes/download/parsed/nobody_1_parsed.json").status_code == 404
+
+
+def _docx_resume(name, skills):
+    document = docx.Document()
+    for line in (name, f"{name.split()[0].lower()}@example.com", "Summary", "Backend developer building APIs.",
+                 "Skills", skills, "Experience", "Acme Corp - Engineer 2019-2023", "Education", "BSc Computer Science"):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_process_mode_parses_in_the_worker_pool(app, client, parse_pool):
+    files = [("jane.docx", _docx_resume("Jane Doe", "Python, Kubernetes")),
+             ("john.docx", _docx_resume("John Smith", "Go, SQL"))]
+    inline = _upload(client, *files).get_json()["success_files"]
+    for entry in inline: # Same files again, so they are parsed rather than answered from the dedup cache
+        delete_parsed_resume(app.config["RESUME_INDEX_PATH"], entry["parsedData"]["_saved_parsed_filename"])
+
+    app.config["UPLOAD_PARSE_MODE"] = "process"
+    submitted = []
+    submit_to_worker_pool = workers.submit_to_worker_pool
+
+    def recording_submit(config, fn, *args):
+        submitted.append(fn.__name__)
+        return submit_to_worker_pool(config, fn, *args)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(workers, "submit_to_worker_pool", recording_submit)
+        pooled = _upload(client, *files).get_json()["success_files"]
+
+    assert submitted == ["_parse_resume_in_worker", "_parse_resume_in_worker"]
+    assert [e["filename"] for e in pooled] == ["jane.docx", "john.docx"]
+    assert [e["cache_hit"] for e in pooled] == [False, False]
+    for inline_entry, pooled_entry in zip(inline, pooled):
+        inline_data = {k: v for k, v in inline_entry["parsedData"].items() if not k.startswith("_")}
+        pooled_data = {k: v for k, v in pooled_entry["parsedData"].items() if not k.startswith("_")}
+        assert pooled_data == inline_data
+    assert pooled[0]["parsedData"]["name"] == "Jane Doe"
@@ -0,0 +1,142 @@
+# tests/test_upload_jobs.py
+# -*- coding: utf-8 -*-
+import datetime
+import io
+import json
+import os
+import time
+
+import pytest
+
+from backend import upload_jobs, upload_resume
+
+TERMINAL_STATUSES = ("completed", "completed_with_errors", "failed")
+
+
+@pytest.fixture
+def parse_sources(monkeypatch):
+    """Replaces extraction/parsing with a fake that records what it was given to parse."""
+    sources = []
+
+    def fake_extract_and_parse(source, extension, original_filename, nlp=None):
+        sources.append(source)
+        if original_filename.startswith("broken"):
+            raise ValueError("Could not extract text.")
+        return {"raw_text": "text", "parsed_data": {"name": original_filename}, "keywords": {"python"}}
+
+    def fake_extract_and_parse_batch(files, on_file_start=None, **kwargs):
+        outcomes = []
+        for index, file in enumerate(files):
+            if on_file_start: on_file_start(index)
+            try:
+                outcomes.append(fake_extract_and_parse(*file))
+            except ValueError as e:
+                outcomes.append(e)
+        return outcomes
+
+    monkeypatch.setattr(upload_resume, "extract_and_parse_resume", fake_extract_and_parse)
+    monkeypatch.setattr(upload_resume, "extract_and_parse_resumes", fake_extract_and_parse_batch)
+    return sources
+
+
+def _upload_job(client, *files):
+    data = {"files": [(io.BytesIO(content), name) for name, content in files]}
+    return client.post("/resumes/upload?mode=job", data=data, content_type="multipart/form-data")
+
+
+def _poll(client, status_url, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get(status_url)
+        assert response.status_code == 200
+        job = response.get_json()
+        if job["status"] in TERMINAL_STATUSES or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+def _write_job_file(jobs_folder, job):
+    os.makedirs(jobs_folder, exist_ok=True)
+    with open(os.path.join(jobs_folder, f"{job['job_id']}.json"), "w", encoding="utf-8") as f_json:
+        json.dump(job, f_json)
+
+
+def test_job_upload_returns_202_and_completes(app, client, parse_sources):
+    response = _upload_job(client, ("jane.pdf", b"%PDF-1.4 jane"), ("john.pdf", b"%PDF-1.4 john"))
+    assert response.status_code == 202
+    data = response.get_json()
+    assert data["status"] == "queued" and data["total_files"] == 2
+    assert data["status_url"].endswith(f"/resumes/jobs/{data['job_id']}")
+
+    job = _poll(client, data["status_url"])
+    assert job["status"] == "completed"
+    assert job["processed_files"] == 2
+    assert [f["status"] for f in job["files"]] == ["done", "done"]
+    assert sorted(e["parsedData"]["name"] for e in job["success_files"]) == ["jane.pdf", "john.pdf"]
+
+
+def test_job_parses_the_originals_from_disk(app, client, parse_sources):
+    original_folder = app.config["ORIGINAL_RESUME_FOLDER"]
+    response = _upload_job(client, ("jane.pdf", b"%PDF-1.4 jane"))
+    # The original is written before the 202, not by the job
+    assert len(os.listdir(original_folder)) == 1
+    _poll(client, response.get_json()["status_url"])
+
+    assert len(parse_sources) == 1
+    assert isinstance(parse_sources[0], str)
+    assert os.path.dirname(parse_sources[0]) == original_folder
+    with open(parse_sources[0], "rb") as f_original:
+        assert f_original.read() == b"%PDF-1.4 jane"
+
+
+def test_job_reports_failed_files(app, client, parse_sources):
+    response = _upload_job(client, ("jane.pdf", b"%PDF-1.4 jane"), ("broken.pdf", b"%PDF-1.4 broken"))
+    job = _poll(client, response.get_json()["status_url"])
+    assert job["status"] == "completed_with_errors"
+    assert [f["status"] for f in job["files"]] == ["done", "error"]
+    assert [e["filename"] for e in job["error_files"]] == ["broken.pdf"]
+    # The failed file's original is removed, the parsed one's is kept
+    assert len(os.listdir(app.config["ORIGINAL_RESUME_FOLDER"])) == 1
+
+
+def test_unknown_job_returns_404(client):
+    assert client.get(f"/resumes/jobs/{'0' * 32}").status_code == 404
+    assert client.get("/resumes/jobs/not-a-job-id").status_code == 404
+
+
+def test_expired_jobs_are_pruned(app, client, parse_sources):
+    jobs_folder = app.config["UPLOAD_JOBS_FOLDER"]
+    old_job = upload_jobs.create_job(jobs_folder, ["old.pdf"], [])
+    recent_job = upload_jobs.create_job(jobs_folder, ["recent.pdf"], [])
+    two_hours_ago = time.time() - 2 * 3600
+    os.utime(os.path.join(jobs_folder, f"{old_job['job_id']}.json"), (two_hours_ago, two_hours_ago))
+
+    assert upload_jobs.prune_jobs(jobs_folder, ttl_seconds=3600) == 1
+    assert upload_jobs.load_job(jobs_folder, old_job["job_id"]) is None
+    assert upload_jobs.load_job(jobs_folder, recent_job["job_id"]) is not None
+
+    # New jobs prune with UPLOAD_JOB_TTL_SECONDS
+    app.config["UPLOAD_JOB_TTL_SECONDS"] = 60
+    os.utime(os.path.join(jobs_folder, f"{recent_job['job_id']}.json"), (two_hours_ago, two_hours_ago))
+    _upload_job(client, ("jane.pdf", b"%PDF-1.4 jane"))
+    assert client.get(f"/resumes/jobs/{recent_job['job_id']}").status_code == 404
+
+
+def test_stale_job_is_reported_as_failed(app, client):
+    jobs_folder = app.config["UPLOAD_JOBS_FOLDER"]
+    job = upload_jobs.create_job(jobs_folder, ["jane.pdf"], [])
+    job["status"] = "running"
+    job["updated_at"] = (datetime.datetime.now() - datetime.timedelta(hours=1)).isoformat()
+    _write_job_file(jobs_folder, job)
+
+    assert upload_jobs.load_job(jobs_folder, job["job_id"])["status"] == "running" # No staleness check asked for
+
+    app.config["UPLOAD_JOB_STALE_SECONDS"] = 60
+    reported = client.get(f"/resumes/jobs/{job['job_id']}").get_json()
+    assert reported["status"] == "failed"
+    assert reported["stale"] is True
+    assert reported["error"]
+
+    # A job still making progress is not stale
+    fresh_job = upload_jobs.create_job(jobs_folder, ["john.pdf"], [])
+    assert client.get(f"/resumes/jobs/{fresh_job['job_id']}").get_json()["status"] == "queued"
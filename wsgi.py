@@ -1,19 +1,29 @@
 # wsgi.py (Place this file in your project root, OUTSIDE the 'backend' folder)
+import gc
 import os
 import logging
 
 # Import the factory function from your backend package
 from backend import create_app
+from backend.nlp_model import nlp_model_status
 
 # Configure logging early (optional, but good practice)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
 logger = logging.getLogger(__name__)
 
-logger.info("WSGI script started. Creating Flask app instance...")
-# Create the Flask app instance using the factory
-# This instance is what Gunicorn (or other WSGI servers) will use
-app = create_app()
-logger.info("Flask app instance created.")
+# Parsing worker processes started with the "spawn" method re-import this script as
+# '__mp_main__'. They must not build the app (and load spaCy/NLTK) a second time.
+if __name__ != '__mp_main__':
+    logger.info("WSGI script started. Creating Flask app instance...")
+    # Create the Flask app instance using the factory
+    # This instance is what Gunicorn (or other WSGI servers) will use
+    app = create_app()
+    logger.info("Flask app instance created.")
+    if app.config.get('NLP_PRELOAD'):
+        # 'gunicorn --preload wsgi:app' creates the app (and loads spaCy) once before forking.
+        # Freezing moves everything allocated so far out of the garbage collector's reach, so
+        # collections in the workers don't touch (and un-share) the model's memory pages.
+        gc.freeze()
 
 # --- Main Execution Block (Only for Local Development) ---
 # This block is NOT used by Gunicorn/Vercel/Render deployments
@@ -31,8 +41,7 @@ if __name__ == '__main__':
     print(f" * Max Upload Size: {app.config.get('MAX_FILE_SIZE', 'N/A') // (1024*1024)} MB")
 
     # Check status after app creation attempts loading
-    spacy_model = app.config.get('NLP_MODEL')
-    spacy_status = "Loaded" if spacy_model else "Failed/Unavailable"
+    spacy_status = nlp_model_status(app)
     nltk_status = "Ready" if app.config.get('NLTK_READY') else "Failed/Unavailable"
 
     print(f" * spaCy Model Status: {app.config.get('NLP_MODEL_NAME', 'N/A')} ({spacy_status})")